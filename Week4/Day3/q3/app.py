@@ -6,18 +6,28 @@ from plotly.subplots import make_subplots
 import numpy as np
 import json
 import io
+import os
+import shutil
 import time
+import uuid
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 
 # Import our custom modules
 from utils.pdf_processor import PDFProcessor
+from utils.text_cache import ExtractedTextCache
+from utils.cache import get_cache_dir
+from utils.chunks import ChunkTable, chunk_column
+from utils.chunk_store import ChunkStore, remove_stale_stores
+from utils.export import ArrowChunkWriter, JSONLChunkWriter, PYARROW_AVAILABLE
+from utils.profiling import PYINSTRUMENT_AVAILABLE, profile_pipeline
 from utils.tokenizer import TokenizerUtils
-from strategies.fixed_length import FixedLengthChunker
-from strategies.sliding_window import SlidingWindowChunker
-from strategies.sentence_based import SentenceBasedChunker
-from strategies.paragraph_based import ParagraphBasedChunker
-from strategies.semantic_chunking import SemanticChunker
-from utils.visualizations import VisualizationUtils
+from strategies.registry import create_strategy
+from strategies.incremental import IncrementalChunker
+from evaluation import evaluate_strategies, parse_qa, resolve_answer_spans
+from retrieval.embedder import TextEmbedder
+from retrieval.retriever import ChunkRetriever
+from utils.visualizations import MAX_DETAILED_CHUNKS, VisualizationUtils
 
 # Page configuration
 st.set_page_config(
@@ -57,30 +67,69 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Sidebar labels mapped to strategy registry names
+STRATEGY_NAMES = {
+    "Fixed-Length Token": "fixed_length",
+    "Sliding Window": "sliding_window",
+    "Sentence-Based": "sentence_based",
+    "Paragraph-Based": "paragraph_based",
+    "Semantic Chunking": "semantic_chunking",
+    "Token-Budget Packing": "token_budget"
+}
+
+# Chunk stores of sessions that ended (closed tabs, expired sessions) are deleted after this long unused
+CHUNK_STORE_MAX_IDLE_SECONDS = 6 * 60 * 60
+
+def remove_stale_chunk_stores() -> int:
+    """Delete chunk stores no session has used for CHUNK_STORE_MAX_IDLE_SECONDS."""
+    return remove_stale_stores(get_cache_dir('chunk_stores'), CHUNK_STORE_MAX_IDLE_SECONDS)
+
+@st.cache_resource(show_spinner=False)
+def startup_cleanup() -> int:
+    """Remove stores left behind by earlier server processes, once per process."""
+    return remove_stale_chunk_stores()
+
+@st.cache_resource(show_spinner=False)
+def get_shared_strategy(name: str):
+    """Create a chunking strategy once per server process.
+    
+    Strategies load their models (spaCy, sentence embeddings) on first use, so
+    reruns and sessions share them and only the selected strategy pays for loading.
+    """
+    return create_strategy(name)
+
 class RAGChunkingApp:
     def __init__(self):
-        self.pdf_processor = PDFProcessor()
+        self.pdf_processor = PDFProcessor(text_cache=ExtractedTextCache())
         self.tokenizer_utils = TokenizerUtils()
         self.viz_utils = VisualizationUtils()
-        
-        # Initialize chunking strategies
-        self.strategies = {
-            "Fixed-Length Token": FixedLengthChunker(),
-            "Sliding Window": SlidingWindowChunker(),
-            "Sentence-Based": SentenceBasedChunker(),
-            "Paragraph-Based": ParagraphBasedChunker(),
-            "Semantic Chunking": SemanticChunker()
-        }
+        startup_cleanup()
         
         # Initialize session state
         if 'uploaded_file' not in st.session_state:
             st.session_state.uploaded_file = None
+        if 'uploaded_file_id' not in st.session_state:
+            st.session_state.uploaded_file_id = None
+        if 'pdf_hash' not in st.session_state:
+            st.session_state.pdf_hash = None
         if 'extracted_text' not in st.session_state:
             st.session_state.extracted_text = ""
+        if 'pdf_info' not in st.session_state:
+            st.session_state.pdf_info = {}
         if 'chunks' not in st.session_state:
             st.session_state.chunks = []
         if 'current_strategy' not in st.session_state:
             st.session_state.current_strategy = "Fixed-Length Token"
+        if 'chunk_export' not in st.session_state:
+            st.session_state.chunk_export = None
+        if 'chunk_source' not in st.session_state:
+            st.session_state.chunk_source = None  # (strategy, params, text or None when in the chunk store)
+        if 'retrieval_evaluation' not in st.session_state:
+            st.session_state.retrieval_evaluation = None
+        if 'chunk_retriever' not in st.session_state:
+            st.session_state.chunk_retriever = None  # vector index over the current chunks, built on first search
+        if 'profiles' not in st.session_state:
+            st.session_state.profiles = {}  # PipelineProfiler of the last profiled extraction / processing run
     
     def render_header(self):
         st.title("🧠 RAG Chunking Strategy Visualizer")
@@ -100,35 +149,104 @@ class RAGChunkingApp:
             help="Choose a PDF file to analyze with different chunking strategies"
         )
         
+        self.pdf_processor.workers = st.sidebar.number_input(
+            "PDF extraction workers", min_value=1, max_value=os.cpu_count() or 1, value=1,
+            help="Extract pages in parallel across processes (useful for large PDFs)"
+        )
+        self.render_profiling_options()
+        
         if uploaded_file is not None:
-            if uploaded_file != st.session_state.uploaded_file:
+            # Identify uploads by content so re-uploading the same PDF reuses its extracted text
+            file_id = getattr(uploaded_file, 'file_id', None)
+            if file_id is None or file_id != st.session_state.uploaded_file_id:
+                st.session_state.uploaded_file_id = file_id
+                pdf_hash = ExtractedTextCache.file_hash(uploaded_file)
+            else:
+                pdf_hash = st.session_state.pdf_hash
+            
+            if pdf_hash != st.session_state.pdf_hash:
                 st.session_state.uploaded_file = uploaded_file
-                with st.spinner("Extracting text from PDF..."):
-                    st.session_state.extracted_text = self.pdf_processor.extract_text(uploaded_file)
+                st.session_state.pdf_hash = pdf_hash
+                progress = st.sidebar.progress(0.0, text="Extracting text from PDF...")
+                
+                def report_progress(page_no: int, total_pages: int):
+                    progress.progress(min(page_no / max(total_pages, 1), 1.0),
+                                      text=f"Extracted page {page_no} of {total_pages}")
+                
+                with self.profile('extraction'):
+                    text, pdf_info = self.pdf_processor.extract_text_and_info(
+                        uploaded_file, report_progress, content_hash=pdf_hash
+                    )
+                st.session_state.extracted_text = text
+                st.session_state.pdf_info = pdf_info
+                progress.empty()
                 st.success("PDF processed successfully!")
         
         # Strategy selection
         st.sidebar.subheader("🔧 Chunking Strategy")
         strategy = st.sidebar.selectbox(
             "Select Strategy",
-            list(self.strategies.keys()),
-            index=list(self.strategies.keys()).index(st.session_state.current_strategy)
+            list(STRATEGY_NAMES.keys()),
+            index=list(STRATEGY_NAMES.keys()).index(st.session_state.current_strategy)
         )
         
         if strategy != st.session_state.current_strategy:
             st.session_state.current_strategy = strategy
+            self.discard_chunk_store()
             st.session_state.chunks = []  # Clear previous chunks
         
         # Strategy-specific parameters
         self.render_strategy_parameters(strategy)
         
+        st.session_state.incremental = st.sidebar.checkbox(
+            "Incremental re-chunking", value=True,
+            help="After re-uploading an edited PDF, re-chunk only the paragraphs that changed"
+        )
+        st.session_state.use_chunk_store = st.sidebar.checkbox(
+            "Memory-mapped chunk store", value=False,
+            help="Keep chunks in memory-mapped files on disk instead of in memory (for very large documents)"
+        )
+        
         # Processing button
         if st.sidebar.button("🚀 Process Document", type="primary"):
-            if st.session_state.extracted_text:
+            if self.has_document():
                 self.process_document(strategy)
             else:
                 st.sidebar.error("Please upload a PDF first!")
     
+    def render_profiling_options(self):
+        st.session_state.profiling = st.sidebar.checkbox(
+            "Profile processing", value=False,
+            help="Record time, CPU and allocations per pipeline phase; see the Performance view"
+        )
+        if not st.session_state.profiling:
+            return
+        
+        backends = {"None": None, "cProfile": "cprofile"}
+        if PYINSTRUMENT_AVAILABLE:
+            backends["pyinstrument"] = "pyinstrument"
+        backend_label = st.sidebar.selectbox(
+            "Profiler report", list(backends.keys()),
+            help="Also record a function-level report (slows processing down)"
+        )
+        st.session_state.profiler_backend = backends[backend_label]
+        st.session_state.profile_memory = st.sidebar.checkbox(
+            "Track peak memory per phase", value=False,
+            help="Uses tracemalloc, which slows Python code down noticeably"
+        )
+    
+    @contextmanager
+    def profile(self, run: str):
+        """Profile the enclosed pipeline run when profiling is enabled, keeping the result for the Performance view."""
+        if not st.session_state.get('profiling'):
+            yield
+            return
+        
+        with profile_pipeline(track_memory=st.session_state.get('profile_memory', False),
+                              backend=st.session_state.get('profiler_backend')) as profiler:
+            yield
+        st.session_state.profiles[run] = profiler
+    
     def render_strategy_parameters(self, strategy: str):
         st.sidebar.subheader("⚙️ Parameters")
         
@@ -148,22 +266,113 @@ class RAGChunkingApp:
         elif strategy == "Semantic Chunking":
             st.session_state.similarity_threshold = st.sidebar.slider("Similarity Threshold", 0.1, 0.9, 0.7)
             st.session_state.max_chunk_size = st.sidebar.slider("Max Chunk Size (tokens)", 200, 1000, 600)
+            segmentation_modes = {
+                "Adjacent boundaries (linear)": "adjacent",
+                "Clustering (quadratic)": "clustering"
+            }
+            mode_label = st.sidebar.selectbox("Segmentation Mode", list(segmentation_modes.keys()))
+            st.session_state.segmentation_mode = segmentation_modes[mode_label]
+            
+            if st.session_state.segmentation_mode == "adjacent":
+                st.session_state.window_size = st.sidebar.slider("Boundary Window (sentences)", 1, 5, 1)
+                use_percentile = st.sidebar.checkbox("Use percentile breakpoints", value=False)
+                st.session_state.breakpoint_percentile = (
+                    st.sidebar.slider("Breakpoint Percentile", 50, 99, 95) if use_percentile else None
+                )
+            
+            embedding_dtypes = {
+                "float32 (full precision)": "float32",
+                "float16 (1/2 memory)": "float16",
+                "int8 (1/4 memory)": "int8"
+            }
+            dtype_label = st.sidebar.selectbox("Embedding Precision", list(embedding_dtypes.keys()))
+            st.session_state.embedding_dtype = embedding_dtypes[dtype_label]
+            st.session_state.embedding_batch_size = st.sidebar.select_slider(
+                "Embedding Batch Size", options=[8, 16, 32, 64, 128, 256], value=64
+            )
+        
+        elif strategy == "Token-Budget Packing":
+            st.session_state.max_tokens = st.sidebar.slider("Token Budget (tokens)", 100, 1000, 512)
+            packing_modes = {
+                "Greedy (linear)": "greedy",
+                "Optimal (dynamic programming)": "optimal"
+            }
+            mode_label = st.sidebar.selectbox("Packing Mode", list(packing_modes.keys()))
+            st.session_state.packing_mode = packing_modes[mode_label]
     
     def process_document(self, strategy: str):
-        with st.spinner(f"Processing document with {strategy} strategy..."):
-            chunker = self.strategies[strategy]
+        with st.spinner(f"Processing document with {strategy} strategy..."), self.profile('processing'):
+            chunker = get_shared_strategy(STRATEGY_NAMES[strategy])
             
             # Get parameters from session state
             params = self.get_strategy_params(strategy)
             
-            # Process chunks
-            st.session_state.chunks = chunker.chunk_text(
-                st.session_state.extracted_text, 
-                **params
-            )
+            # Process chunks, reusing the previous run's chunks for unchanged paragraphs when possible
+            text = self.document_text()
+            previous = st.session_state.chunk_source
+            if (st.session_state.get('incremental') and st.session_state.chunks and previous
+                    and previous[:2] == (strategy, params)):
+                previous_text = previous[2] if previous[2] is not None else st.session_state.chunks.document_text()
+                incremental_chunker = IncrementalChunker(chunker)
+                chunks = incremental_chunker.chunk_text(text, previous_text, st.session_state.chunks, **params)
+                stats = incremental_chunker.last_stats
+                if stats['mode'] == 'incremental':
+                    st.info(f"Reused {stats['reused_chunks']} chunks; re-chunked {stats['rechunked_chars']:,} "
+                            f"of {stats['total_chars']:,} characters.")
+            else:
+                chunks = chunker.chunk_text(
+                    text, 
+                    **params
+                )
+            
+            # Keep chunk lists in columnar form across reruns; lazy views are already compact
+            use_store = st.session_state.get('use_chunk_store')
+            if use_store:
+                chunks = self.store_chunks(chunks, text)
+            elif isinstance(chunks, list):
+                chunks = ChunkTable.from_chunks(chunks, text)
+            self.discard_chunk_store()
+            st.session_state.chunks = chunks
+            # With a store, the source text lives only in the store's files and is read back from there
+            st.session_state.extracted_text = "" if use_store else text
+            st.session_state.chunk_source = (strategy, params, None if use_store else text)
+            st.session_state.chunk_export = None
+            st.session_state.chunk_retriever = None
             
             st.success(f"Document processed! Generated {len(st.session_state.chunks)} chunks.")
     
+    def store_chunks(self, chunks, text: str) -> ChunkStore:
+        """Write chunks to a new memory-mapped store; only the rows a view reads are loaded."""
+        remove_stale_chunk_stores()
+        directory = get_cache_dir('chunk_stores', uuid.uuid4().hex)
+        document = getattr(st.session_state.uploaded_file, 'name', None)
+        return ChunkStore.from_chunks(directory, chunks, text, document=document)
+    
+    def discard_chunk_store(self):
+        """Close and delete the files of the current chunk store, if chunks are kept in one."""
+        chunks = st.session_state.chunks
+        if isinstance(chunks, ChunkStore):
+            # The store may hold the only copy of the document text
+            if not st.session_state.extracted_text:
+                st.session_state.extracted_text = chunks.document_text()
+            chunks.close()
+            shutil.rmtree(chunks.directory, ignore_errors=True)
+    
+    def has_document(self) -> bool:
+        """Whether a document was uploaded (its text may be held by the chunk store)."""
+        return bool(st.session_state.extracted_text) or isinstance(st.session_state.chunks, ChunkStore)
+    
+    def document_text(self) -> str:
+        """
+        The current document's text.
+        
+        While chunks are kept in a chunk store, session state does not hold the
+        text; it is decoded from the store's memory-mapped file on demand.
+        """
+        if not st.session_state.extracted_text and isinstance(st.session_state.chunks, ChunkStore):
+            return st.session_state.chunks.document_text()
+        return st.session_state.extracted_text
+    
     def get_strategy_params(self, strategy: str) -> Dict[str, Any]:
         params = {}
         
@@ -173,7 +382,8 @@ class RAGChunkingApp:
         elif strategy == "Sliding Window":
             params['chunk_size'] = st.session_state.get('chunk_size', 512)
             params['overlap'] = st.session_state.get('overlap', 50)
-            
+            params['lazy'] = True  # Chunk dicts are built only for the chunks that get rendered
+        
         elif strategy == "Sentence-Based":
             params['sentences_per_chunk'] = st.session_state.get('sentences_per_chunk', 5)
             
@@ -183,49 +393,57 @@ class RAGChunkingApp:
         elif strategy == "Semantic Chunking":
             params['similarity_threshold'] = st.session_state.get('similarity_threshold', 0.7)
             params['max_chunk_size'] = st.session_state.get('max_chunk_size', 600)
+            params['segmentation_mode'] = st.session_state.get('segmentation_mode', 'adjacent')
+            if params['segmentation_mode'] == 'adjacent':
+                params['window_size'] = st.session_state.get('window_size', 1)
+                params['breakpoint_percentile'] = st.session_state.get('breakpoint_percentile')
+            params['batch_size'] = st.session_state.get('embedding_batch_size', 64)
+            params['embedding_dtype'] = st.session_state.get('embedding_dtype', 'float32')
+        
+        elif strategy == "Token-Budget Packing":
+            params['max_tokens'] = st.session_state.get('max_tokens', 512)
+            params['mode'] = st.session_state.get('packing_mode', 'greedy')
         
         return params
     
     def render_main_content(self):
-        if not st.session_state.extracted_text:
+        if not self.has_document():
             st.info("👆 Please upload a PDF document to get started!")
             return
         
-        # Create tabs for different views
-        tab1, tab2, tab3, tab4 = st.tabs(["📄 Document Preview", "🔍 Chunks", "📊 Analytics", "🎨 Visualizations"])
-        
-        with tab1:
-            self.render_document_preview()
-        
-        with tab2:
-            self.render_chunks_view()
-        
-        with tab3:
-            self.render_analytics()
-        
-        with tab4:
-            self.render_visualizations()
+        # A view selector instead of st.tabs: tabs run every view on each rerun,
+        # while only the selected view's figures are computed here
+        views = {
+            "📄 Document Preview": self.render_document_preview,
+            "🔍 Chunks": self.render_chunks_view,
+            "📊 Analytics": self.render_analytics,
+            "🎨 Visualizations": self.render_visualizations,
+            "⏱️ Performance": self.render_performance,
+        }
+        view = st.radio("View", list(views), horizontal=True, label_visibility="collapsed", key="main_view")
+        views[view]()
     
     def render_document_preview(self):
         st.subheader("📄 Original Document")
         
         # Document statistics
+        text = self.document_text()
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Characters", len(st.session_state.extracted_text))
+            st.metric("Total Characters", len(text))
         with col2:
-            st.metric("Total Words", len(st.session_state.extracted_text.split()))
+            st.metric("Total Words", len(text.split()))
         with col3:
-            tokens = self.tokenizer_utils.count_tokens(st.session_state.extracted_text)
+            tokens = self.tokenizer_utils.tokenize_document(text).total_tokens
             st.metric("Total Tokens", tokens)
         with col4:
-            paragraphs = len([p for p in st.session_state.extracted_text.split('\n\n') if p.strip()])
+            paragraphs = len([p for p in text.split('\n\n') if p.strip()])
             st.metric("Paragraphs", paragraphs)
         
         # Text preview
         st.text_area(
             "Document Content (First 2000 characters)",
-            st.session_state.extracted_text[:2000] + "..." if len(st.session_state.extracted_text) > 2000 else st.session_state.extracted_text,
+            text[:2000] + "..." if len(text) > 2000 else text,
             height=300
         )
     
@@ -239,29 +457,96 @@ class RAGChunkingApp:
         # Strategy explanation
         self.render_strategy_explanation(st.session_state.current_strategy)
         
-        # Chunk statistics
-        total_chunks = len(st.session_state.chunks)
-        avg_tokens = np.mean([chunk.get('token_count', 0) for chunk in st.session_state.chunks])
+        # Chunk statistics, computed column-wise so no chunk is materialized
+        chunks = st.session_state.chunks
+        total_chunks = len(chunks)
+        avg_tokens = chunk_column(chunks, 'token_count').mean()
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Chunks", total_chunks)
+            st.metric("Total Chunks", f"{total_chunks:,}")
         with col2:
             st.metric("Average Tokens/Chunk", f"{avg_tokens:.1f}")
         with col3:
-            overlap_chunks = len([c for c in st.session_state.chunks if c.get('overlap', 0) > 0])
-            st.metric("Chunks with Overlap", overlap_chunks)
+            overlap_chunks = int(np.count_nonzero(chunk_column(chunks, 'overlap') > 0))
+            st.metric("Chunks with Overlap", f"{overlap_chunks:,}")
+        if isinstance(chunks, ChunkStore):
+            st.caption(f"Chunks are memory-mapped from disk ({chunks.disk_bytes / 2 ** 20:.1f} MB).")
         
-        # Chunk display controls
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            max_chunks = st.slider("Max chunks to display", 1, min(50, total_chunks), min(10, total_chunks))
+        # Chunk display controls: one page of chunks is materialized per rerun
+        col1, col2, col3 = st.columns([2, 1, 1])
         with col2:
+            page_size = st.selectbox("Chunks per page", [10, 25, 50], index=0)
+        n_pages = max(1, -(-total_chunks // page_size))
+        with col1:
+            page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1)
+        with col3:
             show_metadata = st.checkbox("Show metadata", value=True)
         
         # Display chunks
-        for i, chunk in enumerate(st.session_state.chunks[:max_chunks]):
-            self.render_chunk(chunk, i, show_metadata)
+        first = (int(page) - 1) * page_size
+        for offset, chunk in enumerate(chunks[first:first + page_size]):
+            self.render_chunk(chunk, first + offset, show_metadata)
+        
+        self.render_chunk_search()
+        self.render_chunk_export()
+    
+    def render_chunk_search(self):
+        st.subheader("🔎 Search Chunks")
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            query = st.text_input("Query", placeholder="Ask a question about the document")
+        with col2:
+            top_k = st.number_input("Results", min_value=1, max_value=20, value=3)
+        
+        if not query:
+            return
+        
+        # The index is built once per set of chunks and reused for every query
+        if st.session_state.chunk_retriever is None:
+            with st.spinner("Embedding and indexing chunks..."):
+                retriever = ChunkRetriever()
+                retriever.index_chunks(st.session_state.chunks)
+                st.session_state.chunk_retriever = retriever
+        retriever = st.session_state.chunk_retriever
+        
+        if retriever.embedder.model is None:
+            st.caption("Embedding model not available; ranking with hashed term-frequency vectors.")
+        for chunk, score in retriever.search(query, int(top_k)):
+            st.markdown(f"**Score: {score:.3f}**")
+            self.render_chunk(chunk, chunk['chunk_id'], show_metadata=False)
+    
+    def render_chunk_export(self):
+        st.subheader("💾 Export Chunks")
+        
+        formats = ["JSONL", "Parquet"] if PYARROW_AVAILABLE else ["JSONL"]
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            export_format = st.selectbox("Export format", formats)
+            if not PYARROW_AVAILABLE:
+                st.caption("Install pyarrow to export Parquet.")
+        with col2:
+            prepare = st.button("Prepare export")
+        
+        # Exports are built on request rather than on every rerun
+        if prepare:
+            uploaded_file = st.session_state.uploaded_file
+            document = getattr(uploaded_file, 'name', None)
+            if export_format == "Parquet":
+                buffer = io.BytesIO()
+                with ArrowChunkWriter(buffer) as writer:
+                    writer.write(st.session_state.chunks, document=document)
+                st.session_state.chunk_export = ("chunks.parquet", buffer.getvalue(), "application/vnd.apache.parquet")
+            else:
+                buffer = io.StringIO()
+                with JSONLChunkWriter(buffer) as writer:
+                    writer.write(st.session_state.chunks, document=document)
+                st.session_state.chunk_export = ("chunks.jsonl", buffer.getvalue(), "application/x-ndjson")
+        
+        if st.session_state.chunk_export:
+            file_name, data, mime = st.session_state.chunk_export
+            st.download_button(f"Download {file_name}", data, file_name=file_name, mime=mime)
     
     def render_chunk(self, chunk: Dict[str, Any], index: int, show_metadata: bool):
         with st.container():
@@ -321,6 +606,13 @@ class RAGChunkingApp:
                 "pros": ["Maintains semantic coherence", "Adaptive to content", "Better retrieval quality"],
                 "cons": ["Computationally expensive", "Requires embedding models", "Complex implementation"],
                 "use_cases": ["High-quality RAG systems", "Complex documents", "When semantic coherence is priority"]
+            },
+            "Token-Budget Packing": {
+                "description": "Packs whole sentences into chunks as close to a token budget as possible without exceeding it.",
+                "how_it_works": "Looks up per-sentence token counts and fills chunks greedily, or picks the fewest, most evenly filled chunks with dynamic programming.",
+                "pros": ["Chunks never exceed the budget", "Fewer, fuller chunks", "Preserves sentence integrity"],
+                "cons": ["Ignores topic boundaries", "Over-long sentences are split", "Optimal mode is slower"],
+                "use_cases": ["Embedding models with hard token limits", "Minimizing embedding cost and index size", "General-purpose RAG ingestion"]
             }
         }
         
@@ -359,21 +651,21 @@ class RAGChunkingApp:
         st.subheader("📊 Chunking Analytics")
         
         # Prepare data for analysis
-        chunk_data = []
-        for i, chunk in enumerate(st.session_state.chunks):
-            chunk_data.append({
-                'chunk_id': i,
-                'token_count': chunk.get('token_count', 0),
-                'character_count': len(chunk['content']),
-                'word_count': len(chunk['content'].split()),
-                'overlap': chunk.get('overlap', 0),
-                'start_pos': chunk.get('start_pos', 0),
-                'end_pos': chunk.get('end_pos', 0)
-            })
-        
-        df = pd.DataFrame(chunk_data)
-        
-        # Analytics visualizations
+        chunks = st.session_state.chunks
+        df = pd.DataFrame({
+            'chunk_id': np.arange(len(chunks)),
+            'token_count': chunk_column(chunks, 'token_count'),
+            'overlap': chunk_column(chunks, 'overlap'),
+            'start_pos': chunk_column(chunks, 'start_pos'),
+            'end_pos': chunk_column(chunks, 'end_pos'),
+        })
+        # Sizes come from the offset columns and the document's word index, never from chunk content
+        document = self.tokenizer_utils.tokenize_document(self.document_text())
+        df['character_count'] = df['end_pos'] - df['start_pos']
+        df['word_count'] = document.word_counts(df['start_pos'].to_numpy(), df['end_pos'].to_numpy())
+        
+        # Analytics visualizations (WebGL traces, and lines instead of bars for large chunk sets)
+        detailed = len(df) <= MAX_DETAILED_CHUNKS
         col1, col2 = st.columns(2)
         
         with col1:
@@ -382,17 +674,20 @@ class RAGChunkingApp:
             st.plotly_chart(fig, use_container_width=True)
             
             # Token count over chunks
-            fig = px.line(df, x='chunk_id', y='token_count', title='Token Count per Chunk')
+            fig = px.line(df, x='chunk_id', y='token_count', title='Token Count per Chunk', render_mode='webgl')
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Word vs Token relationship
-            fig = px.scatter(df, x='word_count', y='token_count', title='Words vs Tokens')
+            fig = px.scatter(df, x='word_count', y='token_count', title='Words vs Tokens', render_mode='webgl')
             st.plotly_chart(fig, use_container_width=True)
             
             # Chunk overlap analysis
             if df['overlap'].sum() > 0:
-                fig = px.bar(df, x='chunk_id', y='overlap', title='Overlap per Chunk')
+                if detailed:
+                    fig = px.bar(df, x='chunk_id', y='overlap', title='Overlap per Chunk')
+                else:
+                    fig = px.line(df, x='chunk_id', y='overlap', title='Overlap per Chunk', render_mode='webgl')
                 st.plotly_chart(fig, use_container_width=True)
         
         # Summary statistics
@@ -412,9 +707,78 @@ class RAGChunkingApp:
             st.metric("Avg Overlap", f"{df['overlap'].mean():.1f}")
         
         with col4:
-            coverage = (df['token_count'].sum() - df['overlap'].sum()) / self.tokenizer_utils.count_tokens(st.session_state.extracted_text)
+            coverage = (df['token_count'].sum() - df['overlap'].sum()) / document.total_tokens
             st.metric("Coverage", f"{coverage:.1%}")
             st.metric("Efficiency", f"{1 - df['overlap'].sum() / df['token_count'].sum():.1%}")
+        
+        self.render_retrieval_evaluation()
+    
+    def render_retrieval_evaluation(self):
+        st.subheader("🎯 Retrieval Evaluation")
+        st.markdown("Upload questions with answers found in the document to compare strategies by recall@k and MRR.")
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            qa_file = st.file_uploader("Question / answer set (JSON or JSONL)", type=['json', 'jsonl'])
+        with col2:
+            top_k = st.select_slider("Top k", options=[1, 3, 5, 10, 20], value=5)
+            use_model = st.checkbox("Use embedding model", value=True,
+                                    help="Uncheck to rank chunks with hashed term-frequency vectors")
+        
+        if qa_file is not None and st.button("Run evaluation"):
+            try:
+                qa_items = parse_qa(qa_file.getvalue().decode('utf-8'))
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"Could not read the question set: {str(e)}")
+                return
+            
+            text = self.document_text()
+            questions = resolve_answer_spans(text, qa_items)
+            if not questions:
+                st.warning("None of the answers could be located in the document.")
+                return
+            if len(questions) < len(qa_items):
+                st.warning(f"{len(qa_items) - len(questions)} answers were not found in the document and are skipped.")
+            
+            # The current strategy is evaluated with the sidebar parameters it was chunked with
+            strategy_params = {}
+            if st.session_state.chunk_source:
+                strategy, params, _ = st.session_state.chunk_source
+                strategy_params[STRATEGY_NAMES[strategy]] = {key: value for key, value in params.items() if key != 'lazy'}
+            
+            ks = sorted({1, top_k})
+            with st.spinner("Chunking, embedding and searching with every strategy..."):
+                embedder = TextEmbedder(use_model=use_model)
+                results = evaluate_strategies(text, questions, embedder=embedder, ks=ks,
+                                              strategy_params=strategy_params)
+            st.session_state.retrieval_evaluation = (embedder.name, len(questions), results)
+        
+        if st.session_state.retrieval_evaluation:
+            embedder_name, n_questions, results = st.session_state.retrieval_evaluation
+            labels = {name: label for label, name in STRATEGY_NAMES.items()}
+            rows = []
+            for result in results:
+                row = {'Strategy': labels.get(result['strategy'], result['strategy']), 'Chunks': result['chunks']}
+                row.update({f"Recall@{k}": result['recall'][k] for k in result['recall']})
+                row.update({
+                    'MRR': result['mrr'],
+                    'Chunking (s)': result['chunk_seconds'],
+                    'Embedding (s)': result['embed_seconds'],
+                    'Index (KB)': result['index_bytes'] / 1024,
+                    'Query (ms)': result['query_ms'],
+                    'MRR per CPU-second': result['mrr_per_cpu_second'],
+                })
+                rows.append(row)
+            
+            df = pd.DataFrame(rows)
+            st.caption(f"{n_questions} questions, {embedder_name} embeddings")
+            st.dataframe(df.style.format(precision=3), use_container_width=True)
+            
+            recall_column = [column for column in df.columns if column.startswith('Recall@')][-1]
+            fig = px.scatter(df, x='Chunking (s)', y=recall_column, size='Chunks', text='Strategy',
+                             title=f'{recall_column} vs Chunking Time')
+            fig.update_traces(textposition='top center')
+            st.plotly_chart(fig, use_container_width=True)
     
     def render_visualizations(self):
         if not st.session_state.chunks:
@@ -430,43 +794,110 @@ class RAGChunkingApp:
             self.render_basic_visualizations()
     
     def render_semantic_visualizations(self):
-        st.info("🔄 Generating semantic visualizations...")
+        chunker = get_shared_strategy(STRATEGY_NAMES["Semantic Chunking"])
+        chunks = st.session_state.chunks
+        
+        # Chunk embeddings come from the embedding cache and the similarity matrix,
+        # PCA and KMeans results are memoized per embedding matrix, so switching
+        # views does not recompute them
+        embeddings = chunker.embed_chunks(chunks)
+        if embeddings is None:
+            st.markdown("**Semantic Similarity Heatmap**")
+            st.info("Semantic visualizations need the sentence-transformers embedding model.")
+            self.render_basic_visualizations()
+            return
         
-        # This would require the semantic chunker to store embeddings
-        # For now, we'll show a placeholder
-        st.markdown("**Semantic Similarity Heatmap**")
-        st.info("Advanced semantic visualizations will be available after processing with semantic chunking.")
+        coherence = chunker.analyze_semantic_coherence(chunks, embeddings=embeddings)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Mean Inter-Chunk Similarity", f"{coherence['average_inter_chunk_similarity']:.3f}")
+        with col2:
+            st.metric("Similarity Std Dev", f"{coherence['similarity_std']:.3f}")
+        with col3:
+            st.metric("Similarity Range", f"{coherence['min_similarity']:.2f} – {coherence['max_similarity']:.2f}")
+        
+        fig = self.viz_utils.create_similarity_heatmap(embeddings)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if len(chunks) >= 2:
+            # A slider needs min < max, so two chunks always make two clusters
+            n_clusters = 2
+            if len(chunks) > 2:
+                n_clusters = st.slider("Clusters", 2, min(10, len(chunks)), min(5, len(chunks)))
+            fig = self.viz_utils.create_clustering_visualization(embeddings, n_clusters=n_clusters)
+            st.plotly_chart(fig, use_container_width=True)
     
     def render_basic_visualizations(self):
-        # Chunk size heatmap
-        chunk_sizes = [chunk.get('token_count', 0) for chunk in st.session_state.chunks]
-        
-        # Create a simple heatmap of chunk sizes
-        fig = go.Figure(data=go.Heatmap(
-            z=[chunk_sizes],
-            colorscale='Viridis',
-            colorbar=dict(title="Token Count")
-        ))
-        fig.update_layout(title="Chunk Size Heatmap", xaxis_title="Chunk Index", yaxis_title="")
+        # Chunk size heatmap (binned for large chunk sets)
+        fig = self.viz_utils.create_chunk_size_heatmap(st.session_state.chunks)
         st.plotly_chart(fig, use_container_width=True)
         
-        # Chunk position timeline
-        positions = [(chunk.get('start_pos', 0), chunk.get('end_pos', 0)) for chunk in st.session_state.chunks]
+        # Chunk position timeline: one NaN-separated trace however many chunks there are
+        fig = self.viz_utils.create_chunk_timeline(st.session_state.chunks)
+        fig.update_layout(title="Chunk Position Timeline")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def render_performance(self):
+        profiles = st.session_state.profiles
+        if not profiles:
+            st.info("Enable 'Profile processing' in the sidebar, then upload or process a document to see "
+                    "where the time goes!")
+            return
+        
+        run_labels = {"processing": "Chunking run", "extraction": "PDF extraction"}
+        for run, label in run_labels.items():
+            if run in profiles:
+                st.subheader(f"⏱️ {label}")
+                self.render_profile(profiles[run], run)
+    
+    def render_profile(self, profiler, run: str):
+        rows = profiler.report()
+        if not rows:
+            st.info("No instrumented phase ran (the results came from a cache).")
+            return
         
-        fig = go.Figure()
-        for i, (start, end) in enumerate(positions):
-            fig.add_trace(go.Scatter(
-                x=[start, end],
-                y=[i, i],
-                mode='lines+markers',
-                name=f'Chunk {i+1}',
-                showlegend=False
-            ))
+        df = pd.DataFrame(rows)
+        # Self time excludes nested phases, so it adds up to the instrumented part of the run
+        other_seconds = max(profiler.total_seconds - df['self_seconds'].sum(), 0.0)
+        dominant = df.loc[df['self_seconds'].idxmax()]
         
-        fig.update_layout(title="Chunk Position Timeline", xaxis_title="Character Position", yaxis_title="Chunk Index")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Time", f"{profiler.total_seconds:.3f} s")
+        with col2:
+            st.metric("Dominant Phase", dominant['phase'],
+                      f"{dominant['self_seconds'] / max(profiler.total_seconds, 1e-9):.0%} of total", delta_color="off")
+        with col3:
+            st.metric("Outside Instrumented Phases", f"{other_seconds:.3f} s")
+        
+        timings = df.melt(id_vars='phase', value_vars=['wall_seconds', 'self_seconds', 'cpu_seconds'],
+                          var_name='measure', value_name='seconds')
+        fig = px.bar(timings, x='phase', y='seconds', color='measure', barmode='group',
+                     title='Time per Phase (wall includes nested phases; self excludes them)')
         st.plotly_chart(fig, use_container_width=True)
+        
+        st.dataframe(df, use_container_width=True, hide_index=True, column_config={
+            'wall_seconds': st.column_config.NumberColumn("wall (s)", format="%.4f"),
+            'self_seconds': st.column_config.NumberColumn("self (s)", format="%.4f"),
+            'cpu_seconds': st.column_config.NumberColumn("CPU (s)", format="%.4f"),
+            'allocated_blocks': st.column_config.NumberColumn(
+                "net allocated blocks", help="Python memory blocks still allocated when the phase ended"),
+            'peak_mb': st.column_config.NumberColumn("peak memory (MB)", format="%.1f"),
+        })
+        
+        if profiler.backend_text:
+            with st.expander(f"{profiler.backend} report"):
+                st.code(profiler.backend_text, language=None)
+                st.download_button("📥 Download report", profiler.backend_text,
+                                   file_name=f"{run}_{profiler.backend}.txt", mime="text/plain", key=f"{run}_report")
+                if profiler.backend_html:
+                    st.download_button("📥 Download interactive report", profiler.backend_html,
+                                       file_name=f"{run}_pyinstrument.html", mime="text/html", key=f"{run}_html")
     
     def run(self):
+        # Each rerun marks this session's chunk store as in use, so stale-store cleanup skips it
+        if isinstance(st.session_state.chunks, ChunkStore):
+            st.session_state.chunks.touch()
         self.render_header()
         self.render_sidebar()
         self.render_main_content()
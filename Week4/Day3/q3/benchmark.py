@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the RAG chunking strategies.
+
+Runs every strategy over synthetic and/or real corpora and reports chunks/sec,
+tokens/sec, peak RSS and per-phase timings (split, tokenize, embed, group) as a
+table and as JSON. Runs offline: the embedding model is only loaded from the
+local Hugging Face cache, and semantic chunking falls back to its
+embedding-free path when the model is not available.
+
+With --index-sizes it also measures query latency of the retrieval indexes
+(exact and IVF) over synthetic embedding collections of the given sizes.
+
+Usage:
+    python benchmark.py --sizes 10KB 1MB 10MB --output baseline.json
+    python benchmark.py --files manual.pdf notes.txt --compare baseline.json
+    python benchmark.py --index-sizes 100000 1000000 --index-dim 384
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Never reach the network for models; benchmarks must be reproducible offline
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+from utils.documents import format_table, load_document
+
+DEFAULT_SIZES = ['10KB', '100KB', '1MB', '10MB', '50MB']
+
+STRATEGY_PARAMS = {
+    'fixed_length': {'chunk_size': 512},
+    'sliding_window': {'chunk_size': 512, 'overlap': 50},
+    'sentence_based': {'sentences_per_chunk': 5},
+    'paragraph_based': {'paragraphs_per_chunk': 1},
+    'semantic_chunking': {'similarity_threshold': 0.7, 'max_chunk_size': 600},
+    'token_budget': {'max_tokens': 512},
+}
+
+# Benchmark phase columns and the utils.profiling phases they report
+BENCHMARK_PHASES = {
+    'split': 'segmentation',
+    'tokenize': 'tokenization',
+    'embed': 'embedding',
+    'group': 'clustering',
+}
+
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but "
+    "have an they you were her she there been one all we their has would when if so no will more "
+    "system data model document retrieval chunk token embedding vector index query answer context "
+    "semantic sentence paragraph language network training evaluation performance memory latency "
+    "research analysis method result approach structure information knowledge process pipeline"
+).split()
+
+def parse_size(size: str) -> int:
+    """Parse sizes such as '10KB' or '50MB' into bytes."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([KMG]?B)?', size.strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {size}")
+    multiplier = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}[match.group(2) or 'B']
+    return int(float(match.group(1)) * multiplier)
+
+def generate_synthetic_text(n_chars: int, seed: int = 42) -> str:
+    """Generate deterministic English-like text with sentences and paragraphs."""
+    rng = random.Random(seed)
+    paragraphs = []
+    total = 0
+    while total < n_chars:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(WORDS, k=rng.randint(8, 25))
+            sentence = ' '.join(words)
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice('..!?'))
+        paragraph = ' '.join(sentences)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)[:n_chars]
+
+def load_corpus(spec: Dict[str, Any]) -> str:
+    """Load or generate the text for a corpus spec."""
+    if spec['kind'] == 'synthetic':
+        return generate_synthetic_text(spec['size'], spec.get('seed', 42))
+    
+    return load_document(spec['path'])
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_case(strategy_name: str, corpus: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Chunk one corpus with one strategy and collect metrics."""
+    from strategies.registry import create_strategy
+    from utils import segmentation as segmentation_module
+    from utils import tokenizer as tokenizer_module
+    from utils.profiling import profile_pipeline
+    
+    text = load_corpus(corpus)
+    chunker = create_strategy(strategy_name)
+    
+    # Measure a cold run: no tokens or segmentation shared from a previous case
+    tokenizer_module._DOCUMENT_CACHE.clear()
+    segmentation_module._SEGMENTATION_CACHE.clear()
+    
+    with profile_pipeline() as profiler:
+        start = time.perf_counter()
+        chunks = chunker.chunk_text(text, **params)
+        elapsed = time.perf_counter() - start
+    
+    document_tokens = chunker.tokenizer.tokenize_document(text).total_tokens
+    return {
+        'strategy': strategy_name,
+        'corpus': corpus['name'],
+        'chars': len(text),
+        'tokens': document_tokens,
+        'chunks': len(chunks),
+        'seconds': elapsed,
+        'chunks_per_sec': len(chunks) / elapsed if elapsed > 0 else None,
+        'tokens_per_sec': document_tokens / elapsed if elapsed > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'phases': {column: profiler.phase_seconds(phase) for column, phase in BENCHMARK_PHASES.items()},
+        'params': params,
+        'embedding_model_loaded': getattr(chunker, 'embedding_model', None) is not None,
+    }
+
+def synthetic_embeddings(n_vectors: int, dim: int, seed: int = 42, n_topics: int = 1000,
+                         block_size: int = 65536):
+    """Clustered unit vectors standing in for chunk embeddings, generated block by block."""
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    vectors = np.empty((n_vectors, dim), dtype=np.float32)
+    for start in range(0, n_vectors, block_size):
+        end = min(start + block_size, n_vectors)
+        block = topics[rng.integers(0, n_topics, end - start)]
+        block += rng.standard_normal(block.shape, dtype=np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        vectors[start:end] = block
+    return vectors
+
+def run_index_case(n_vectors: int, dim: int, n_queries: int = 100, k: int = 10, n_probe: int = 8,
+                   seed: int = 42) -> List[Dict[str, Any]]:
+    """Measure build time, single-query latency and recall of the exact and IVF indexes."""
+    import numpy as np
+    from retrieval.index import IVFIndex, VectorIndex
+    
+    vectors = synthetic_embeddings(n_vectors, dim, seed)
+    rng = np.random.default_rng(seed + 1)
+    queries = vectors[rng.choice(n_vectors, n_queries, replace=False)] + 0.1 * rng.standard_normal(
+        (n_queries, dim), dtype=np.float32)
+    
+    results = []
+    exact_ids = None
+    for kind in ('flat', 'ivf'):
+        start = time.perf_counter()
+        index = VectorIndex.build(vectors) if kind == 'flat' else IVFIndex.build(vectors, n_probe=n_probe, seed=seed)
+        build_seconds = time.perf_counter() - start
+        
+        # One query at a time: the latency a single request sees
+        latencies = []
+        ids = np.empty((n_queries, min(k, n_vectors)), dtype=np.int64)
+        for row, query in enumerate(queries):
+            start = time.perf_counter()
+            ids[row] = index.search(query, k)[1][0]
+            latencies.append(time.perf_counter() - start)
+        if exact_ids is None:
+            exact_ids = ids
+        
+        recall = np.mean([len(set(found) & set(exact)) / len(exact) for found, exact in zip(ids, exact_ids)])
+        results.append({
+            'index': kind,
+            'vectors': n_vectors,
+            'dim': dim,
+            'build_seconds': build_seconds,
+            'p50_ms': 1000 * float(np.percentile(latencies, 50)),
+            'p95_ms': 1000 * float(np.percentile(latencies, 95)),
+            'recall_at_k': float(recall),
+            'k': k,
+            'index_mb': index.nbytes / (1024 * 1024),
+            'peak_rss_mb': peak_rss_mb(),
+        })
+    return results
+
+def run_case_isolated(strategy_name: str, corpus: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a case in a fresh process so peak RSS and caches are per case."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (strategy_name, corpus, params))
+
+def build_corpora(sizes: List[str], files: List[str], seed: int) -> List[Dict[str, Any]]:
+    corpora = [
+        {'kind': 'synthetic', 'name': f'synthetic-{size}', 'size': parse_size(size), 'seed': seed}
+        for size in sizes
+    ]
+    corpora += [{'kind': 'file', 'name': os.path.basename(path), 'path': os.path.abspath(path)} for path in files]
+    return corpora
+
+def format_results(results: List[Dict[str, Any]], baseline: Optional[Dict[tuple, Dict[str, Any]]] = None) -> str:
+    """Render results as a plain-text table."""
+    headers = ['strategy', 'corpus', 'chunks', 'seconds', 'chunks/s', 'tokens/s', 'rss MB',
+               'split', 'tokenize', 'embed', 'group']
+    if baseline:
+        headers.append('vs baseline')
+    
+    rows = []
+    for result in results:
+        phases = result['phases']
+        row = [
+            result['strategy'], result['corpus'], str(result['chunks']), f"{result['seconds']:.3f}",
+            f"{result['chunks_per_sec'] or 0:,.0f}", f"{result['tokens_per_sec'] or 0:,.0f}",
+            f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else 'n/a',
+            f"{phases['split']:.3f}", f"{phases['tokenize']:.3f}", f"{phases['embed']:.3f}", f"{phases['group']:.3f}",
+        ]
+        if baseline:
+            previous = baseline.get((result['strategy'], result['corpus']))
+            row.append(f"{previous['seconds'] / result['seconds']:.2f}x" if previous and result['seconds'] else '-')
+        rows.append(row)
+    return format_table(headers, rows)
+
+def format_index_results(results: List[Dict[str, Any]]) -> str:
+    """Render index benchmark results as a plain-text table."""
+    headers = ['index', 'vectors', 'dim', 'build s', 'p50 ms', 'p95 ms', 'recall@k', 'index MB', 'rss MB']
+    rows = [[
+        result['index'], f"{result['vectors']:,}", str(result['dim']), f"{result['build_seconds']:.2f}",
+        f"{result['p50_ms']:.3f}", f"{result['p95_ms']:.3f}", f"{result['recall_at_k']:.3f}",
+        f"{result['index_mb']:,.1f}", f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else 'n/a',
+    ] for result in results]
+    return format_table(headers, rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RAG chunking strategies.")
+    parser.add_argument('--sizes', nargs='*', default=None,
+                        help=f"Synthetic corpus sizes (default: {' '.join(DEFAULT_SIZES)} unless --files is given)")
+    parser.add_argument('--files', nargs='*', default=[], help="Real corpora (.txt, .md or .pdf)")
+    parser.add_argument('--strategies', nargs='*', default=list(STRATEGY_PARAMS), choices=list(STRATEGY_PARAMS))
+    parser.add_argument('--seed', type=int, default=42, help="Seed for synthetic text")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Baseline JSON file to compare timings against")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Run all cases in this process (faster, but peak RSS is cumulative)")
+    parser.add_argument('--index-sizes', nargs='*', type=int, default=[],
+                        help="Benchmark retrieval indexes over this many synthetic embeddings")
+    parser.add_argument('--index-dim', type=int, default=384, help="Embedding dimension for --index-sizes")
+    parser.add_argument('--n-probe', type=int, default=8, help="Lists searched per query by the IVF index")
+    args = parser.parse_args()
+    
+    default_sizes = [] if args.files or args.index_sizes else DEFAULT_SIZES
+    sizes = args.sizes if args.sizes is not None else default_sizes
+    corpora = build_corpora(sizes, args.files, args.seed)
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r['strategy'], r['corpus']): r for r in json.load(f)['results']}
+    
+    # Keep embedding caches out of the user's cache so every run is cold; the directory
+    # is removed when the runs finish, and spawned case processes inherit it through the environment
+    with tempfile.TemporaryDirectory(prefix='rag_chunking_bench_') as cache_dir:
+        own_cache_dir = not os.environ.get('RAG_CHUNKING_CACHE_DIR')
+        if own_cache_dir:
+            os.environ['RAG_CHUNKING_CACHE_DIR'] = cache_dir
+        try:
+            results = []
+            for corpus in corpora:
+                for strategy_name in args.strategies:
+                    params = STRATEGY_PARAMS[strategy_name]
+                    print(f"Running {strategy_name} on {corpus['name']}...", file=sys.stderr)
+                    runner = run_case if args.in_process else run_case_isolated
+                    results.append(runner(strategy_name, corpus, params))
+            
+            index_results = []
+            for n_vectors in args.index_sizes:
+                print(f"Running retrieval indexes on {n_vectors:,} vectors...", file=sys.stderr)
+                index_results += run_index_case(n_vectors, args.index_dim, n_probe=args.n_probe, seed=args.seed)
+        finally:
+            if own_cache_dir:
+                del os.environ['RAG_CHUNKING_CACHE_DIR']
+    
+    if results:
+        print(format_results(results, baseline))
+    if index_results:
+        print(format_index_results(index_results))
+    
+    report = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0], 'results': results}
+    if index_results:
+        report['index_results'] = index_results
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Headless entry point for the RAG chunking engine.
+
+Chunks files or whole directories without the Streamlit UI and writes the
+chunks as JSONL to stdout, to a .jsonl / .parquet / .arrow file or to a
+memory-mapped chunk store directory (utils/chunk_store.py), or starts
+the streaming HTTP service (see service.py). Chunkers and their tokenizer and
+embedding models are created once per process and reused for every document.
+
+Usage:
+    python cli.py chunk report.pdf notes/ --strategy sentence_based --param sentences_per_chunk=3
+    python cli.py chunk corpus/ --strategy fixed_length --workers 4 --output chunks.parquet
+    python cli.py chunk corpus/ --strategy token_budget --store corpus_store/ --embed
+    python cli.py chunk report.pdf --strategy semantic_chunking --profile cprofile > /dev/null
+    python cli.py serve --port 8000 --preload fixed_length semantic_chunking
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable, Iterator, List
+
+from strategies.corpus import chunk_corpus
+from strategies.registry import STRATEGY_CLASSES
+from utils.chunk_store import ChunkStoreWriter
+from utils.export import JSONLChunkWriter, export_corpus
+from utils.profiling import PROFILER_BACKENDS, profile_pipeline
+
+DOCUMENT_EXTENSIONS = ('.pdf', '.txt', '.md')
+
+def iter_documents(paths: Iterable[str]) -> Iterator[str]:
+    """Expand files and directories (recursively, in sorted order) into document paths."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+
+def parse_params(items: List[str]) -> Dict[str, Any]:
+    """Parse key=value strategy parameters; values are JSON where possible (3, 0.7, true), else strings."""
+    params = {}
+    for item in items:
+        key, separator, value = item.partition('=')
+        if not separator or not key:
+            raise argparse.ArgumentTypeError(f"Invalid parameter '{item}', expected key=value")
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+    return params
+
+def run_chunk(args):
+    # Never reach the network for models; headless chunking must work offline
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    
+    try:
+        params = parse_params(args.param)
+        documents = list(iter_documents(args.paths))
+    except (argparse.ArgumentTypeError, FileNotFoundError) as e:
+        raise SystemExit(f"error: {e}")
+    if not documents:
+        raise SystemExit("error: no .pdf, .txt or .md documents found")
+    
+    backend = args.profile if args.profile in PROFILER_BACKENDS else None
+    try:
+        profiling = profile_pipeline(backend=backend) if args.profile else nullcontext()
+        with profiling as profiler:
+            write_chunks(args, documents, params)
+    except ImportError as e:
+        raise SystemExit(f"error: {e}")
+    
+    if profiler is not None:
+        if profiler.backend_text:
+            print(profiler.backend_text, file=sys.stderr)
+        print(profiler.format_report(), file=sys.stderr)
+
+def write_chunks(args, documents: List[str], params: Dict[str, Any]):
+    """Chunk the documents and write the chunks to the requested destination."""
+    results = chunk_corpus(documents, args.strategy, params, workers=args.workers)
+    if args.store:
+        write_store(results, args.store, args.embed)
+        print(f"Stored chunks from {len(documents)} documents in {args.store}", file=sys.stderr)
+    elif args.output:
+        written = export_corpus(results, args.output, include_content=not args.no_content)
+        print(f"Wrote {written} chunks from {len(documents)} documents to {args.output}", file=sys.stderr)
+    else:
+        try:
+            with JSONLChunkWriter(sys.stdout, include_content=not args.no_content) as writer:
+                for document, chunks in results:
+                    writer.write(chunks, document=document)
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`); stop without a traceback
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+def write_store(results, directory: str, embed: bool = False):
+    """Stream (document, chunks) pairs into a memory-mapped chunk store, optionally with embeddings."""
+    embedder = None
+    if embed:
+        from retrieval.embedder import TextEmbedder
+        embedder = TextEmbedder()
+    
+    with ChunkStoreWriter(directory, embedding_dim=embedder.dim if embedder else None,
+                          embedder=embedder.name if embedder else None) as writer:
+        for document, chunks in results:
+            # Extracted PDF text is cached, so reloading the source here does not re-extract it
+            embeddings = embedder.encode_into([chunk['content'] for chunk in chunks]) if embedder else None
+            writer.write(chunks, load_document(document), document, embeddings)
+
+def run_serve(args):
+    from service import create_app
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("error: uvicorn is required to serve: pip install fastapi uvicorn")
+    
+    uvicorn.run(create_app(preload=args.preload), host=args.host, port=args.port)
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk documents without the Streamlit UI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    chunk_parser = subparsers.add_parser('chunk', help="Chunk files or directories")
+    chunk_parser.add_argument('paths', nargs='+', help="Documents (.pdf, .txt, .md) or directories of them")
+    chunk_parser.add_argument('--strategy', default='fixed_length', choices=list(STRATEGY_CLASSES))
+    chunk_parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                              help="Strategy parameter, e.g. chunk_size=256 (repeatable)")
+    chunk_parser.add_argument('--workers', type=int, default=1, help="Worker processes")
+    chunk_parser.add_argument('--output', help="Output file (.jsonl, .parquet or .arrow); JSONL to stdout if omitted")
+    chunk_parser.add_argument('--no-content', action='store_true', help="Omit chunk text, keeping offsets only")
+    chunk_parser.add_argument('--store', metavar='DIRECTORY', help="Write a memory-mapped chunk store instead")
+    chunk_parser.add_argument('--embed', action='store_true', help="Also store chunk embeddings (with --store)")
+    chunk_parser.add_argument('--profile', nargs='?', const='phases', choices=('phases',) + PROFILER_BACKENDS,
+                              help="Print per-phase timings to stderr (phases of worker processes are not "
+                                   "included); 'cprofile' or 'pyinstrument' also print that profiler's report")
+    chunk_parser.set_defaults(handler=run_chunk)
+    
+    serve_parser = subparsers.add_parser('serve', help="Run the streaming HTTP chunking service")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--preload', nargs='*', default=['fixed_length'], choices=list(STRATEGY_CLASSES),
+                              help="Strategies whose models are loaded before the first request")
+    serve_parser.set_defaults(handler=run_serve)
+    
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -9,6 +9,7 @@ from strategies.sliding_window import SlidingWindowChunker
 from strategies.sentence_based import SentenceBasedChunker
 from strategies.paragraph_based import ParagraphBasedChunker
 from strategies.semantic_chunking import SemanticChunker
+from strategies.token_budget import TokenBudgetChunker
 
 def main():
     # Sample text for demonstration
@@ -33,7 +34,8 @@ def main():
         ("Sliding Window", SlidingWindowChunker(), {"chunk_size": 100, "overlap": 20}),
         ("Sentence-Based", SentenceBasedChunker(), {"sentences_per_chunk": 2}),
         ("Paragraph-Based", ParagraphBasedChunker(), {"paragraphs_per_chunk": 1}),
-        ("Semantic Chunking", SemanticChunker(), {"similarity_threshold": 0.7, "max_chunk_size": 150})
+        ("Semantic Chunking", SemanticChunker(), {"similarity_threshold": 0.7, "max_chunk_size": 150}),
+        ("Token-Budget Packing", TokenBudgetChunker(), {"max_tokens": 150, "mode": "optimal"})
     ]
     
     for strategy_name, chunker, params in strategies:
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval evaluation for the RAG chunking strategies.
+
+Chunks a document with every strategy, embeds the chunks into an in-memory
+index and scores retrieval against a question / answer-span set with recall@k
+and MRR, next to chunking time, embedding count and index size. A chunk is
+relevant to a question when it covers at least half of the answer span.
+
+QA files are a JSON list or JSONL of {"question": ..., "answer": ...} items,
+where the answer is located in the extracted text, or items with
+"answer_start" / "answer_end" character offsets into the extracted text.
+
+Usage:
+    python evaluation.py --document manual.pdf --qa manual_qa.jsonl
+    python evaluation.py --document notes.txt --qa qa.json --k 1 5 10 --output eval.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from retrieval.embedder import TextEmbedder
+from retrieval.index import IVFIndex, VectorIndex
+from utils.documents import format_table, load_document
+
+DEFAULT_K = (1, 3, 5, 10)
+DEFAULT_MIN_ANSWER_OVERLAP = 0.5
+
+EVALUATION_PARAMS = {
+    'fixed_length': {'chunk_size': 512},
+    'sliding_window': {'chunk_size': 512, 'overlap': 50},
+    'sentence_based': {'sentences_per_chunk': 5},
+    'paragraph_based': {'paragraphs_per_chunk': 1},
+    'semantic_chunking': {'similarity_threshold': 0.7, 'max_chunk_size': 600},
+    'token_budget': {'max_tokens': 512},
+}
+
+def parse_qa(content: str) -> List[Dict[str, Any]]:
+    """Parse QA items from a JSON list or JSONL content; raises ValueError naming the first malformed item."""
+    if content.lstrip().startswith('['):
+        items = json.loads(content)
+    else:
+        items = [json.loads(line) for line in content.splitlines() if line.strip()]
+    
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"QA item {index} is not an object")
+        if not isinstance(item.get('question'), str):
+            raise ValueError(f"QA item {index} has no \"question\" string")
+        if 'answer_start' in item and 'answer_end' in item:
+            try:
+                int(item['answer_start']), int(item['answer_end'])
+            except (TypeError, ValueError):
+                raise ValueError(f"QA item {index} has non-integer answer offsets")
+        elif not isinstance(item.get('answer'), str):
+            raise ValueError(f"QA item {index} has neither an \"answer\" string nor answer_start / answer_end")
+    return items
+
+def load_qa(path: str) -> List[Dict[str, Any]]:
+    """Load QA items from a JSON list or a JSONL file."""
+    with open(path, encoding='utf-8') as f:
+        return parse_qa(f.read())
+
+def resolve_answer_spans(text: str, qa_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Attach (start, end) answer offsets to each question; items whose answer is not in the text are dropped."""
+    questions = []
+    for item in qa_items:
+        if 'answer_start' in item and 'answer_end' in item:
+            start, end = int(item['answer_start']), int(item['answer_end'])
+        else:
+            start = text.find(item.get('answer', ''))
+            if start < 0 or not item.get('answer'):
+                continue
+            end = start + len(item['answer'])
+        questions.append({'question': item['question'], 'start': start, 'end': end})
+    return questions
+
+def relevant_chunk_mask(starts: np.ndarray, ends: np.ndarray, answer_start: int, answer_end: int,
+                        min_answer_overlap: float = DEFAULT_MIN_ANSWER_OVERLAP) -> np.ndarray:
+    """Chunks covering at least min_answer_overlap of the answer span."""
+    overlap = np.minimum(ends, answer_end) - np.maximum(starts, answer_start)
+    return overlap >= max(1, min_answer_overlap * (answer_end - answer_start))
+
+def evaluate_strategy(strategy_name: str, text: str, questions: List[Dict[str, Any]], embedder: TextEmbedder,
+                      params: Optional[Dict[str, Any]] = None, ks: Sequence[int] = DEFAULT_K,
+                      min_answer_overlap: float = DEFAULT_MIN_ANSWER_OVERLAP,
+                      approximate: bool = False) -> Dict[str, Any]:
+    """Chunk, embed and index one strategy's chunks and score retrieval for every question."""
+    from strategies.registry import create_strategy
+    
+    params = params if params is not None else EVALUATION_PARAMS.get(strategy_name, {})
+    chunker = create_strategy(strategy_name)
+    
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    chunks = list(chunker.chunk_text(text, **params))
+    chunk_seconds, chunk_cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    matrix = embedder.encode_into([chunk['content'] for chunk in chunks])
+    embed_seconds, embed_cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    
+    if not chunks:
+        return {'strategy': strategy_name, 'params': params, 'chunks': 0, 'embeddings': 0, 'embedder': embedder.name,
+                'index': None, 'index_bytes': 0, 'chunk_seconds': chunk_seconds, 'embed_seconds': embed_seconds,
+                'cpu_seconds': chunk_cpu + embed_cpu, 'query_ms': 0.0, 'recall': {k: 0.0 for k in ks}, 'mrr': 0.0,
+                'mrr_per_cpu_second': None}
+    
+    index = IVFIndex.build(matrix) if approximate else VectorIndex.build(matrix)
+    query_vectors = embedder.encode([question['question'] for question in questions])
+    
+    query_start = time.perf_counter()
+    _, top = index.search(query_vectors, max(ks))
+    query_seconds = time.perf_counter() - query_start
+    
+    starts = np.array([chunk['start_pos'] for chunk in chunks])
+    ends = np.array([chunk['end_pos'] for chunk in chunks])
+    hits_at = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    for question, ranking in zip(questions, top):
+        relevant = relevant_chunk_mask(starts, ends, question['start'], question['end'], min_answer_overlap)
+        hit_ranks = np.flatnonzero(relevant[ranking[ranking >= 0]])
+        first_rank = int(hit_ranks[0]) + 1 if len(hit_ranks) else None
+        reciprocal_ranks.append(1.0 / first_rank if first_rank else 0.0)
+        for k in ks:
+            if first_rank is not None and first_rank <= k:
+                hits_at[k] += 1
+    
+    n_questions = max(len(questions), 1)
+    mrr = float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0
+    cpu_seconds = chunk_cpu + embed_cpu
+    return {
+        'strategy': strategy_name,
+        'params': params,
+        'chunks': len(chunks),
+        'embeddings': len(matrix),
+        'embedder': embedder.name,
+        'index': index.kind,
+        'index_bytes': int(index.nbytes),
+        'chunk_seconds': chunk_seconds,
+        'embed_seconds': embed_seconds,
+        'cpu_seconds': cpu_seconds,
+        'query_ms': 1000 * query_seconds / n_questions,
+        'recall': {k: hits_at[k] / n_questions for k in ks},
+        'mrr': mrr,
+        'mrr_per_cpu_second': mrr / cpu_seconds if cpu_seconds > 0 else None,
+    }
+
+def evaluate_strategies(text: str, questions: List[Dict[str, Any]], strategies: Optional[Sequence[str]] = None,
+                        embedder: Optional[TextEmbedder] = None, ks: Sequence[int] = DEFAULT_K,
+                        min_answer_overlap: float = DEFAULT_MIN_ANSWER_OVERLAP,
+                        strategy_params: Optional[Dict[str, Dict[str, Any]]] = None,
+                        approximate: bool = False) -> List[Dict[str, Any]]:
+    """Evaluate every strategy on the same document, questions and embedder.
+    
+    strategy_params overrides EVALUATION_PARAMS for some strategies; approximate
+    searches an IVF index instead of scoring every chunk.
+    """
+    embedder = embedder or TextEmbedder()
+    strategies = strategies or list(EVALUATION_PARAMS)
+    params = dict(EVALUATION_PARAMS, **(strategy_params or {}))
+    return [evaluate_strategy(name, text, questions, embedder, params.get(name, {}), ks, min_answer_overlap,
+                              approximate)
+            for name in strategies]
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Render evaluation results as a plain-text table."""
+    ks = list(results[0]['recall']) if results else []
+    headers = ['strategy', 'chunks'] + [f'recall@{k}' for k in ks] + ['MRR', 'chunk s', 'embed s', 'index KB',
+                                                                      'query ms', 'MRR/cpu-s']
+    rows = []
+    for result in results:
+        rows.append([result['strategy'], str(result['chunks'])] +
+                    [f"{result['recall'][k]:.3f}" for k in ks] +
+                    [f"{result['mrr']:.3f}", f"{result['chunk_seconds']:.3f}", f"{result['embed_seconds']:.3f}",
+                     f"{result['index_bytes'] / 1024:,.0f}", f"{result['query_ms']:.3f}",
+                     f"{result['mrr_per_cpu_second']:.2f}" if result['mrr_per_cpu_second'] is not None else 'n/a'])
+    return format_table(headers, rows)
+
+def main():
+    # Never reach the network for models; evaluations must be reproducible offline.
+    # Set here rather than at import, so importing this module (as app.py does) leaves downloads enabled
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    
+    parser = argparse.ArgumentParser(description="Compare chunking strategies by retrieval quality.")
+    parser.add_argument('--document', required=True, help="Document to chunk (.pdf, .txt or .md)")
+    parser.add_argument('--qa', required=True, help="Questions with answers or answer spans (JSON or JSONL)")
+    parser.add_argument('--strategies', nargs='*', default=list(EVALUATION_PARAMS), choices=list(EVALUATION_PARAMS))
+    parser.add_argument('--k', nargs='*', type=int, default=list(DEFAULT_K), help="Cut-offs for recall@k")
+    parser.add_argument('--min-answer-overlap', type=float, default=DEFAULT_MIN_ANSWER_OVERLAP,
+                        help="Fraction of the answer span a chunk must cover to count as relevant")
+    parser.add_argument('--no-model', action='store_true', help="Use hashed term-frequency features instead of the embedding model")
+    parser.add_argument('--approximate', action='store_true', help="Search an IVF index instead of every chunk")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    text = load_document(args.document)
+    questions = resolve_answer_spans(text, load_qa(args.qa))
+    if not questions:
+        parser.error("None of the answers could be located in the document")
+    
+    embedder = TextEmbedder(use_model=not args.no_model)
+    print(f"Evaluating {len(questions)} questions with {embedder.name} embeddings...", file=sys.stderr)
+    results = evaluate_strategies(text, questions, args.strategies, embedder, sorted(args.k), args.min_answer_overlap,
+                                  approximate=args.approximate)
+    print(format_results(results))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'document': args.document, 'questions': len(questions), 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
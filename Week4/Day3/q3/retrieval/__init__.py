@@ -0,0 +1 @@
+# Retrieval package for RAG Chunking Strategy Visualizer 
\ No newline at end of file
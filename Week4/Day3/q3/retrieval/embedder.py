@@ -0,0 +1,88 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from strategies.semantic_chunking import SENTENCE_TRANSFORMERS_AVAILABLE, load_embedding_model
+from utils.embedding_cache import get_embedding_cache
+from utils.profiling import profiled
+
+class TextEmbedder:
+    """
+    Embeds chunks and queries as unit-length float32 vectors.
+    
+    Uses the same SentenceTransformer as semantic chunking (shared through
+    load_embedding_model) when it is available locally; otherwise falls back to
+    hashed term-frequency features so retrieval still works offline. Chunk and
+    query vectors are mostly one-off, so they only go through the sentence
+    embedding cache when use_cache is set.
+    """
+    
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', use_model: bool = True, n_features: int = 2 ** 12,
+                 use_cache: bool = False):
+        self.model_name = model_name
+        self.n_features = n_features
+        self.use_cache = use_cache
+        self.model = None
+        if use_model and SENTENCE_TRANSFORMERS_AVAILABLE:
+            try:
+                self.model = load_embedding_model(model_name)
+            except Exception:
+                self.model = None
+        self._vectorizer = None
+    
+    @property
+    def name(self) -> str:
+        """Identifies the embedding space; vectors from different names are not comparable."""
+        return self.model_name if self.model is not None else f'hashed-tf-{self.n_features}'
+    
+    @property
+    def dim(self) -> int:
+        if self.model is not None:
+            return self.model.get_sentence_embedding_dimension()
+        return self.n_features
+    
+    @profiled('embedding')
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 matrix of unit vectors."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        
+        if self.model is not None:
+            def encode_batch(batch: List[str]) -> np.ndarray:
+                return self.model.encode(batch, batch_size=batch_size, normalize_embeddings=True,
+                                         convert_to_numpy=True, show_progress_bar=False)
+            
+            if self.use_cache:
+                return get_embedding_cache(self.model_name).encode(texts, encode_batch)
+            return np.asarray(encode_batch(texts), dtype=np.float32)
+        
+        from sklearn.preprocessing import normalize
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(n_features=self.n_features, alternate_sign=False, norm=None,
+                                                 stop_words='english', dtype=np.float32)
+        features = self._vectorizer.transform(texts)
+        # Sublinear term frequencies keep repeated words from dominating short queries
+        features.data = np.log1p(features.data)
+        return normalize(features).toarray()
+    
+    def encode_into(self, texts: Sequence[str], out: Optional[np.ndarray] = None,
+                    block_size: int = 4096) -> np.ndarray:
+        """
+        Embed texts block by block into one contiguous float32 matrix.
+        
+        Args:
+            texts: Texts to embed (e.g. chunk contents)
+            out: Preallocated (len(texts), dim) float32 matrix to fill
+            block_size: Texts embedded per call, bounding intermediate memory
+        
+        Returns:
+            The filled matrix
+        """
+        if out is None:
+            out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), block_size):
+            block = [texts[i] for i in range(start, min(start + block_size, len(texts)))]
+            out[start:start + len(block)] = self.encode(block)
+        return out
\ No newline at end of file
@@ -0,0 +1,302 @@
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+INDEX_META_FILE = 'index.json'
+
+# Score matrices are computed for blocks of queries of at most this many entries
+_SEARCH_BLOCK_ELEMENTS = 2 ** 24
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and values of the k highest scores in each row, best first."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+def _as_matrix(vectors: np.ndarray, dim: Optional[int] = None) -> np.ndarray:
+    """Vectors as a C-contiguous 2-D float32 matrix."""
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if dim is not None and matrix.shape[1] != dim:
+        raise ValueError(f"Expected vectors of dimension {dim}, got {matrix.shape[1]}")
+    return matrix
+
+class VectorIndex:
+    """
+    Exact nearest-neighbour index over a contiguous float32 matrix.
+    
+    Scores are inner products, i.e. cosine similarities for the unit vectors
+    produced by TextEmbedder. Search is one matrix product per block of queries.
+    The matrix grows by doubling its capacity, and a loaded index can be
+    memory-mapped so only the pages a search touches are read from disk.
+    """
+    
+    kind = 'flat'
+    array_names = ('vectors',)
+    
+    def __init__(self, dim: int, vectors: Optional[np.ndarray] = None):
+        self.dim = dim
+        self._buffer = np.empty((0, dim), dtype=np.float32)
+        self._count = 0
+        if vectors is not None:
+            self._buffer = _as_matrix(vectors, dim)
+            self._count = len(self._buffer)
+    
+    @classmethod
+    def build(cls, vectors: np.ndarray, **kwargs) -> 'VectorIndex':
+        """Create an index holding vectors (row i gets id i)."""
+        vectors = _as_matrix(vectors)
+        return cls(vectors.shape[1], vectors)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """The indexed vectors as an (n, dim) float32 matrix."""
+        return self._buffer[:self._count]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the index's vectors and structures."""
+        return self.vectors.nbytes
+    
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Append vectors and return their ids."""
+        vectors = _as_matrix(vectors, self.dim)
+        start = self._count
+        needed = start + len(vectors)
+        if needed > len(self._buffer) or not self._buffer.flags.writeable:
+            # Grow geometrically so repeated adds copy each vector O(1) times on average
+            buffer = np.empty((max(needed, 2 * len(self._buffer), 1024), self.dim), dtype=np.float32)
+            buffer[:start] = self._buffer[:start]
+            self._buffer = buffer
+        self._buffer[start:needed] = vectors
+        self._count = needed
+        return np.arange(start, needed)
+    
+    def search(self, queries: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k best-scoring vectors for each query.
+        
+        Args:
+            queries: (dim,) vector or (m, dim) matrix of query vectors
+            k: Number of results per query
+        
+        Returns:
+            (scores, ids), each (m, min(k, len(index))), best first
+        """
+        queries = _as_matrix(queries, self.dim)
+        k = min(k, len(self))
+        scores = np.empty((len(queries), k), dtype=np.float32)
+        ids = np.empty((len(queries), k), dtype=np.int64)
+        if k == 0:
+            return scores, ids
+        
+        vectors = self.vectors
+        block = max(1, _SEARCH_BLOCK_ELEMENTS // len(vectors))
+        for start in range(0, len(queries), block):
+            block_ids, block_scores = top_k(queries[start:start + block] @ vectors.T, k)
+            ids[start:start + block] = block_ids
+            scores[start:start + block] = block_scores
+        return scores, ids
+    
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.array_names}
+    
+    def _meta(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'dim': self.dim, 'count': len(self)}
+    
+    def save(self, directory: str, metadata: Optional[Dict[str, Any]] = None):
+        """Write the index as .npy files plus an index.json description into directory."""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+        meta = dict(self._meta(), metadata=metadata or {})
+        with open(os.path.join(directory, INDEX_META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+    
+    @classmethod
+    def _from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'VectorIndex':
+        return cls(meta['dim'], arrays['vectors'])
+
+class IVFIndex(VectorIndex):
+    """
+    Approximate nearest-neighbour index with an inverted file (IVF).
+    
+    Vectors are clustered around n_lists k-means centroids and stored grouped by
+    list, so each list is one contiguous slice of the matrix. A query scores the
+    centroids and then only the vectors of its n_probe closest lists, trading a
+    little recall for far fewer dot products on large collections.
+    """
+    
+    kind = 'ivf'
+    array_names = ('vectors', 'ids', 'offsets', 'centroids')
+    
+    def __init__(self, dim: int, centroids: Optional[np.ndarray] = None, n_probe: int = 8):
+        super().__init__(dim)
+        self.centroids = centroids
+        self.n_probe = n_probe
+        self.ids = np.empty(0, dtype=np.int64)  # original id of each stored row
+        self.offsets = np.zeros(1 if centroids is None else len(centroids) + 1, dtype=np.int64)
+        self._next_id = 0
+    
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 8,
+              sample_size: Optional[int] = None, seed: int = 0) -> 'IVFIndex':
+        """Train centroids on (a sample of) vectors and index them (row i gets id i)."""
+        vectors = _as_matrix(vectors)
+        index = cls(vectors.shape[1], n_probe=n_probe)
+        index.train(vectors, n_lists, sample_size, seed)
+        index.add(vectors)
+        return index
+    
+    def train(self, vectors: np.ndarray, n_lists: Optional[int] = None, sample_size: Optional[int] = None,
+              seed: int = 0):
+        """
+        Learn the list centroids with k-means.
+        
+        Args:
+            vectors: Training vectors, usually the collection to be indexed
+            n_lists: Number of lists (default: about sqrt(n))
+            sample_size: Vectors sampled for training (default: 40 per list)
+            seed: Random seed for sampling and k-means
+        """
+        from sklearn.cluster import MiniBatchKMeans
+        
+        vectors = _as_matrix(vectors, self.dim)
+        n_lists = max(1, min(n_lists or int(np.sqrt(len(vectors))), len(vectors)))
+        sample_size = min(len(vectors), sample_size or 40 * n_lists)
+        rng = np.random.default_rng(seed)
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=1, random_state=seed,
+                                 batch_size=min(sample_size, 4096)).fit(sample)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        # Unit-length centroids, so the best list is the one with the highest inner product
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        
+        # Duplicate-heavy collections (repeated headers and footers) leave k-means with duplicate
+        # centroids or centroids no vector is closest to; their lists would always be empty
+        self.centroids = centroids[np.sort(np.unique(centroids, axis=0, return_index=True)[1])]
+        self.centroids = self.centroids[np.unique(self._assign(sample))]
+        self.offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        self._buffer = np.empty((0, self.dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self._count = 0
+    
+    @property
+    def n_lists(self) -> int:
+        return len(self.offsets) - 1
+    
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.ids.nbytes + self.offsets.nbytes + self.centroids.nbytes
+    
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """List of each vector: its highest-scoring centroid."""
+        lists = np.empty(len(vectors), dtype=np.int64)
+        block = max(1, _SEARCH_BLOCK_ELEMENTS // len(self.centroids))
+        for start in range(0, len(vectors), block):
+            lists[start:start + block] = np.argmax(vectors[start:start + block] @ self.centroids.T, axis=1)
+        return lists
+    
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Assign vectors to lists and return their ids.
+        
+        Rows are kept grouped by list, so every add rewrites the matrix; build
+        the index from the whole collection at once where possible.
+        """
+        if self.centroids is None:
+            raise ValueError("IVFIndex must be trained before vectors are added")
+        vectors = _as_matrix(vectors, self.dim)
+        new_ids = np.arange(self._next_id, self._next_id + len(vectors))
+        self._next_id += len(vectors)
+        
+        lists = np.concatenate([np.repeat(np.arange(self.n_lists), np.diff(self.offsets)), self._assign(vectors)])
+        order = np.argsort(lists, kind='stable')
+        # Skip the concatenation on the first add, so building needs one copy of the vectors
+        combined = np.concatenate([self.vectors, vectors]) if self._count else vectors
+        self._buffer = combined[order]
+        self.ids = np.concatenate([self.ids, new_ids])[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=self.n_lists))])
+        self._count = len(self._buffer)
+        return new_ids
+    
+    def search(self, queries: np.ndarray, k: int = 10, n_probe: Optional[int] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find (approximately) the k best-scoring vectors for each query.
+        
+        Returns:
+            (scores, ids), each (m, min(k, len(index))), best first; rows with
+            fewer candidates than k in their probed lists are padded with
+            -inf scores and id -1
+        """
+        queries = _as_matrix(queries, self.dim)
+        k = min(k, len(self))
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if k == 0:
+            return scores, ids
+        
+        probes, _ = top_k(queries @ self.centroids.T, n_probe or self.n_probe)
+        vectors = self.vectors
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            # Each probed list is a contiguous slice, so no candidate vectors are copied
+            slices = [(self.offsets[i], self.offsets[i + 1]) for i in lists if self.offsets[i + 1] > self.offsets[i]]
+            if not slices:
+                continue  # Nothing in the probed lists; the row keeps its -inf / -1 padding
+            candidate_scores = np.concatenate([vectors[start:end] @ query for start, end in slices])
+            candidate_rows = np.concatenate([np.arange(start, end) for start, end in slices])
+            best, best_scores = top_k(candidate_scores[np.newaxis], k)
+            scores[row, :best.shape[1]] = best_scores[0]
+            ids[row, :best.shape[1]] = self.ids[candidate_rows[best[0]]]
+        return scores, ids
+    
+    def _meta(self) -> Dict[str, Any]:
+        return dict(super()._meta(), n_lists=self.n_lists, n_probe=self.n_probe, next_id=self._next_id)
+    
+    @classmethod
+    def _from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'IVFIndex':
+        index = cls(meta['dim'], np.asarray(arrays['centroids']), n_probe=meta['n_probe'])
+        index._buffer = arrays['vectors']
+        index._count = len(arrays['vectors'])
+        index.ids = arrays['ids']
+        index.offsets = np.asarray(arrays['offsets'])
+        index._next_id = meta['next_id']
+        return index
+
+INDEX_CLASSES = {VectorIndex.kind: VectorIndex, IVFIndex.kind: IVFIndex}
+
+def load_index(directory: str, mmap: bool = True) -> Tuple[VectorIndex, Dict[str, Any]]:
+    """
+    Load an index written by save().
+    
+    Args:
+        directory: Directory the index was saved to
+        mmap: Memory-map the .npy files instead of reading them into memory
+    
+    Returns:
+        (index, metadata given to save())
+    """
+    with open(os.path.join(directory, INDEX_META_FILE)) as f:
+        meta = json.load(f)
+    if meta['kind'] not in INDEX_CLASSES:
+        raise ValueError(f"Unknown index kind: {meta['kind']}")
+    
+    index_class = INDEX_CLASSES[meta['kind']]
+    arrays = {}
+    for name in index_class.array_names:
+        arrays[name] = np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if mmap else None,
+                               allow_pickle=False)
+    return index_class._from_arrays(meta, arrays), meta.get('metadata', {})
\ No newline at end of file
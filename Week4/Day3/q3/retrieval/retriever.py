@@ -0,0 +1,86 @@
+import json
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from retrieval.embedder import TextEmbedder
+from retrieval.index import IVFIndex, VectorIndex, load_index
+from utils.chunks import Chunk
+from utils.export import JSONLChunkWriter
+
+CHUNKS_FILE = 'chunks.jsonl'
+
+class ChunkRetriever:
+    """
+    Answers text queries with the best-matching chunks.
+    
+    Chunk contents are embedded into a VectorIndex (exact) or an IVFIndex
+    (approximate, for large collections); results are (chunk, score) pairs.
+    """
+    
+    def __init__(self, embedder: Optional[TextEmbedder] = None, approximate: bool = False, n_probe: int = 8):
+        self.embedder = embedder or TextEmbedder()
+        self.approximate = approximate
+        self.n_probe = n_probe
+        self.index: Optional[VectorIndex] = None
+        self.chunks: Sequence = []
+    
+    def index_chunks(self, chunks: Sequence) -> VectorIndex:
+        """Embed chunks (Chunk objects, dicts or a ChunkTable) and build the index over them."""
+        # Chunk stores written with this embedder already hold the vectors
+        vectors = getattr(chunks, 'embeddings', None)
+        if vectors is None or getattr(chunks, 'embedder', None) != self.embedder.name:
+            vectors = self.embedder.encode_into([chunk['content'] for chunk in chunks])
+        if not len(vectors):
+            self.index = VectorIndex(self.embedder.dim)
+        elif self.approximate:
+            self.index = IVFIndex.build(vectors, n_probe=self.n_probe)
+        else:
+            self.index = VectorIndex.build(vectors)
+        self.chunks = chunks
+        return self.index
+    
+    def search(self, query: str, k: int = 5) -> List[Tuple[Chunk, float]]:
+        """Return the k chunks most similar to query, best first."""
+        return self.search_many([query], k)[0]
+    
+    def search_many(self, queries: Sequence[str], k: int = 5) -> List[List[Tuple[Chunk, float]]]:
+        """Search several queries with one batched index lookup."""
+        if self.index is None:
+            raise ValueError("No chunks indexed; call index_chunks() or load() first")
+        scores, ids = self.index.search(self.embedder.encode(queries), k)
+        return [[(self.chunks[int(i)], float(score)) for score, i in zip(row_scores, row_ids) if i >= 0]
+                for row_scores, row_ids in zip(scores, ids)]
+    
+    def save(self, directory: str):
+        """Write the index (as .npy files) and the chunks (as JSONL) into directory."""
+        if self.index is None:
+            raise ValueError("No chunks indexed; nothing to save")
+        self.index.save(directory, metadata={'embedder': self.embedder.name})
+        with JSONLChunkWriter(os.path.join(directory, CHUNKS_FILE)) as writer:
+            writer.write(self.chunks)
+    
+    @classmethod
+    def load(cls, directory: str, embedder: Optional[TextEmbedder] = None, mmap: bool = True) -> 'ChunkRetriever':
+        """
+        Load a retriever written by save().
+        
+        Args:
+            directory: Directory the retriever was saved to
+            embedder: Embedder for queries; must produce the vectors the index was built with
+            mmap: Memory-map the index vectors instead of reading them into memory
+        
+        Returns:
+            A ChunkRetriever ready to search
+        """
+        index, metadata = load_index(directory, mmap=mmap)
+        embedder = embedder or TextEmbedder()
+        if metadata.get('embedder') not in (None, embedder.name):
+            raise ValueError(f"Index was built with '{metadata['embedder']}' embeddings, "
+                             f"but the query embedder is '{embedder.name}'")
+        
+        retriever = cls(embedder, approximate=isinstance(index, IVFIndex),
+                        n_probe=getattr(index, 'n_probe', 8))
+        retriever.index = index
+        with open(os.path.join(directory, CHUNKS_FILE), encoding='utf-8') as f:
+            retriever.chunks = [Chunk(**json.loads(line)) for line in f if line.strip()]
+        return retriever
\ No newline at end of file
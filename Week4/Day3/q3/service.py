@@ -0,0 +1,136 @@
+"""
+Streaming HTTP service for the RAG chunking engine.
+
+POST /chunk accepts one text or a list of documents and streams the chunks
+back as NDJSON (one JSON object per line) as each document finishes, so
+clients can start indexing before the whole request is chunked. A document
+that fails after streaming has started yields an {"error", "document"} line
+in place of its chunks, and the stream continues with the next document. Chunkers are
+process-wide (strategies.registry.get_strategy), so tokenizers and embedding
+models stay loaded between requests; strategies listed in preload are warmed
+up at startup.
+
+Run with:
+    python cli.py serve --port 8000
+    uvicorn service:app
+"""
+
+import asyncio
+import io
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from strategies.registry import STRATEGY_CLASSES, get_strategy
+from utils.export import JSONLChunkWriter
+
+try:
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import StreamingResponse
+    from pydantic import BaseModel, Field
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+WARMUP_TEXT = ("Chunking services keep their models loaded. This sentence warms up the tokenizer.\n\n"
+               "A second paragraph gives paragraph and semantic chunkers something to split.")
+
+def warm_up(strategies: Sequence[str]):
+    """Create the chunkers for strategies and run them once, loading their tokenizer and models."""
+    for name in strategies:
+        get_strategy(name).chunk_text(WARMUP_TEXT)
+
+def _ndjson_lines(chunks, document: Optional[str], include_content: bool) -> str:
+    """Serialize chunks as NDJSON lines, in the same layout as JSONL exports."""
+    buffer = io.StringIO()
+    JSONLChunkWriter(buffer, include_content=include_content).write(chunks, document=document)
+    return buffer.getvalue()
+
+if FASTAPI_AVAILABLE:
+    class ChunkDocument(BaseModel):
+        name: Optional[str] = None
+        text: str
+    
+    class ChunkRequest(BaseModel):
+        text: Optional[str] = None
+        documents: List[ChunkDocument] = Field(default_factory=list)
+        strategy: str = 'fixed_length'
+        params: Dict[str, Any] = Field(default_factory=dict)
+        include_content: bool = True
+
+def create_app(preload: Sequence[str] = ('fixed_length',)):
+    """
+    Build the chunking service.
+    
+    Args:
+        preload: Strategies warmed up at startup, before the first request
+    
+    Returns:
+        A FastAPI application
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError("FastAPI is required for the chunking service: pip install fastapi uvicorn")
+    
+    # Chunker instances are shared across requests; one request at a time uses each of them
+    locks = {name: asyncio.Lock() for name in STRATEGY_CLASSES}
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        await asyncio.to_thread(warm_up, list(preload))
+        yield
+    
+    app = FastAPI(title="RAG Chunking Service", lifespan=lifespan)
+    
+    @app.get('/health')
+    async def health():
+        return {'status': 'ok'}
+    
+    @app.get('/strategies')
+    async def strategies():
+        return {'strategies': list(STRATEGY_CLASSES), 'preloaded': list(preload)}
+    
+    @app.post('/chunk')
+    async def chunk(request: ChunkRequest):
+        if request.strategy not in STRATEGY_CLASSES:
+            raise HTTPException(422, f"Unknown chunking strategy: {request.strategy}. "
+                                     f"Available: {', '.join(STRATEGY_CLASSES)}")
+        documents = list(request.documents)
+        if request.text is not None:
+            documents.insert(0, ChunkDocument(text=request.text))
+        if not documents:
+            raise HTTPException(422, "Provide 'text' or 'documents'")
+        
+        chunker = get_strategy(request.strategy)
+        params = dict(request.params)
+        params.pop('lazy', None)
+        
+        def document_name(index: int, document: ChunkDocument) -> Optional[str]:
+            return document.name or (f"text[{index}]" if len(documents) > 1 else None)
+        
+        async def chunk_document(index: int, document: ChunkDocument) -> str:
+            async with locks[request.strategy]:
+                chunks = await asyncio.to_thread(chunker.chunk_text, document.text, **params)
+            return await asyncio.to_thread(_ndjson_lines, chunks, document_name(index, document),
+                                           request.include_content)
+        
+        # Fail before streaming starts, while a proper error status can still be sent
+        try:
+            first = await chunk_document(0, documents[0])
+        except (TypeError, ValueError) as e:
+            raise HTTPException(422, f"Invalid parameters for {request.strategy}: {e}")
+        
+        async def stream():
+            yield first
+            for index, document in enumerate(documents[1:], start=1):
+                # The status line is already sent, so a failing document is reported in-band
+                try:
+                    yield await chunk_document(index, document)
+                except Exception as e:
+                    yield json.dumps({'error': f"{type(e).__name__}: {e}",
+                                      'document': document_name(index, document) or f"text[{index}]"}) + '\n'
+        
+        return StreamingResponse(stream(), media_type='application/x-ndjson')
+    
+    return app
+
+app = create_app() if FASTAPI_AVAILABLE else None
\ No newline at end of file
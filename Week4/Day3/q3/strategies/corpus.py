@@ -0,0 +1,53 @@
+import itertools
+import multiprocessing
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from strategies.registry import get_strategy
+from utils.chunks import Chunk
+from utils.documents import DocumentPath, load_document
+
+def _init_worker(strategy: str):
+    """Create the worker's chunker; its models load on the first document and are then reused."""
+    get_strategy(strategy)
+
+def _chunk_document(task: Tuple[str, Optional[str], str, Dict[str, Any]]) -> Tuple[str, List[Chunk]]:
+    """Worker entry point: chunk one document with the worker's shared chunker."""
+    name, text, strategy, params = task
+    if text is None:
+        text = load_document(name)
+    return name, get_strategy(strategy).chunk_text(text, **params)
+
+def chunk_corpus(paths: Iterable[DocumentPath], strategy: str,
+                 params: Optional[Dict[str, Any]] = None, workers: int = 1,
+                 ordered: bool = True, batch_size: int = 1,
+                 texts: Iterable[str] = ()) -> Iterator[Tuple[str, List[Chunk]]]:
+    """
+    Chunk many documents, fanning them out over a process pool.
+    
+    Args:
+        paths: Document files (.pdf, or any text file); a missing file raises FileNotFoundError
+        strategy: Strategy name, e.g. 'fixed_length' or 'semantic_chunking'
+        params: Keyword arguments for the strategy's chunk_text
+        workers: Number of worker processes (1 chunks in this process)
+        ordered: Yield results in input order; otherwise as soon as each finishes
+        batch_size: Documents sent to a worker per task
+        texts: Raw document texts, chunked after the files
+    
+    Yields:
+        (source, chunks) for every document, where source is the path or "text[i]"
+    """
+    params = params or {}
+    tasks = itertools.chain(
+        ((os.fspath(path), None, strategy, params) for path in paths),
+        ((f"text[{index}]", text, strategy, params) for index, text in enumerate(texts)),
+    )
+    
+    if workers <= 1:
+        for task in tasks:
+            yield _chunk_document(task)
+        return
+    
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(strategy,)) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        yield from mapper(_chunk_document, tasks, chunksize=batch_size)
\ No newline at end of file
@@ -1,5 +1,7 @@
 from typing import List, Dict, Any
 from utils.tokenizer import TokenizerUtils
+from utils.chunks import Chunk
+from utils.profiling import profiled
 
 class FixedLengthChunker:
     """Fixed-length token chunking strategy."""
@@ -7,7 +9,8 @@ class FixedLengthChunker:
     def __init__(self):
         self.tokenizer = TokenizerUtils()
     
-    def chunk_text(self, text: str, chunk_size: int = 512) -> List[Dict[str, Any]]:
+    @profiled('chunking')
+    def chunk_text(self, text: str, chunk_size: int = 512) -> List[Chunk]:
         """
         Chunk text into fixed-length token chunks.
         
@@ -16,38 +19,35 @@ class FixedLengthChunker:
             chunk_size: Number of tokens per chunk
             
         Returns:
-            List of chunk dictionaries with metadata
+            List of Chunk records with metadata
         """
         if not text:
             return []
         
         chunks = []
-        current_pos = 0
         
-        # Split text by tokens
-        token_chunks = self.tokenizer.split_by_tokens(text, chunk_size)
+        # Walk the shared token index; offsets come straight from token positions
+        document = self.tokenizer.tokenize_document(text)
+        units_per_chunk = document.units_for_tokens(chunk_size)
         
-        for i, chunk_text in enumerate(token_chunks):
-            if not chunk_text.strip():
+        for first in range(0, len(document), units_per_chunk):
+            last = min(first + units_per_chunk, len(document))
+            start_pos, end_pos = document.token_span(first, last)
+            if start_pos == end_pos:
                 continue
             
-            # Calculate positions
-            start_pos = current_pos
-            end_pos = current_pos + len(chunk_text)
-            
             # Create chunk metadata
-            chunk_data = {
-                'content': chunk_text.strip(),
-                'token_count': self.tokenizer.count_tokens(chunk_text),
-                'start_pos': start_pos,
-                'end_pos': end_pos,
-                'overlap': 0,  # No overlap in fixed-length chunking
-                'chunk_id': i,
-                'strategy': 'fixed_length'
-            }
+            chunk_data = Chunk(
+                source=text,
+                token_count=int((last - first) * document.token_scale),
+                start_pos=start_pos,
+                end_pos=end_pos,
+                overlap=0,  # No overlap in fixed-length chunking
+                chunk_id=len(chunks),
+                strategy='fixed_length'
+            )
             
             chunks.append(chunk_data)
-            current_pos = end_pos
         
         return chunks
     
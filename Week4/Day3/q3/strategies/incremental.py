@@ -0,0 +1,167 @@
+import bisect
+import difflib
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.chunks import Chunk
+from utils.tokenizer import PARAGRAPH_BREAK_PATTERN
+
+def paragraph_units(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into units that tile it exactly: each paragraph with the blank lines after it.
+    
+    Two equal units are byte-identical, so a run of equal units maps between two
+    versions of a document with a single character offset.
+    """
+    starts = [0] + [match.end() for match in PARAGRAPH_BREAK_PATTERN.finditer(text)]
+    starts = sorted(set(start for start in starts if start < len(text)))
+    return list(zip(starts, starts[1:] + [len(text)]))
+
+def _unit_hashes(text: str, units: List[Tuple[int, int]]) -> List[bytes]:
+    return [hashlib.blake2b(text[start:end].encode('utf-8'), digest_size=16).digest() for start, end in units]
+
+class IncrementalChunker:
+    """
+    Re-chunk an edited document by re-running a strategy only where it changed.
+    
+    Paragraph hashes of the previous and new text are diffed; chunks that lie in
+    unchanged paragraphs (at least context_paragraphs away from any edit) are
+    reused with shifted offsets and their original token counts, and the strategy
+    runs only over the gaps between them. Unchanged sentences in a re-chunked gap
+    still hit the embedding cache. Chunk boundaries inside a gap can differ from
+    a full re-run for strategies that count from the start of the document.
+    """
+    
+    def __init__(self, chunker, context_paragraphs: int = 1):
+        self.chunker = chunker
+        self.context_paragraphs = context_paragraphs
+        self.last_stats: Dict[str, Any] = {}
+    
+    def chunk_text(self, text: str, previous_text: Optional[str] = None,
+                   previous_chunks: Optional[Sequence] = None, **params) -> List[Chunk]:
+        """
+        Chunk text, reusing previous_chunks (made from previous_text with the same params).
+        
+        Args:
+            text: New version of the document
+            previous_text: Text the previous chunks were made from
+            previous_chunks: Chunks of previous_text from the same strategy and params
+            **params: Strategy parameters, as for the wrapped chunker's chunk_text
+        
+        Returns:
+            List of Chunk records for text; self.last_stats describes what was reused
+        """
+        if previous_text is None or not previous_chunks or not self._supports_incremental(previous_chunks, params):
+            return self._full_rechunk(text, params)
+        
+        if text == previous_text:
+            self.last_stats = {'mode': 'unchanged', 'reused_chunks': len(previous_chunks), 'rechunked_chars': 0,
+                               'total_chars': len(text)}
+            return list(previous_chunks)
+        
+        old_units = paragraph_units(previous_text)
+        new_units = paragraph_units(text)
+        matcher = difflib.SequenceMatcher(None, _unit_hashes(previous_text, old_units),
+                                          _unit_hashes(text, new_units), autojunk=False)
+        
+        # Unchanged stretches (old start, old end, shift), trimmed by the context margin
+        stable_ranges = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != 'equal':
+                continue
+            first = i1 + (self.context_paragraphs if i1 > 0 else 0)
+            last = i2 - (self.context_paragraphs if i2 < len(old_units) else 0)
+            if first < last:
+                shift = new_units[j1][0] - old_units[i1][0]
+                stable_ranges.append((old_units[first][0], old_units[last - 1][1], shift))
+        
+        if not stable_ranges:
+            return self._full_rechunk(text, params)
+        
+        range_starts = [start for start, _, _ in stable_ranges]
+        chunks: List[Chunk] = []
+        pending_gap = False
+        last_kept_end = 0
+        reused = 0
+        rechunked_chars = 0
+        
+        for chunk in previous_chunks:
+            shift = self._stable_shift(chunk, stable_ranges, range_starts)
+            if shift is None:
+                pending_gap = True
+                continue
+            
+            start_pos = chunk['start_pos'] + shift
+            if pending_gap:
+                rechunked_chars += self._rechunk_gap(text, last_kept_end, start_pos, params, chunks)
+                pending_gap = False
+            
+            chunks.append(self._shifted_chunk(chunk, shift, text))
+            last_kept_end = max(last_kept_end, chunk['end_pos'] + shift)
+            reused += 1
+        
+        if pending_gap or last_kept_end < len(text.rstrip()):
+            rechunked_chars += self._rechunk_gap(text, last_kept_end, len(text), params, chunks)
+        
+        self._renumber(chunks)
+        self.last_stats = {'mode': 'incremental', 'reused_chunks': reused, 'rechunked_chars': rechunked_chars,
+                           'total_chars': len(text)}
+        return chunks
+    
+    def _supports_incremental(self, previous_chunks: Sequence, params: Dict[str, Any]) -> bool:
+        """Chunks must be contiguous slices in document order (not clustered semantic groups)."""
+        if params.get('segmentation_mode') == 'clustering':
+            return False
+        previous_start = -1
+        for chunk in previous_chunks:
+            if chunk['start_pos'] < previous_start:
+                return False
+            previous_start = chunk['start_pos']
+        return True
+    
+    def _full_rechunk(self, text: str, params: Dict[str, Any]) -> List[Chunk]:
+        chunks = list(self.chunker.chunk_text(text, **params))
+        self.last_stats = {'mode': 'full', 'reused_chunks': 0, 'rechunked_chars': len(text),
+                           'total_chars': len(text)}
+        return chunks
+    
+    @staticmethod
+    def _stable_shift(chunk, stable_ranges: List[Tuple[int, int, int]], range_starts: List[int]) -> Optional[int]:
+        """Offset shift of a chunk lying entirely in an unchanged stretch, or None if it must be re-chunked."""
+        index = bisect.bisect_right(range_starts, chunk['start_pos']) - 1
+        if index >= 0:
+            _, end, shift = stable_ranges[index]
+            if chunk['end_pos'] <= end:
+                return shift
+        return None
+    
+    def _rechunk_gap(self, text: str, start: int, end: int, params: Dict[str, Any], chunks: List[Chunk]) -> int:
+        """Chunk text[start:end] with the wrapped strategy and append the shifted results."""
+        if end <= start or not text[start:end].strip():
+            return 0
+        for chunk in self.chunker.chunk_text(text[start:end], **params):
+            chunks.append(self._shifted_chunk(chunk, start, text))
+        return end - start
+    
+    @staticmethod
+    def _shifted_chunk(chunk, shift: int, text: str) -> Chunk:
+        """Copy a chunk onto the new text with its offsets moved by shift."""
+        fields = {key: chunk[key] for key in chunk if key != 'content'}
+        fields['start_pos'] += shift
+        fields['end_pos'] += shift
+        is_slice = isinstance(chunk, Chunk) and chunk.is_slice
+        return Chunk(content=None if is_slice else chunk['content'], source=text, **fields)
+    
+    @staticmethod
+    def _renumber(chunks: List[Chunk]):
+        """Give chunks sequential ids, and semantic groups sequential ids in document order."""
+        group_id = -1
+        previous_group = None
+        for chunk_id, chunk in enumerate(chunks):
+            chunk.chunk_id = chunk_id
+            if 'semantic_group' not in chunk:
+                continue
+            if chunk['semantic_group'] != previous_group:
+                previous_group = chunk['semantic_group']
+                group_id += 1
+            chunk.extra = tuple((key, group_id if key == 'semantic_group' else value) for key, value in chunk.extra)
\ No newline at end of file
@@ -1,6 +1,8 @@
-import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from utils.tokenizer import TokenizerUtils
+from utils.segmentation import paragraph_spans
+from utils.chunks import Chunk
+from utils.profiling import profiled
 
 class ParagraphBasedChunker:
     """Paragraph-based chunking strategy."""
@@ -8,7 +10,8 @@ class ParagraphBasedChunker:
     def __init__(self):
         self.tokenizer = TokenizerUtils()
     
-    def chunk_text(self, text: str, paragraphs_per_chunk: int = 1) -> List[Dict[str, Any]]:
+    @profiled('chunking')
+    def chunk_text(self, text: str, paragraphs_per_chunk: int = 1) -> List[Chunk]:
         """
         Chunk text by grouping paragraphs.
         
@@ -17,85 +20,50 @@ class ParagraphBasedChunker:
             paragraphs_per_chunk: Number of paragraphs per chunk
             
         Returns:
-            List of chunk dictionaries with metadata
+            List of Chunk records with metadata
         """
         if not text:
             return []
         
-        # Split into paragraphs
-        paragraphs = self._split_into_paragraphs(text)
-        if not paragraphs:
+        # Split into paragraph spans
+        paragraph_spans = self._paragraph_spans(text)
+        if not paragraph_spans:
             return []
         
+        document = self.tokenizer.tokenize_document(text)
         chunks = []
-        current_pos = 0
         
         # Group paragraphs into chunks
-        for i in range(0, len(paragraphs), paragraphs_per_chunk):
-            chunk_paragraphs = paragraphs[i:i + paragraphs_per_chunk]
-            chunk_text = '\n\n'.join(chunk_paragraphs)
-            
-            if not chunk_text.strip():
-                continue
-            
-            # Calculate positions
-            start_pos = text.find(chunk_paragraphs[0], current_pos)
-            end_pos = start_pos + len(chunk_text)
+        for i in range(0, len(paragraph_spans), paragraphs_per_chunk):
+            chunk_paragraphs = paragraph_spans[i:i + paragraphs_per_chunk]
+            start_pos = chunk_paragraphs[0][0]
+            end_pos = chunk_paragraphs[-1][1]
             
             # Create chunk metadata
-            chunk_data = {
-                'content': chunk_text.strip(),
-                'token_count': self.tokenizer.count_tokens(chunk_text),
-                'start_pos': start_pos,
-                'end_pos': end_pos,
-                'overlap': 0,  # No overlap in paragraph-based chunking by default
-                'chunk_id': len(chunks),
-                'strategy': 'paragraph_based',
-                'paragraph_count': len(chunk_paragraphs)
-            }
+            chunk_data = Chunk(
+                source=text,
+                token_count=document.token_count(start_pos, end_pos),
+                start_pos=start_pos,
+                end_pos=end_pos,
+                overlap=0,  # No overlap in paragraph-based chunking by default
+                chunk_id=len(chunks),
+                strategy='paragraph_based',
+                paragraph_count=len(chunk_paragraphs)
+            )
             
             chunks.append(chunk_data)
-            current_pos = end_pos
         
         return chunks
     
     def _split_into_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs using various paragraph boundary indicators."""
-        # Multiple strategies for paragraph detection
-        
-        # Strategy 1: Double newlines (most common)
-        paragraphs = re.split(r'\n\s*\n', text)
-        
-        # Filter out empty paragraphs
-        paragraphs = [p.strip() for p in paragraphs if p.strip()]
-        
-        # If no paragraphs found using double newlines, try single newlines
-        if len(paragraphs) <= 1:
-            paragraphs = text.split('\n')
-            paragraphs = [p.strip() for p in paragraphs if p.strip()]
-        
-        # If still no paragraphs, use sentence-based splitting as fallback
-        if len(paragraphs) <= 1:
-            paragraphs = self._split_by_sentence_groups(text)
-        
-        return paragraphs
+        return [text[start:end] for start, end in self._paragraph_spans(text)]
     
-    def _split_by_sentence_groups(self, text: str, sentences_per_group: int = 3) -> List[str]:
-        """Split text into sentence groups as paragraph fallback."""
-        # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        # Group sentences into pseudo-paragraphs
-        paragraphs = []
-        for i in range(0, len(sentences), sentences_per_group):
-            group = sentences[i:i + sentences_per_group]
-            if group:
-                paragraphs.append('. '.join(group) + '.')
-        
-        return paragraphs
+    def _paragraph_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Split text into (start, end) paragraph spans with the shared segmentation service."""
+        return paragraph_spans(text)
     
-    def chunk_text_with_overlap(self, text: str, paragraphs_per_chunk: int = 1, overlap_paragraphs: int = 0) -> List[Dict[str, Any]]:
+    def chunk_text_with_overlap(self, text: str, paragraphs_per_chunk: int = 1, overlap_paragraphs: int = 0) -> List[Chunk]:
         """
         Chunk text by paragraphs with overlap.
         
@@ -105,7 +73,7 @@ class ParagraphBasedChunker:
             overlap_paragraphs: Number of paragraphs to overlap between chunks
             
         Returns:
-            List of chunk dictionaries with metadata
+            List of Chunk records with metadata
         """
         if not text:
             return []
@@ -113,56 +81,56 @@ class ParagraphBasedChunker:
         if overlap_paragraphs >= paragraphs_per_chunk:
             overlap_paragraphs = max(0, paragraphs_per_chunk - 1)
         
-        paragraphs = self._split_into_paragraphs(text)
-        if not paragraphs:
+        paragraph_spans = self._paragraph_spans(text)
+        if not paragraph_spans:
             return []
         
+        document = self.tokenizer.tokenize_document(text)
         chunks = []
-        current_pos = 0
         
         step_size = paragraphs_per_chunk - overlap_paragraphs
         
-        for i in range(0, len(paragraphs), step_size):
-            chunk_paragraphs = paragraphs[i:i + paragraphs_per_chunk]
+        for i in range(0, len(paragraph_spans), step_size):
+            chunk_paragraphs = paragraph_spans[i:i + paragraphs_per_chunk]
             if not chunk_paragraphs:
                 break
-                
-            chunk_text = '\n\n'.join(chunk_paragraphs)
             
-            # Calculate positions
-            start_pos = text.find(chunk_paragraphs[0], current_pos)
-            end_pos = start_pos + len(chunk_text)
+            start_pos = chunk_paragraphs[0][0]
+            end_pos = chunk_paragraphs[-1][1]
             
             # Calculate actual overlap
             actual_overlap = 0
             if i > 0:
                 actual_overlap = min(overlap_paragraphs, len(chunk_paragraphs))
+            overlap_tokens = (
+                document.token_count(start_pos, chunk_paragraphs[actual_overlap - 1][1])
+                if actual_overlap else 0
+            )
             
-            chunk_data = {
-                'content': chunk_text.strip(),
-                'token_count': self.tokenizer.count_tokens(chunk_text),
-                'start_pos': start_pos,
-                'end_pos': end_pos,
-                'overlap': self.tokenizer.count_tokens('\n\n'.join(chunk_paragraphs[:actual_overlap])),
-                'chunk_id': len(chunks),
-                'strategy': 'paragraph_based',
-                'paragraph_count': len(chunk_paragraphs)
-            }
+            chunk_data = Chunk(
+                source=text,
+                token_count=document.token_count(start_pos, end_pos),
+                start_pos=start_pos,
+                end_pos=end_pos,
+                overlap=overlap_tokens,
+                chunk_id=len(chunks),
+                strategy='paragraph_based',
+                paragraph_count=len(chunk_paragraphs)
+            )
             
             chunks.append(chunk_data)
-            current_pos = end_pos - len('\n\n'.join(chunk_paragraphs[:actual_overlap]))
             
             # Stop if we've processed all paragraphs
-            if i + paragraphs_per_chunk >= len(paragraphs):
+            if i + paragraphs_per_chunk >= len(paragraph_spans):
                 break
         
         return chunks
     
     def analyze_paragraph_structure(self, text: str) -> Dict[str, Any]:
         """Analyze the paragraph structure of the text."""
-        paragraphs = self._split_into_paragraphs(text)
+        paragraph_spans = self._paragraph_spans(text)
         
-        if not paragraphs:
+        if not paragraph_spans:
             return {
                 'total_paragraphs': 0,
                 'avg_paragraph_length': 0,
@@ -171,8 +139,9 @@ class ParagraphBasedChunker:
             }
         
         # Calculate statistics
-        paragraph_lengths = [len(p) for p in paragraphs]
-        paragraph_token_counts = [self.tokenizer.count_tokens(p) for p in paragraphs]
+        document = self.tokenizer.tokenize_document(text)
+        paragraph_lengths = [end - start for start, end in paragraph_spans]
+        paragraph_token_counts = [document.token_count(start, end) for start, end in paragraph_spans]
         
         avg_length = sum(paragraph_lengths) / len(paragraph_lengths)
         avg_tokens = sum(paragraph_token_counts) / len(paragraph_token_counts)
@@ -190,7 +159,7 @@ class ParagraphBasedChunker:
             quality = 'poor'
         
         return {
-            'total_paragraphs': len(paragraphs),
+            'total_paragraphs': len(paragraph_spans),
             'avg_paragraph_length': avg_length,
             'avg_tokens_per_paragraph': avg_tokens,
             'min_paragraph_length': min(paragraph_lengths),
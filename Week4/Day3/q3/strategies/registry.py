@@ -0,0 +1,31 @@
+from typing import Dict, Type
+from strategies.fixed_length import FixedLengthChunker
+from strategies.sliding_window import SlidingWindowChunker
+from strategies.sentence_based import SentenceBasedChunker
+from strategies.paragraph_based import ParagraphBasedChunker
+from strategies.semantic_chunking import SemanticChunker
+from strategies.token_budget import TokenBudgetChunker
+
+# Strategy classes keyed by the 'strategy' name each chunker writes into its chunks
+STRATEGY_CLASSES: Dict[str, Type] = {
+    'fixed_length': FixedLengthChunker,
+    'sliding_window': SlidingWindowChunker,
+    'sentence_based': SentenceBasedChunker,
+    'paragraph_based': ParagraphBasedChunker,
+    'semantic_chunking': SemanticChunker,
+    'token_budget': TokenBudgetChunker,
+}
+
+_STRATEGY_INSTANCES: Dict[str, object] = {}
+
+def create_strategy(name: str):
+    """Create a new chunker instance for a strategy name."""
+    if name not in STRATEGY_CLASSES:
+        raise ValueError(f"Unknown chunking strategy: {name}. Available: {', '.join(STRATEGY_CLASSES)}")
+    return STRATEGY_CLASSES[name]()
+
+def get_strategy(name: str):
+    """Return the process-wide chunker for a strategy, creating it on first use."""
+    if name not in _STRATEGY_INSTANCES:
+        _STRATEGY_INSTANCES[name] = create_strategy(name)
+    return _STRATEGY_INSTANCES[name]
\ No newline at end of file
@@ -1,29 +1,28 @@
+import importlib.util
 import numpy as np
-from typing import List, Dict, Any, Optional
-from utils.tokenizer import TokenizerUtils
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from utils.tokenizer import TokenizerUtils, TokenizedDocument
+from utils.segmentation import sentence_spans
+from utils.chunks import Chunk
+from utils.embedding_cache import EMBEDDING_DTYPES, INT8_SCALE, get_embedding_cache, quantize_embeddings
+from utils.profiling import profiled
+from utils import embedding_analysis
 from sklearn.cluster import AgglomerativeClustering
 import streamlit as st
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+# sentence-transformers pulls in torch, which takes seconds to import, so it is
+# only imported when the embedding model is first needed
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec('sentence_transformers') is not None
 
-try:
-    import nltk
-    from nltk.tokenize import sent_tokenize
-    NLTK_AVAILABLE = True
-    
-    # Download required NLTK data
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt', quiet=True)
-        
-except ImportError:
-    NLTK_AVAILABLE = False
+# Sentence embeddings converted to float32 at a time when low-precision matrices are combined
+_FLOAT32_BLOCK_ROWS = 2048
+
+@lru_cache(maxsize=None)
+def load_embedding_model(model_name: str):
+    """Load a SentenceTransformer model once per process."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
 
 class SemanticChunker:
     """Semantic chunking strategy using sentence embeddings."""
@@ -31,8 +30,22 @@ class SemanticChunker:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
         self.tokenizer = TokenizerUtils()
         self.model_name = model_name
-        self.embedding_model = self._initialize_embedding_model()
-        
+        self._embedding_model = None
+        self._embedding_model_loaded = False
+    
+    @property
+    def embedding_model(self):
+        """The sentence embedding model, loaded on first use (None if unavailable)."""
+        if not self._embedding_model_loaded:
+            self._embedding_model = self._initialize_embedding_model()
+            self._embedding_model_loaded = True
+        return self._embedding_model
+    
+    @embedding_model.setter
+    def embedding_model(self, model):
+        self._embedding_model = model
+        self._embedding_model_loaded = True
+    
     def _initialize_embedding_model(self):
         """Initialize the sentence embedding model."""
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
@@ -40,13 +53,17 @@ class SemanticChunker:
             return None
         
         try:
-            model = SentenceTransformer(self.model_name)
+            model = load_embedding_model(self.model_name)
             return model
         except Exception as e:
             st.warning(f"Failed to load embedding model: {str(e)}. Using fallback method.")
             return None
     
-    def chunk_text(self, text: str, similarity_threshold: float = 0.7, max_chunk_size: int = 600) -> List[Dict[str, Any]]:
+    @profiled('chunking')
+    def chunk_text(self, text: str, similarity_threshold: float = 0.7, max_chunk_size: int = 600,
+                   segmentation_mode: str = 'adjacent', window_size: int = 1,
+                   breakpoint_percentile: Optional[float] = None, batch_size: int = 64,
+                   embedding_dtype: str = 'float32') -> List[Chunk]:
         """
         Chunk text using semantic similarity.
         
@@ -54,62 +71,119 @@ class SemanticChunker:
             text: Input text to chunk
             similarity_threshold: Minimum similarity to group sentences
             max_chunk_size: Maximum tokens per chunk
-            
+            segmentation_mode: 'adjacent' (linear, preserves document order) or
+                'clustering' (agglomerative clustering over all sentence pairs)
+            window_size: Sentences averaged on each side of a candidate boundary ('adjacent' mode)
+            breakpoint_percentile: If set, cut at boundaries whose distance exceeds this
+                percentile instead of using similarity_threshold ('adjacent' mode)
+            batch_size: Sentences per forward pass of the embedding model
+            embedding_dtype: Storage precision of the embedding matrix: 'float32',
+                'float16' (half the memory) or 'int8' (a quarter of the memory)
+        
         Returns:
-            List of chunk dictionaries with metadata
+            List of Chunk records with metadata
         """
         if not text:
             return []
         
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {embedding_dtype}")
+        
         if self.embedding_model is None:
             return self._fallback_chunking(text, max_chunk_size)
         
-        # Split into sentences
-        sentences = self._split_into_sentences(text)
-        if not sentences:
+        # Split into sentences once; spans are reused when building chunks
+        sentence_spans = self._sentence_spans(text)
+        if not sentence_spans:
             return []
+        sentences = [text[start:end] for start, end in sentence_spans]
         
-        # Generate embeddings for all sentences
-        embeddings = self._generate_embeddings(sentences)
+        # Generate unit-length embeddings for all sentences, stored at the requested precision
+        embeddings = self._generate_embeddings(sentences, batch_size, embedding_dtype)
         
         # Group semantically similar sentences
-        sentence_groups = self._group_similar_sentences(
-            sentences, embeddings, similarity_threshold
-        )
+        if segmentation_mode == 'adjacent':
+            sentence_groups = self._adjacent_boundary_grouping(
+                embeddings, similarity_threshold, window_size, breakpoint_percentile
+            )
+        elif segmentation_mode == 'clustering':
+            sentence_groups = self._group_similar_sentences(
+                sentences, embeddings, similarity_threshold
+            )
+        else:
+            raise ValueError(f"Unsupported segmentation mode: {segmentation_mode}")
         
         # Convert groups to chunks with size limits
         chunks = self._create_chunks_from_groups(
-            sentence_groups, text, max_chunk_size
+            sentence_groups, text, sentence_spans, max_chunk_size
         )
         
         return chunks
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences."""
-        if NLTK_AVAILABLE:
-            try:
-                sentences = sent_tokenize(text)
-                return [s.strip() for s in sentences if s.strip()]
-            except Exception:
-                return self._simple_sentence_split(text)
-        else:
-            return self._simple_sentence_split(text)
+        return [text[start:end] for start, end in self._sentence_spans(text)]
     
-    def _simple_sentence_split(self, text: str) -> List[str]:
-        """Simple sentence splitting fallback."""
-        import re
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+    def _sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Split text into (start, end) sentence spans with the shared segmentation service."""
+        return sentence_spans(text)
     
-    def _generate_embeddings(self, sentences: List[str]) -> np.ndarray:
-        """Generate embeddings for sentences."""
+    @profiled('embedding')
+    def _generate_embeddings(self, sentences: List[str], batch_size: int = 64,
+                             embedding_dtype: str = 'float32') -> np.ndarray:
+        """
+        Generate unit-length embeddings at the storage precision, reusing cached vectors where possible.
+        
+        Vectors are quantized batch by batch and cached at embedding_dtype, so
+        no float32 copy of the whole matrix is ever held.
+        """
+        def encode(batch: List[str]) -> np.ndarray:
+            return self.embedding_model.encode(batch, batch_size=batch_size, normalize_embeddings=True,
+                                               convert_to_numpy=True, show_progress_bar=False)
+        
         try:
-            embeddings = self.embedding_model.encode(sentences)
+            embeddings = get_embedding_cache(self.model_name, embedding_dtype).encode(sentences, encode)
             return embeddings
         except Exception as e:
             st.error(f"Error generating embeddings: {str(e)}")
-            return np.random.rand(len(sentences), 384)  # Fallback random embeddings
+            embeddings = np.random.rand(len(sentences), 384).astype(np.float32)  # Fallback random embeddings
+            return quantize_embeddings(embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True),
+                                       embedding_dtype)
+    
+    @staticmethod
+    def _as_float32(embeddings: np.ndarray) -> np.ndarray:
+        """Return embeddings of any storage precision as float32 unit vectors (use on blocks of rows)."""
+        if embeddings.dtype == np.int8:
+            return embeddings.astype(np.float32) / INT8_SCALE
+        return embeddings.astype(np.float32, copy=False)
     
+    @staticmethod
+    def _row_dots(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Row-wise dot products, accumulated without materializing float32 copies."""
+        if left.dtype == np.int8:
+            return np.einsum('ij,ij->i', left, right, dtype=np.int32) / (INT8_SCALE * INT8_SCALE)
+        return np.einsum('ij,ij->i', left, right, dtype=np.float32)
+    
+    def _similarity_matrix(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Pairwise cosine similarity of unit-length embeddings as a plain dot product.
+        
+        Low-precision embeddings are converted to float32 one block of rows at a
+        time, so only the n x n result is allocated in full.
+        """
+        n = len(embeddings)
+        if embeddings.dtype == np.float32:
+            return np.clip(embeddings @ embeddings.T, -1.0, 1.0)
+        
+        similarity = np.empty((n, n), dtype=np.float32)
+        for row in range(0, n, _FLOAT32_BLOCK_ROWS):
+            left = self._as_float32(embeddings[row:row + _FLOAT32_BLOCK_ROWS])
+            for column in range(0, n, _FLOAT32_BLOCK_ROWS):
+                right = self._as_float32(embeddings[column:column + _FLOAT32_BLOCK_ROWS])
+                np.matmul(left, right.T, out=similarity[row:row + len(left), column:column + len(right)])
+        return np.clip(similarity, -1.0, 1.0, out=similarity)
+    
+    @profiled('clustering')
     def _group_similar_sentences(self, sentences: List[str], embeddings: np.ndarray, 
                                  similarity_threshold: float) -> List[List[int]]:
         """Group sentences based on semantic similarity."""
@@ -119,7 +193,7 @@ class SemanticChunker:
             return [[0]] if n_sentences == 1 else []
         
         # Calculate similarity matrix
-        similarity_matrix = cosine_similarity(embeddings)
+        similarity_matrix = self._similarity_matrix(embeddings)
         
         # Use hierarchical clustering
         # Convert similarity to distance
@@ -154,177 +228,222 @@ class SemanticChunker:
     def _sequential_grouping(self, sentences: List[str], embeddings: np.ndarray, 
                             similarity_threshold: float) -> List[List[int]]:
         """Sequential grouping fallback method."""
-        groups = []
-        current_group = [0]
-        
-        for i in range(1, len(sentences)):
-            # Calculate similarity with the last sentence in current group
-            similarity = cosine_similarity(
-                embeddings[current_group[-1]].reshape(1, -1),
-                embeddings[i].reshape(1, -1)
-            )[0, 0]
-            
-            if similarity >= similarity_threshold:
-                current_group.append(i)
-            else:
-                groups.append(current_group)
-                current_group = [i]
+        return self._adjacent_boundary_grouping(embeddings, similarity_threshold)
+    
+    @profiled('clustering')
+    def _adjacent_boundary_grouping(self, embeddings: np.ndarray, similarity_threshold: float,
+                                    window_size: int = 1,
+                                    breakpoint_percentile: Optional[float] = None) -> List[List[int]]:
+        """
+        Segment sentences in document order by cutting at low-similarity boundaries.
         
-        if current_group:
-            groups.append(current_group)
+        Only consecutive sentences (or windows of them) are compared, so time and
+        memory are linear in the number of sentences.
+        """
+        n_sentences = len(embeddings)
+        if n_sentences <= 1:
+            return [[0]] if n_sentences == 1 else []
+        
+        similarities = self._boundary_similarities(embeddings, max(1, window_size))
         
-        return groups
+        if breakpoint_percentile is not None:
+            distances = 1 - similarities
+            is_break = distances > np.percentile(distances, breakpoint_percentile)
+        else:
+            is_break = similarities < similarity_threshold
+        
+        # Boundary i sits between sentence i and sentence i + 1
+        starts = np.concatenate(([0], np.flatnonzero(is_break) + 1))
+        ends = np.concatenate((starts[1:], [n_sentences]))
+        return [list(range(start, end)) for start, end in zip(starts, ends)]
     
-    def _create_chunks_from_groups(self, sentence_groups: List[List[int]], 
-                                   text: str, max_chunk_size: int) -> List[Dict[str, Any]]:
+    def _boundary_similarities(self, embeddings: np.ndarray, window_size: int) -> np.ndarray:
+        """Cosine similarity across each of the n - 1 sentence boundaries."""
+        if window_size == 1:
+            # Embeddings are unit length, so the dot product is the cosine similarity
+            return self._row_dots(embeddings[:-1], embeddings[1:])
+        
+        # Compare the mean of up to window_size sentences on each side of every boundary, a block of
+        # boundaries at a time: prefix sums only span the block, so low-precision embeddings stay compact
+        n_sentences = len(embeddings)
+        similarities = np.empty(n_sentences - 1, dtype=np.float32)
+        for first in range(1, n_sentences, _FLOAT32_BLOCK_ROWS):
+            boundary = np.arange(first, min(first + _FLOAT32_BLOCK_ROWS, n_sentences))
+            low = max(first - window_size, 0)
+            high = min(boundary[-1] + window_size, n_sentences)
+            # Scaling (int8) is irrelevant here: window means are normalized below
+            prefix = np.zeros((high - low + 1, embeddings.shape[1]), dtype=np.float32)
+            np.cumsum(embeddings[low:high], axis=0, dtype=np.float32, out=prefix[1:])
+            left = prefix[boundary - low] - prefix[np.maximum(boundary - window_size, 0) - low]
+            right = prefix[np.minimum(boundary + window_size, n_sentences) - low] - prefix[boundary - low]
+            left /= np.maximum(np.linalg.norm(left, axis=1, keepdims=True), 1e-12)
+            right /= np.maximum(np.linalg.norm(right, axis=1, keepdims=True), 1e-12)
+            similarities[boundary - 1] = np.einsum('ij,ij->i', left, right)
+        return similarities
+    
+    def _create_chunks_from_groups(self, sentence_groups: List[List[int]], text: str,
+                                   sentence_spans: List[Tuple[int, int]], max_chunk_size: int) -> List[Chunk]:
         """Create chunks from sentence groups with size limits."""
         chunks = []
-        sentences = self._split_into_sentences(text)
+        document = self.tokenizer.tokenize_document(text)
         
         for group_idx, sentence_indices in enumerate(sentence_groups):
-            group_sentences = [sentences[i] for i in sentence_indices]
-            
             # Check if group exceeds max size
-            group_text = ' '.join(group_sentences)
-            group_tokens = self.tokenizer.count_tokens(group_text)
+            group_tokens = self._group_token_count(document, sentence_spans, sentence_indices)
             
             if group_tokens <= max_chunk_size:
                 # Group fits in one chunk
                 chunk_data = self._create_chunk_data(
-                    group_text, text, len(chunks), group_idx
+                    text, document, sentence_spans, sentence_indices, len(chunks), group_idx
                 )
                 chunks.append(chunk_data)
             else:
                 # Split large group into multiple chunks
                 sub_chunks = self._split_large_group(
-                    group_sentences, max_chunk_size, text, len(chunks), group_idx
+                    sentence_indices, max_chunk_size, text, document, sentence_spans, len(chunks), group_idx
                 )
                 chunks.extend(sub_chunks)
         
         return chunks
     
-    def _split_large_group(self, sentences: List[str], max_chunk_size: int, 
-                          text: str, chunk_id_start: int, group_id: int) -> List[Dict[str, Any]]:
+    def _group_token_count(self, document: TokenizedDocument, sentence_spans: List[Tuple[int, int]],
+                           sentence_indices: List[int]) -> int:
+        """Token count of a sentence group, looked up from the document index."""
+        if self._is_contiguous(sentence_indices):
+            return document.token_count(sentence_spans[sentence_indices[0]][0], sentence_spans[sentence_indices[-1]][1])
+        return sum(document.token_count(*sentence_spans[i]) for i in sentence_indices)
+    
+    @staticmethod
+    def _is_contiguous(sentence_indices: List[int]) -> bool:
+        """Whether a group covers consecutive sentences of the document."""
+        return sentence_indices[-1] - sentence_indices[0] == len(sentence_indices) - 1
+    
+    def _split_large_group(self, sentence_indices: List[int], max_chunk_size: int, text: str,
+                           document: TokenizedDocument, sentence_spans: List[Tuple[int, int]],
+                           chunk_id_start: int, group_id: int) -> List[Chunk]:
         """Split a large semantic group into multiple chunks."""
         chunks = []
         current_chunk_sentences = []
         current_tokens = 0
         
-        for sentence in sentences:
-            sentence_tokens = self.tokenizer.count_tokens(sentence)
+        for sentence_idx in sentence_indices:
+            sentence_tokens = document.token_count(*sentence_spans[sentence_idx])
             
             if current_tokens + sentence_tokens <= max_chunk_size:
-                current_chunk_sentences.append(sentence)
+                current_chunk_sentences.append(sentence_idx)
                 current_tokens += sentence_tokens
             else:
                 # Create chunk with current sentences
                 if current_chunk_sentences:
-                    chunk_text = ' '.join(current_chunk_sentences)
                     chunk_data = self._create_chunk_data(
-                        chunk_text, text, chunk_id_start + len(chunks), group_id
+                        text, document, sentence_spans, current_chunk_sentences,
+                        chunk_id_start + len(chunks), group_id
                     )
                     chunks.append(chunk_data)
                 
                 # Start new chunk
-                current_chunk_sentences = [sentence]
+                current_chunk_sentences = [sentence_idx]
                 current_tokens = sentence_tokens
         
         # Add remaining sentences
         if current_chunk_sentences:
-            chunk_text = ' '.join(current_chunk_sentences)
             chunk_data = self._create_chunk_data(
-                chunk_text, text, chunk_id_start + len(chunks), group_id
+                text, document, sentence_spans, current_chunk_sentences,
+                chunk_id_start + len(chunks), group_id
             )
             chunks.append(chunk_data)
         
         return chunks
     
-    def _create_chunk_data(self, chunk_text: str, original_text: str, 
-                          chunk_id: int, group_id: int) -> Dict[str, Any]:
-        """Create chunk data dictionary."""
-        # Find position in original text
-        start_pos = original_text.find(chunk_text.split('.')[0])  # Approximate
-        end_pos = start_pos + len(chunk_text)
-        
-        return {
-            'content': chunk_text.strip(),
-            'token_count': self.tokenizer.count_tokens(chunk_text),
-            'start_pos': max(0, start_pos),
-            'end_pos': end_pos,
-            'overlap': 0,  # Semantic chunks don't have traditional overlap
-            'chunk_id': chunk_id,
-            'strategy': 'semantic_chunking',
-            'semantic_group': group_id,
-            'sentence_count': len(chunk_text.split('.'))
-        }
+    def _create_chunk_data(self, text: str, document: TokenizedDocument, sentence_spans: List[Tuple[int, int]],
+                           sentence_indices: List[int], chunk_id: int, group_id: int) -> Chunk:
+        """Create the chunk record for a group of sentences."""
+        start_pos = sentence_spans[sentence_indices[0]][0]
+        end_pos = sentence_spans[sentence_indices[-1]][1]
+        
+        if self._is_contiguous(sentence_indices):
+            content = None  # Sliced from the source text on access
+        else:
+            # Clustered groups can gather sentences from across the document
+            content = ' '.join(text[sentence_spans[i][0]:sentence_spans[i][1]] for i in sentence_indices)
+        
+        return Chunk(
+            content=content,
+            source=text,
+            token_count=self._group_token_count(document, sentence_spans, sentence_indices),
+            start_pos=start_pos,
+            end_pos=end_pos,
+            overlap=0,  # Semantic chunks don't have traditional overlap
+            chunk_id=chunk_id,
+            strategy='semantic_chunking',
+            semantic_group=group_id,
+            sentence_count=len(sentence_indices)
+        )
     
-    def _fallback_chunking(self, text: str, max_chunk_size: int) -> List[Dict[str, Any]]:
+    def _fallback_chunking(self, text: str, max_chunk_size: int) -> List[Chunk]:
         """Fallback to sentence-based chunking when embeddings are unavailable."""
-        sentences = self._split_into_sentences(text)
+        sentence_spans = self._sentence_spans(text)
+        document = self.tokenizer.tokenize_document(text)
         
         chunks = []
         current_chunk = []
         current_tokens = 0
         
-        for sentence in sentences:
-            sentence_tokens = self.tokenizer.count_tokens(sentence)
+        for sentence_idx, (start, end) in enumerate(sentence_spans):
+            sentence_tokens = document.token_count(start, end)
             
             if current_tokens + sentence_tokens <= max_chunk_size:
-                current_chunk.append(sentence)
+                current_chunk.append(sentence_idx)
                 current_tokens += sentence_tokens
             else:
                 # Create chunk
                 if current_chunk:
-                    chunk_text = ' '.join(current_chunk)
                     chunk_data = self._create_chunk_data(
-                        chunk_text, text, len(chunks), len(chunks)
+                        text, document, sentence_spans, current_chunk, len(chunks), len(chunks)
                     )
                     chunks.append(chunk_data)
                 
                 # Start new chunk
-                current_chunk = [sentence]
+                current_chunk = [sentence_idx]
                 current_tokens = sentence_tokens
         
         # Add remaining sentences
         if current_chunk:
-            chunk_text = ' '.join(current_chunk)
             chunk_data = self._create_chunk_data(
-                chunk_text, text, len(chunks), len(chunks)
+                text, document, sentence_spans, current_chunk, len(chunks), len(chunks)
             )
             chunks.append(chunk_data)
         
         return chunks
     
-    def analyze_semantic_coherence(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze semantic coherence of chunks."""
-        if not chunks or self.embedding_model is None:
+    def embed_chunks(self, chunks: Sequence[Chunk]) -> Optional[np.ndarray]:
+        """Unit-length float32 embeddings of chunk contents (None without the embedding model)."""
+        if not len(chunks) or self.embedding_model is None:
+            return None
+        return self._generate_embeddings([chunk['content'] for chunk in chunks])
+    
+    def analyze_semantic_coherence(self, chunks: Sequence[Chunk],
+                                   embeddings: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Analyze semantic coherence of chunks (embeddings from embed_chunks may be passed in)."""
+        if embeddings is None:
+            embeddings = self.embed_chunks(chunks)
+        if embeddings is None:
             return {'analysis': 'unavailable'}
         
-        # Extract chunk texts
-        chunk_texts = [chunk['content'] for chunk in chunks]
-        
-        # Generate embeddings
-        embeddings = self._generate_embeddings(chunk_texts)
-        
-        # Calculate inter-chunk similarity
-        similarity_matrix = cosine_similarity(embeddings)
-        
-        # Calculate metrics
-        n_chunks = len(chunks)
-        total_similarity = 0
-        comparison_count = 0
-        
-        for i in range(n_chunks):
-            for j in range(i + 1, n_chunks):
-                total_similarity += similarity_matrix[i, j]
-                comparison_count += 1
-        
-        avg_similarity = total_similarity / comparison_count if comparison_count > 0 else 0
+        # Inter-chunk similarity, shared with the visualizations through the artifact cache; the
+        # full matrix is only formed for chunk counts the heatmap shows unbinned
+        similarity_matrix = None
+        if len(embeddings) <= embedding_analysis.MAX_HEATMAP_BINS:
+            similarity_matrix = embedding_analysis.similarity_matrix(embeddings)
+        statistics = embedding_analysis.pairwise_statistics(embeddings)
         
         return {
-            'average_inter_chunk_similarity': avg_similarity,
-            'similarity_matrix': similarity_matrix.tolist(),
-            'coherence_score': avg_similarity,
+            'average_inter_chunk_similarity': statistics['mean'],
+            'similarity_std': statistics['std'],
+            'min_similarity': statistics['min'],
+            'max_similarity': statistics['max'],
+            'similarity_matrix': similarity_matrix,  # read-only, shared with the artifact cache (None above MAX_HEATMAP_BINS)
+            'coherence_score': statistics['mean'],
             'analysis': 'complete'
         }
     
@@ -345,6 +464,36 @@ class SemanticChunker:
                     'description': 'Maximum tokens per chunk',
                     'default': 600,
                     'range': [100, 1500]
+                },
+                'segmentation_mode': {
+                    'type': 'str',
+                    'description': "'adjacent' cuts at low-similarity boundaries in document order; 'clustering' groups sentences across the whole document",
+                    'default': 'adjacent',
+                    'options': ['adjacent', 'clustering']
+                },
+                'window_size': {
+                    'type': 'int',
+                    'description': 'Sentences compared on each side of a boundary (adjacent mode)',
+                    'default': 1,
+                    'range': [1, 10]
+                },
+                'breakpoint_percentile': {
+                    'type': 'float',
+                    'description': 'Cut where boundary distance exceeds this percentile (adjacent mode, overrides threshold)',
+                    'default': None,
+                    'range': [50, 99]
+                },
+                'batch_size': {
+                    'type': 'int',
+                    'description': 'Sentences per forward pass of the embedding model',
+                    'default': 64,
+                    'range': [8, 512]
+                },
+                'embedding_dtype': {
+                    'type': 'str',
+                    'description': 'Storage precision of the embedding matrix (float16 halves, int8 quarters memory)',
+                    'default': 'float32',
+                    'options': list(EMBEDDING_DTYPES)
                 }
             },
             'pros': [
@@ -1,5 +1,87 @@
-from typing import List, Dict, Any
+from collections.abc import Sequence
+from typing import List, Dict, Any, Optional, Union
+import numpy as np
 from utils.tokenizer import TokenizerUtils
+from utils.chunks import Chunk
+from utils.profiling import profiled
+
+class SlidingWindowView(Sequence):
+    """
+    Sliding window chunks held as compact records instead of a list of Chunk objects.
+    
+    Each window is one (token_start, token_end, char_start, char_end) row of an
+    integer array; the token ids are shared with the tokenized document. Chunk
+    records are only built when a chunk is read, and slice their 'content' from
+    the shared text, so overlapping windows never duplicate text in memory.
+    """
+    
+    __slots__ = ('text', 'records', 'token_ids', 'token_scale', 'overlap_units')
+    
+    def __init__(self, text: str, records: np.ndarray, token_ids: Optional[np.ndarray],
+                 token_scale: float, overlap_units: int):
+        self.text = text
+        self.records = records
+        self.token_ids = token_ids
+        self.token_scale = token_scale
+        self.overlap_units = overlap_units
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Chunk, List[Chunk]]:
+        if isinstance(index, slice):
+            return [self._chunk(i, self.records[i].tolist()) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return self._chunk(index, self.records[index].tolist())
+    
+    def __iter__(self):
+        for index, record in enumerate(self.records.tolist()):
+            yield self._chunk(index, record)
+    
+    def column(self, name: str) -> np.ndarray:
+        """A numeric chunk field for every window as one array, without building chunks."""
+        first, last = self.records[:, 0], self.records[:, 1]
+        if name == 'start_pos':
+            return self.records[:, 2]
+        if name == 'end_pos':
+            return self.records[:, 3]
+        if name == 'token_count':
+            return ((last - first) * self.token_scale).astype(np.int64)
+        if name == 'overlap':
+            overlap_units = np.where(first > 0, np.minimum(self.overlap_units, last - first), 0)
+            return (overlap_units * self.token_scale).astype(np.int64)
+        if name == 'chunk_id':
+            return np.arange(len(self.records))
+        raise KeyError(name)
+    
+    def window_token_ids(self, index: int) -> Optional[np.ndarray]:
+        """Token ids of a window as a view into the shared token array (None without tiktoken)."""
+        if self.token_ids is None:
+            return None
+        first, last = self.records[index, :2]
+        return self.token_ids[first:last]
+    
+    def _chunk(self, index: int, record: List[int]) -> Chunk:
+        """Build the Chunk for one window record."""
+        first, last, start_pos, end_pos = record
+        
+        # Calculate actual overlap for this chunk
+        actual_overlap = 0
+        if first > 0:
+            actual_overlap = min(self.overlap_units, last - first)
+        
+        return Chunk(
+            source=self.text,
+            token_count=int((last - first) * self.token_scale),
+            start_pos=start_pos,
+            end_pos=end_pos,
+            overlap=int(actual_overlap * self.token_scale),
+            chunk_id=index,
+            strategy='sliding_window'
+        )
 
 class SlidingWindowChunker:
     """Sliding window chunking strategy with overlap."""
@@ -7,7 +89,9 @@ class SlidingWindowChunker:
     def __init__(self):
         self.tokenizer = TokenizerUtils()
     
-    def chunk_text(self, text: str, chunk_size: int = 512, overlap: int = 50) -> List[Dict[str, Any]]:
+    @profiled('chunking')
+    def chunk_text(self, text: str, chunk_size: int = 512, overlap: int = 50,
+                   lazy: bool = False) -> Union[List[Chunk], SlidingWindowView]:
         """
         Chunk text using sliding window with overlap.
         
@@ -15,9 +99,10 @@ class SlidingWindowChunker:
             text: Input text to chunk
             chunk_size: Number of tokens per chunk
             overlap: Number of tokens to overlap between chunks
-            
+            lazy: Return a SlidingWindowView that builds Chunk records on access
+        
         Returns:
-            List of chunk dictionaries with metadata
+            List of Chunk records with metadata (or a SlidingWindowView)
         """
         if not text:
             return []
@@ -25,98 +110,24 @@ class SlidingWindowChunker:
         if overlap >= chunk_size:
             overlap = chunk_size // 2  # Ensure overlap is less than chunk size
         
-        chunks = []
-        current_pos = 0
-        
-        # Tokenize the entire text first
-        if self.tokenizer.tokenizer is not None:
-            tokens = self.tokenizer.tokenizer.encode(text)
-            step_size = chunk_size - overlap
-            
-            for i in range(0, len(tokens), step_size):
-                chunk_tokens = tokens[i:i + chunk_size]
-                if len(chunk_tokens) == 0:
-                    break
-                
-                # Decode tokens back to text
-                chunk_text = self.tokenizer.tokenizer.decode(chunk_tokens)
-                
-                # Calculate positions (approximate)
-                start_pos = current_pos
-                end_pos = current_pos + len(chunk_text)
-                
-                # Calculate actual overlap for this chunk
-                actual_overlap = 0
-                if i > 0:
-                    actual_overlap = min(overlap, len(chunk_tokens))
-                
-                chunk_data = {
-                    'content': chunk_text.strip(),
-                    'token_count': len(chunk_tokens),
-                    'start_pos': start_pos,
-                    'end_pos': end_pos,
-                    'overlap': actual_overlap,
-                    'chunk_id': len(chunks),
-                    'strategy': 'sliding_window'
-                }
-                
-                chunks.append(chunk_data)
-                current_pos += len(chunk_text) - (actual_overlap * 2)  # Approximate position adjustment
-                
-                # Stop if we've reached the end
-                if i + chunk_size >= len(tokens):
-                    break
-        
-        else:
-            # Fallback to word-based sliding window
-            chunks = self._sliding_window_fallback(text, chunk_size, overlap)
-        
-        return chunks
-    
-    def _sliding_window_fallback(self, text: str, chunk_size: int, overlap: int) -> List[Dict[str, Any]]:
-        """Fallback sliding window implementation using word-based estimation."""
-        words = text.split()
-        words_per_chunk = int(chunk_size / 0.75)  # Estimate: 0.75 tokens per word
-        overlap_words = int(overlap / 0.75)
+        # Tokenize the entire text once (shared with the other strategies)
+        document = self.tokenizer.tokenize_document(text)
+        n_units = len(document)
+        units_per_chunk = document.units_for_tokens(chunk_size)
+        overlap_units = int(overlap / document.token_scale)
+        step_size = max(1, units_per_chunk - overlap_units)
         
-        chunks = []
-        current_pos = 0
-        step_size = words_per_chunk - overlap_words
+        # Window starts, up to and including the first window that reaches the end
+        firsts = np.arange(0, n_units, step_size)
+        firsts = firsts[:np.searchsorted(firsts + units_per_chunk, n_units) + 1]
+        lasts = np.minimum(firsts + units_per_chunk, n_units)
         
-        for i in range(0, len(words), step_size):
-            chunk_words = words[i:i + words_per_chunk]
-            if not chunk_words:
-                break
-                
-            chunk_text = ' '.join(chunk_words)
-            
-            # Calculate positions
-            start_pos = current_pos
-            end_pos = current_pos + len(chunk_text)
-            
-            # Calculate actual overlap
-            actual_overlap = 0
-            if i > 0:
-                actual_overlap = min(overlap_words, len(chunk_words))
-            
-            chunk_data = {
-                'content': chunk_text,
-                'token_count': self.tokenizer.count_tokens(chunk_text),
-                'start_pos': start_pos,
-                'end_pos': end_pos,
-                'overlap': int(actual_overlap * 0.75),  # Convert back to estimated tokens
-                'chunk_id': len(chunks),
-                'strategy': 'sliding_window'
-            }
-            
-            chunks.append(chunk_data)
-            current_pos += len(chunk_text) - len(' '.join(chunk_words[:actual_overlap]))
-            
-            # Stop if we've processed all words
-            if i + words_per_chunk >= len(words):
-                break
+        # Exact character offsets of each window
+        start_positions, end_positions = document.token_spans(firsts, lasts)
+        records = np.column_stack([firsts, lasts, start_positions, end_positions]).astype(np.int64)
         
-        return chunks
+        view = SlidingWindowView(text, records, document.token_ids, document.token_scale, overlap_units)
+        return view if lazy else list(view)
     
     def get_strategy_info(self) -> Dict[str, Any]:
         """Return information about this chunking strategy."""
@@ -0,0 +1,50 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+CACHE_DIR_ENV_VAR = 'RAG_CHUNKING_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'rag_chunking')
+
+def get_cache_dir(*parts: str) -> str:
+    """Return (and create) a directory below the application cache root."""
+    root = os.environ.get(CACHE_DIR_ENV_VAR) or DEFAULT_CACHE_DIR
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+class LRUCache:
+    """Thread-safe in-memory least-recently-used cache."""
+    
+    def __init__(self, max_items: int = 1024):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, marking it as recently used."""
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._items.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+    
+    def __len__(self) -> int:
+        return len(self._items)
\ No newline at end of file
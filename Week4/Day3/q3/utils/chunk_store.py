@@ -0,0 +1,288 @@
+import json
+import mmap
+import os
+import shutil
+import time
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from utils.chunks import CHUNK_FIELDS, NUMERIC_FIELDS, Chunk, chunk_column
+from utils.profiling import profiled
+
+STORE_META_FILE = 'store.json'
+CONTENT_FILE = 'content.bin'
+EMBEDDINGS_FILE = 'embeddings.f32'
+# Per-chunk columns besides the chunk fields: owning document and the UTF-8 byte range of its content
+OFFSET_COLUMNS = ('document_id', 'content_start', 'content_end')
+# Stored for strategy-specific fields (e.g. sentence_count) a chunk does not have
+MISSING_VALUE = -1
+
+def remove_stale_stores(parent: str, max_idle_seconds: float) -> int:
+    """
+    Delete the store directories below parent that were not used for max_idle_seconds.
+    
+    A store counts as used when it was written or touched (ChunkStore.touch)
+    within that time. Returns the number of stores removed.
+    """
+    cutoff = time.time() - max_idle_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(parent))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            # Removed concurrently by another session
+            continue
+    return removed
+
+def _column_file(name: str) -> str:
+    return f'{name}.i64'
+
+def _byte_offsets(text: str, encoded: bytes, positions: np.ndarray) -> np.ndarray:
+    """UTF-8 byte offsets of character positions in text."""
+    if len(encoded) == len(text):
+        return positions
+    # Every non-continuation byte starts a character
+    text_bytes = np.frombuffer(encoded, dtype=np.uint8)
+    char_starts = np.append(np.flatnonzero((text_bytes & 0xC0) != 0x80), len(encoded))
+    return char_starts[positions]
+
+class ChunkStoreWriter:
+    """
+    Write the chunks of one or many documents to a memory-mappable directory.
+    
+    Source texts (and the text of chunks that are not contiguous slices) are
+    appended to one UTF-8 file; chunk fields, document ids and content byte
+    ranges go to one raw int64 file per column, and embeddings to a raw float32
+    matrix. Everything is streamed, so only the current document's chunks are
+    held in memory.
+    """
+    
+    def __init__(self, directory: str, embedding_dim: Optional[int] = None, embedder: Optional[str] = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.embedding_dim = embedding_dim
+        self.embedder = embedder
+        self.strategy: Optional[str] = None
+        self.extra_fields: Optional[List[str]] = None
+        self.documents: List[Dict[str, Any]] = []
+        self.rows_written = 0
+        
+        self._content = open(os.path.join(directory, CONTENT_FILE), 'wb')
+        self._content_bytes = 0
+        self._columns = {name: open(os.path.join(directory, _column_file(name)), 'wb')
+                         for name in NUMERIC_FIELDS + OFFSET_COLUMNS}
+        self._extra_columns: Dict[str, Any] = {}
+        self._embeddings = open(os.path.join(directory, EMBEDDINGS_FILE), 'wb') if embedding_dim else None
+    
+    def write(self, chunks: Sequence, text: str, document: Optional[str] = None,
+              embeddings: Optional[np.ndarray] = None):
+        """
+        Append one document's chunks.
+        
+        Args:
+            chunks: Chunks of text (Chunk objects, dicts, a ChunkTable or a SlidingWindowView)
+            text: The source text the chunks' start_pos / end_pos refer to
+            document: Document name
+            embeddings: One embedding row per chunk (required when the store has embeddings)
+        """
+        n = len(chunks)
+        if n and self.strategy is None:
+            self.strategy = chunks[0]['strategy']
+        if n and self.extra_fields is None:
+            # Integer strategy-specific fields (sentence_count, semantic_group, ...) become columns
+            first = chunks[0]
+            self.extra_fields = [key for key in first if key not in CHUNK_FIELDS
+                                 and isinstance(first[key], (int, np.integer)) and not isinstance(first[key], bool)]
+            for key in self.extra_fields:
+                self._extra_columns[key] = open(os.path.join(self.directory, _column_file(key)), 'wb')
+        
+        encoded = text.encode('utf-8')
+        text_start = self._content_bytes
+        self._append_content(encoded)
+        self.documents.append({'name': document, 'text_start': text_start, 'text_end': self._content_bytes})
+        
+        columns = {field: chunk_column(chunks, field).astype(np.int64, copy=False) for field in NUMERIC_FIELDS}
+        content_start = _byte_offsets(text, encoded, columns['start_pos']) + text_start
+        content_end = _byte_offsets(text, encoded, columns['end_pos']) + text_start
+        
+        # Chunks that are not a slice of the source keep their own text after it
+        for index, content in self._content_overrides(chunks, text).items():
+            content_start[index] = self._content_bytes
+            self._append_content(content.encode('utf-8'))
+            content_end[index] = self._content_bytes
+        
+        columns['document_id'] = np.full(n, len(self.documents) - 1, dtype=np.int64)
+        columns['content_start'] = content_start
+        columns['content_end'] = content_end
+        for name, array in columns.items():
+            np.ascontiguousarray(array, dtype=np.int64).tofile(self._columns[name])
+        for key, file in self._extra_columns.items():
+            self._extra_column(chunks, key).tofile(file)
+        
+        if self._embeddings is not None:
+            if embeddings is None or len(embeddings) != n:
+                raise ValueError("This store has embeddings; pass one embedding row per chunk")
+            np.ascontiguousarray(embeddings, dtype=np.float32).reshape(n, self.embedding_dim).tofile(self._embeddings)
+        self.rows_written += n
+    
+    def _append_content(self, data: bytes):
+        self._content.write(data)
+        self._content_bytes += len(data)
+    
+    @staticmethod
+    def _content_overrides(chunks: Sequence, text: str) -> Dict[int, str]:
+        """Chunks whose content is not text[start_pos:end_pos], keyed by position."""
+        if hasattr(chunks, 'column'):
+            # Columnar containers store content as offsets plus explicit overrides
+            return dict(getattr(chunks, 'content_overrides', {}))
+        
+        overrides = {}
+        for index, chunk in enumerate(chunks):
+            if isinstance(chunk, Chunk) and chunk.is_slice and chunk.source is text:
+                continue
+            if chunk['content'] != text[chunk['start_pos']:chunk['end_pos']]:
+                overrides[index] = chunk['content']
+        return overrides
+    
+    @staticmethod
+    def _extra_column(chunks: Sequence, key: str) -> np.ndarray:
+        if hasattr(chunks, 'column'):
+            try:
+                values = chunks.column(key)
+            except KeyError:
+                values = None
+            if values is not None and values.dtype != object:
+                return np.asarray(values, dtype=np.int64)
+        values = (chunk.get(key) for chunk in chunks)
+        return np.fromiter((MISSING_VALUE if value is None else value for value in values),
+                           dtype=np.int64, count=len(chunks))
+    
+    def close(self):
+        for file in [self._content, *self._columns.values(), *self._extra_columns.values()]:
+            file.close()
+        if self._embeddings is not None:
+            self._embeddings.close()
+        
+        metadata = {
+            'strategy': self.strategy or '',
+            'chunks': self.rows_written,
+            'extra_fields': self.extra_fields or [],
+            'documents': self.documents,
+            'embedding_dim': self.embedding_dim,
+            'embedder': self.embedder,
+        }
+        with open(os.path.join(self.directory, STORE_META_FILE), 'w') as f:
+            json.dump(metadata, f)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ChunkStore(Sequence):
+    """
+    Read-only, memory-mapped chunks written by ChunkStoreWriter.
+    
+    Columns and embeddings are np.memmap arrays and content is decoded from a
+    mapped file, so opening a store reads only its metadata; indexing or
+    slicing materializes just the requested Chunk objects, and the OS pages in
+    only the bytes they touch.
+    """
+    
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, STORE_META_FILE)) as f:
+            metadata = json.load(f)
+        self.directory = directory
+        self.strategy = metadata['strategy']
+        self.extra_fields = metadata['extra_fields']
+        self.documents = metadata['documents']
+        self.embedder = metadata.get('embedder')
+        self._length = metadata['chunks']
+        
+        self._columns = {name: self._map_column(name)
+                         for name in NUMERIC_FIELDS + OFFSET_COLUMNS + tuple(self.extra_fields)}
+        
+        content_path = os.path.join(directory, CONTENT_FILE)
+        self._content_file = open(content_path, 'rb')
+        self._content = (mmap.mmap(self._content_file.fileno(), 0, access=mmap.ACCESS_READ)
+                         if os.path.getsize(content_path) else b'')
+        
+        dim = metadata.get('embedding_dim')
+        self.embeddings: Optional[np.ndarray] = None
+        if dim and self._length:
+            self.embeddings = np.memmap(os.path.join(directory, EMBEDDINGS_FILE), dtype=np.float32, mode='r',
+                                        shape=(self._length, dim))
+    
+    @classmethod
+    @profiled('storage')
+    def from_chunks(cls, directory: str, chunks: Sequence, text: str, document: Optional[str] = None,
+                    embeddings: Optional[np.ndarray] = None, embedder: Optional[str] = None) -> 'ChunkStore':
+        """Write one document's chunks to directory and open the result."""
+        embedding_dim = embeddings.shape[1] if embeddings is not None else None
+        with ChunkStoreWriter(directory, embedding_dim, embedder) as writer:
+            writer.write(chunks, text, document, embeddings)
+        return cls(directory)
+    
+    def _map_column(self, name: str) -> np.ndarray:
+        if not self._length:
+            return np.zeros(0, dtype=np.int64)
+        return np.memmap(os.path.join(self.directory, _column_file(name)), dtype=np.int64, mode='r',
+                         shape=(self._length,))
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Chunk, List[Chunk]]:
+        if isinstance(index, slice):
+            return [self._chunk(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return self._chunk(index)
+    
+    def column(self, name: str) -> np.ndarray:
+        """A chunk field (or document_id) for every chunk as a memory-mapped array."""
+        return self._columns[name]
+    
+    def document_text(self, document_id: int = 0) -> str:
+        """Source text of one stored document."""
+        document = self.documents[document_id]
+        return self._content[document['text_start']:document['text_end']].decode('utf-8')
+    
+    def touch(self):
+        """Mark the store as in use, so remove_stale_stores keeps it."""
+        try:
+            os.utime(self.directory)
+        except OSError:
+            pass
+    
+    @property
+    def disk_bytes(self) -> int:
+        """Size of the store's files."""
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+    
+    def _chunk(self, index: int) -> Chunk:
+        """Materialize one row as a Chunk, decoding only its own bytes of content."""
+        columns = self._columns
+        content = self._content[int(columns['content_start'][index]):int(columns['content_end'][index])]
+        fields = {field: int(columns[field][index]) for field in NUMERIC_FIELDS}
+        for key in self.extra_fields:
+            value = int(columns[key][index])
+            if value != MISSING_VALUE:
+                fields[key] = value
+        return Chunk(content=content.decode('utf-8'), strategy=self.strategy, **fields)
+    
+    def close(self):
+        if isinstance(self._content, mmap.mmap):
+            self._content.close()
+        self._content_file.close()
\ No newline at end of file
@@ -0,0 +1,169 @@
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from utils.profiling import profiled
+
+# Fields every strategy sets on its chunks, in display order
+CHUNK_FIELDS = ('content', 'token_count', 'start_pos', 'end_pos', 'overlap', 'chunk_id', 'strategy')
+NUMERIC_FIELDS = ('token_count', 'start_pos', 'end_pos', 'overlap', 'chunk_id')
+
+class Chunk(Mapping):
+    """
+    A chunk of a document with fixed fields stored in slots.
+    
+    When the chunk is a contiguous slice of its source text, ``content`` is not
+    stored: it is sliced from the source on access. Strategy-specific fields
+    (e.g. ``sentence_count``) live in ``extra`` as a tuple of (key, value) pairs,
+    which is far smaller than a per-chunk dict. Chunks behave as read-only
+    mappings, so ``chunk['content']``, ``chunk.get('overlap', 0)`` and
+    ``pd.DataFrame(chunks)`` keep working as they did with dicts.
+    """
+    
+    __slots__ = ('_content', 'source', 'token_count', 'start_pos', 'end_pos', 'overlap', 'chunk_id',
+                 'strategy', 'extra')
+    
+    def __init__(self, content: Optional[str] = None, token_count: int = 0, start_pos: int = 0, end_pos: int = 0,
+                 overlap: int = 0, chunk_id: int = 0, strategy: str = '', source: Optional[str] = None, **extra):
+        if content is None and source is None:
+            raise ValueError("A chunk needs either its content or the source text it slices")
+        self._content = content
+        self.source = source
+        self.token_count = token_count
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.overlap = overlap
+        self.chunk_id = chunk_id
+        self.strategy = strategy
+        self.extra = tuple(extra.items()) if extra else None
+    
+    @property
+    def content(self) -> str:
+        """Chunk text, sliced from the source unless it was given explicitly."""
+        if self._content is not None:
+            return self._content
+        return self.source[self.start_pos:self.end_pos]
+    
+    @property
+    def is_slice(self) -> bool:
+        """True when content is the source text between start_pos and end_pos."""
+        return self._content is None
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in CHUNK_FIELDS:
+            return getattr(self, key)
+        if self.extra is not None:
+            for extra_key, value in self.extra:
+                if extra_key == key:
+                    return value
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        yield from CHUNK_FIELDS
+        if self.extra is not None:
+            for key, _ in self.extra:
+                yield key
+    
+    def __len__(self) -> int:
+        return len(CHUNK_FIELDS) + (len(self.extra) if self.extra is not None else 0)
+    
+    def __repr__(self) -> str:
+        return f"Chunk({self.to_dict()!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of every field, e.g. for JSON export."""
+        return {key: self[key] for key in self}
+
+class ChunkTable(Sequence):
+    """
+    Columnar storage for the chunks of one document and strategy.
+    
+    Numeric fields are NumPy arrays; content is stored as (start_pos, end_pos)
+    offsets into the source text, with explicit strings kept only for chunks
+    that are not a contiguous slice (e.g. clustered semantic groups). Indexing
+    returns Chunk objects, so the table can stand in for a list of chunks.
+    """
+    
+    def __init__(self, text: str, strategy: str, columns: Dict[str, np.ndarray],
+                 content_overrides: Optional[Dict[int, str]] = None,
+                 extra_columns: Optional[Dict[str, np.ndarray]] = None):
+        self.text = text
+        self.strategy = strategy
+        self.columns = columns
+        self.content_overrides = content_overrides or {}
+        self.extra_columns = extra_columns or {}
+    
+    @classmethod
+    @profiled('storage')
+    def from_chunks(cls, chunks: Sequence, text: str) -> 'ChunkTable':
+        """Build a table from chunks (Chunk objects or dicts) of a single strategy over text."""
+        strategies = {chunk['strategy'] for chunk in chunks}
+        if len(strategies) > 1:
+            raise ValueError(f"A ChunkTable holds one strategy, got: {', '.join(sorted(strategies))}")
+        
+        columns = {field: np.fromiter((chunk[field] for chunk in chunks), dtype=np.int64, count=len(chunks))
+                   for field in NUMERIC_FIELDS}
+        
+        content_overrides = {}
+        extra_values: Dict[str, List[Any]] = {}
+        for index, chunk in enumerate(chunks):
+            is_slice = isinstance(chunk, Chunk) and chunk.is_slice and chunk.source is text
+            if not is_slice and chunk['content'] != text[chunk['start_pos']:chunk['end_pos']]:
+                content_overrides[index] = chunk['content']
+            for key in chunk:
+                if key not in CHUNK_FIELDS:
+                    extra_values.setdefault(key, [None] * len(chunks))[index] = chunk[key]
+        
+        # Extras missing from some chunks are kept as object columns with None gaps
+        extra_columns = {
+            key: np.array(values, dtype=object) if any(value is None for value in values) else np.asarray(values)
+            for key, values in extra_values.items()
+        }
+        return cls(text, strategies.pop() if strategies else '', columns, content_overrides, extra_columns)
+    
+    def __len__(self) -> int:
+        return len(self.columns['chunk_id'])
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Chunk, List[Chunk]]:
+        if isinstance(index, slice):
+            return [self._chunk(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return self._chunk(index)
+    
+    def column(self, name: str) -> np.ndarray:
+        """A numeric or extra field for every chunk as one array."""
+        if name in self.columns:
+            return self.columns[name]
+        return self.extra_columns[name]
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the table's arrays and content overrides (not the source text)."""
+        arrays = list(self.columns.values()) + list(self.extra_columns.values())
+        return sum(array.nbytes for array in arrays) + sum(len(content) for content in self.content_overrides.values())
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Plain dicts for every chunk."""
+        return [chunk.to_dict() for chunk in self]
+    
+    def _chunk(self, index: int) -> Chunk:
+        """Materialize one row as a Chunk."""
+        fields = {field: int(self.columns[field][index]) for field in NUMERIC_FIELDS}
+        for key, values in self.extra_columns.items():
+            value = values[index]
+            if value is not None:
+                fields[key] = value.item() if isinstance(value, np.generic) else value
+        return Chunk(content=self.content_overrides.get(index), strategy=self.strategy, source=self.text, **fields)
+
+def chunk_column(chunks, name: str, default: int = 0) -> np.ndarray:
+    """One numeric field of every chunk as an array, read column-wise when the container supports it."""
+    if hasattr(chunks, 'column'):
+        try:
+            return np.asarray(chunks.column(name))
+        except KeyError:
+            pass
+    return np.fromiter((chunk.get(name, default) or 0 for chunk in chunks), dtype=np.int64, count=len(chunks))
\ No newline at end of file
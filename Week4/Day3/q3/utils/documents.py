@@ -0,0 +1,29 @@
+import os
+from typing import List, Sequence, Union
+
+DocumentPath = Union[str, os.PathLike]
+
+_PDF_PROCESSOR = None
+
+def load_document(path: DocumentPath) -> str:
+    """Return the text of a document file (.pdf, or any text file)."""
+    path = os.fspath(path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No such document: {path}")
+    if path.lower().endswith('.pdf'):
+        global _PDF_PROCESSOR
+        if _PDF_PROCESSOR is None:
+            from utils.pdf_processor import PDFProcessor
+            from utils.text_cache import ExtractedTextCache
+            _PDF_PROCESSOR = PDFProcessor(text_cache=ExtractedTextCache())
+        return _PDF_PROCESSOR.extract_text(path)
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def format_table(headers: Sequence[str], rows: List[Sequence[str]]) -> str:
+    """Render rows of cell strings as a plain-text table with left-aligned columns."""
+    widths = [max(len(header), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    lines = ['  '.join(header.ljust(width) for header, width in zip(headers, widths))]
+    lines.append('  '.join('-' * width for width in widths))
+    lines += ['  '.join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows]
+    return '\n'.join(lines)
\ No newline at end of file
@@ -0,0 +1,111 @@
+import hashlib
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import numpy as np
+
+from utils.cache import LRUCache
+
+# Similarity heatmaps are aggregated to at most this many rows and columns, and full
+# n x n similarity matrices are only formed up to this many embeddings
+MAX_HEATMAP_BINS = 200
+# Similarities computed per block when scanning all pairs for their range
+_PAIR_BLOCK_ELEMENTS = 1 << 22
+
+# Derived artifacts (similarity matrices, projections, cluster labels) keyed by embedding fingerprint
+_ARTIFACT_CACHE = LRUCache(max_items=32)
+
+def embedding_fingerprint(embeddings: np.ndarray) -> str:
+    """Content hash of an embedding matrix (values, shape and dtype)."""
+    embeddings = np.ascontiguousarray(embeddings)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{embeddings.dtype.str}{embeddings.shape}".encode('utf-8'))
+    digest.update(embeddings.data)
+    return digest.hexdigest()
+
+def _memoized(kind: str, embeddings: np.ndarray, compute: Callable[[], Any], *params: Hashable) -> Any:
+    """Return a cached artifact for these embeddings, computing it on a miss."""
+    key = (kind, embedding_fingerprint(embeddings)) + params
+    value = _ARTIFACT_CACHE.get(key)
+    if value is None:
+        value = compute()
+        # Cached arrays are shared between callers, so they must not be modified in place
+        for array in value if isinstance(value, tuple) else (value,):
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+        _ARTIFACT_CACHE.put(key, value)
+    return value
+
+def similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
+    """Pairwise cosine similarity as a float32 matrix, memoized per embedding matrix."""
+    def compute() -> np.ndarray:
+        unit = np.asarray(embeddings, dtype=np.float32)
+        unit = unit / np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+        return np.clip(unit @ unit.T, -1.0, 1.0)
+    
+    return _memoized('similarity', embeddings, compute)
+
+def pca_projection(embeddings: np.ndarray, n_components: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """PCA coordinates and explained variance ratios, memoized per embedding matrix."""
+    def compute() -> Tuple[np.ndarray, np.ndarray]:
+        from sklearn.decomposition import PCA
+        pca = PCA(n_components=n_components)
+        return pca.fit_transform(embeddings), pca.explained_variance_ratio_
+    
+    return _memoized('pca', embeddings, compute, n_components)
+
+def kmeans_labels(embeddings: np.ndarray, n_clusters: int, random_state: int = 42) -> np.ndarray:
+    """KMeans cluster label of each embedding, memoized per embedding matrix."""
+    def compute() -> np.ndarray:
+        from sklearn.cluster import KMeans
+        return KMeans(n_clusters=min(n_clusters, len(embeddings)), random_state=random_state).fit_predict(embeddings)
+    
+    return _memoized('kmeans', embeddings, compute, n_clusters, random_state)
+
+def _similarity_range(unit: np.ndarray) -> Tuple[float, float]:
+    """Smallest and largest similarity between distinct pairs, scanning the upper triangle block by block."""
+    n = len(unit)
+    block = max(1, _PAIR_BLOCK_ELEMENTS // n)
+    low, high = np.inf, -np.inf
+    for start in range(0, n - 1, block):
+        end = min(start + block, n - 1)
+        similarity = unit[start:end] @ unit[start + 1:].T
+        # Row i of the block pairs with columns j > i only
+        upper = np.arange(end - start)[:, np.newaxis] <= np.arange(n - start - 1)[np.newaxis, :]
+        low = min(low, float(np.min(similarity, where=upper, initial=np.inf)))
+        high = max(high, float(np.max(similarity, where=upper, initial=-np.inf)))
+    return max(low, -1.0), min(high, 1.0)
+
+def pairwise_statistics(embeddings: np.ndarray) -> Dict[str, float]:
+    """
+    Mean, spread and range of the cosine similarities between distinct pairs, memoized per embedding matrix.
+    
+    Mean and spread follow from sums over the unit vectors (s = sum of rows:
+    pair sum = (s.s - n) / 2; sum of squares from ||U^T U||_F^2), and the
+    range from a blockwise scan, so the n x n matrix is never formed.
+    """
+    def compute() -> Dict[str, float]:
+        n = len(embeddings)
+        n_pairs = n * (n - 1) // 2
+        if not n_pairs:
+            return {'mean': 0.0, 'std': 0.0, 'min': 0.0, 'max': 0.0, 'pairs': 0}
+        
+        unit = np.asarray(embeddings, dtype=np.float32)
+        unit = unit / np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+        squared_norms = np.einsum('ij,ij->i', unit, unit, dtype=np.float64)
+        
+        row_sum = unit.sum(axis=0, dtype=np.float64)
+        pair_sum = (row_sum @ row_sum - squared_norms.sum()) / 2
+        gram = unit.T.astype(np.float64) @ unit
+        pair_square_sum = (np.sum(gram * gram) - np.sum(squared_norms ** 2)) / 2
+        
+        mean = pair_sum / n_pairs
+        low, high = _similarity_range(unit)
+        return {
+            'mean': float(mean),
+            'std': float(np.sqrt(max(pair_square_sum / n_pairs - mean * mean, 0.0))),
+            'min': low,
+            'max': high,
+            'pairs': int(n_pairs),
+        }
+    
+    return dict(_memoized('pairwise_statistics', embeddings, compute))
\ No newline at end of file
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.cache import LRUCache, get_cache_dir
+
+# Storage precisions for embeddings held in memory
+EMBEDDING_DTYPES = ('float32', 'float16', 'int8')
+# int8 mode stores round(x * 127) of unit-length vectors
+INT8_SCALE = 127.0
+# Sentences sent to the embedding model per call, bounding the float32 rows alive at once
+ENCODE_BATCH_SIZE = 1024
+
+def quantize_embeddings(embeddings: np.ndarray, embedding_dtype: str) -> np.ndarray:
+    """Convert unit-length float32 embeddings to the storage precision."""
+    if embedding_dtype == 'float16':
+        return embeddings.astype(np.float16)
+    if embedding_dtype == 'int8':
+        return np.clip(np.rint(embeddings * INT8_SCALE), -127, 127).astype(np.int8)
+    return np.asarray(embeddings, dtype=np.float32)
+
+class EmbeddingCache:
+    """Content-addressed sentence embedding cache.
+    
+    Vectors are keyed by (model_name, sha1(sentence)) and stored as unit-length
+    float32 ``.npy`` files on disk, with an in-memory LRU in front so repeated runs
+    over the same document never reach the embedding model. The LRU and the
+    matrices returned by encode() hold vectors at the cache's dtype.
+    """
+    
+    def __init__(self, model_name: str, cache_dir: Optional[str] = None, max_memory_items: int = 50000,
+                 dtype: str = 'float32'):
+        if dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        self.model_name = model_name
+        self.dtype = dtype
+        safe_model_name = re.sub(r'[^A-Za-z0-9_.-]+', '__', model_name)
+        self.cache_dir = cache_dir or get_cache_dir('embeddings', safe_model_name, 'normalized')
+        self.memory_cache = LRUCache(max_items=max_memory_items)
+    
+    @staticmethod
+    def sentence_key(sentence: str) -> str:
+        """Return the content hash used to address a sentence."""
+        return hashlib.sha1(sentence.encode('utf-8')).hexdigest()
+    
+    def _path_for_key(self, key: str) -> str:
+        """Return the on-disk location for a cache key (sharded by prefix)."""
+        return os.path.join(self.cache_dir, key[:2], key + '.npy')
+    
+    def get(self, sentence: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a sentence, or None on a miss."""
+        key = self.sentence_key(sentence)
+        embedding = self.memory_cache.get(key)
+        if embedding is not None:
+            return embedding
+        
+        try:
+            embedding = np.load(self._path_for_key(key), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        
+        embedding = quantize_embeddings(embedding, self.dtype)
+        self.memory_cache.put(key, embedding)
+        return embedding
+    
+    def put(self, sentence: str, embedding: np.ndarray) -> np.ndarray:
+        """Store a float32 embedding on disk and in memory; returns the in-memory copy at the cache's dtype."""
+        key = self.sentence_key(sentence)
+        embedding = np.asarray(embedding, dtype=np.float32)
+        stored = quantize_embeddings(embedding, self.dtype)
+        self.memory_cache.put(key, stored)
+        
+        path = self._path_for_key(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see partial vectors
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embedding, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk layer is best-effort; the in-memory entry is still usable
+            pass
+        return stored
+    
+    def encode(self, sentences: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for sentences, calling encode_fn only for cache misses.
+        
+        Args:
+            sentences: Sentences to embed
+            encode_fn: Function that embeds a list of sentences (e.g. SentenceTransformer.encode)
+        
+        Returns:
+            Matrix at the cache's dtype with one row per input sentence; misses are
+            embedded ENCODE_BATCH_SIZE at a time, so no full float32 copy is made
+        """
+        if not sentences:
+            return np.zeros((0, 0), dtype=self.dtype)
+        
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        missing_set = set()
+        for sentence in sentences:
+            if sentence in found or sentence in missing_set:
+                continue
+            embedding = self.get(sentence)
+            if embedding is None:
+                missing.append(sentence)
+                missing_set.add(sentence)
+            else:
+                found[sentence] = embedding
+        
+        for start in range(0, len(missing), ENCODE_BATCH_SIZE):
+            batch = missing[start:start + ENCODE_BATCH_SIZE]
+            new_embeddings = np.asarray(encode_fn(batch), dtype=np.float32)
+            for sentence, embedding in zip(batch, new_embeddings):
+                found[sentence] = self.put(sentence, embedding)
+        
+        return np.vstack([found[sentence] for sentence in sentences])
+
+_EMBEDDING_CACHES: Dict[Tuple[str, str], EmbeddingCache] = {}
+
+def get_embedding_cache(model_name: str, dtype: str = 'float32') -> EmbeddingCache:
+    """Return the process-wide embedding cache for a model and storage precision (all share the disk cache)."""
+    if (model_name, dtype) not in _EMBEDDING_CACHES:
+        _EMBEDDING_CACHES[model_name, dtype] = EmbeddingCache(model_name, dtype=dtype)
+    return _EMBEDDING_CACHES[model_name, dtype]
\ No newline at end of file
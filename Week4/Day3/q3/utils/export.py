@@ -0,0 +1,179 @@
+import json
+import os
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Integer columns of the Arrow schema; strategy-specific ones are null where a strategy does not set them
+INTEGER_COLUMNS = ('chunk_id', 'start_pos', 'end_pos', 'token_count', 'overlap',
+                   'semantic_group', 'sentence_count', 'paragraph_count')
+EXPORT_FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+def chunk_schema(include_content: bool = True, embedding_dim: Optional[int] = None):
+    """Arrow schema used for chunk exports."""
+    fields = [pa.field('document', pa.string()), pa.field('strategy', pa.dictionary(pa.int32(), pa.string()))]
+    fields += [pa.field(name, pa.int64()) for name in INTEGER_COLUMNS]
+    if include_content:
+        fields.append(pa.field('content', pa.large_string()))
+    if embedding_dim:
+        # Variable-size lists: Parquet cannot read back null rows of fixed-size lists
+        fields.append(pa.field('embedding', pa.list_(pa.float32())))
+    return pa.schema(fields)
+
+class JSONLChunkWriter:
+    """Write chunks as newline-delimited JSON, one chunk per line, as they arrive."""
+    
+    def __init__(self, path_or_file: Union[str, TextIO], include_content: bool = True):
+        self._owns_file = not hasattr(path_or_file, 'write')
+        self.file = open(path_or_file, 'w', encoding='utf-8') if self._owns_file else path_or_file
+        self.include_content = include_content
+        self.rows_written = 0
+    
+    def write(self, chunks: Iterable, document: Optional[str] = None,
+              embeddings: Optional[np.ndarray] = None):
+        """Append chunks (and optionally one embedding row per chunk)."""
+        for index, chunk in enumerate(chunks):
+            record = {'document': document} if document is not None else {}
+            record.update((key, chunk[key]) for key in chunk if key != 'content' or self.include_content)
+            if embeddings is not None:
+                record['embedding'] = np.asarray(embeddings[index], dtype=np.float32).tolist()
+            self.file.write(json.dumps(record, ensure_ascii=False, default=str))
+            self.file.write('\n')
+            self.rows_written += 1
+    
+    def close(self):
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ArrowChunkWriter:
+    """
+    Write chunks to Parquet or an Arrow IPC file in bounded-size record batches.
+    
+    Rows are buffered column by column and flushed every batch_size chunks, so
+    memory stays constant however many documents are written.
+    """
+    
+    def __init__(self, path_or_file: Union[str, BinaryIO], format: str = 'parquet', include_content: bool = True,
+                 embedding_dim: Optional[int] = None, batch_size: int = 10000, compression: str = 'zstd'):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for Parquet/Arrow export: pip install pyarrow")
+        if format not in ('parquet', 'arrow'):
+            raise ValueError(f"Unsupported Arrow export format: {format}")
+        
+        self.schema = chunk_schema(include_content, embedding_dim)
+        self.include_content = include_content
+        self.embedding_dim = embedding_dim
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._columns: Dict[str, List[Any]] = {name: [] for name in self.schema.names}
+        
+        if format == 'parquet':
+            self._writer = pq.ParquetWriter(path_or_file, self.schema, compression=compression)
+        else:
+            self._writer = pa.ipc.new_file(path_or_file, self.schema)
+    
+    def write(self, chunks: Iterable, document: Optional[str] = None,
+              embeddings: Optional[np.ndarray] = None):
+        """Append chunks (and optionally one embedding row per chunk)."""
+        columns = self._columns
+        for index, chunk in enumerate(chunks):
+            columns['document'].append(document)
+            columns['strategy'].append(chunk.get('strategy'))
+            for name in INTEGER_COLUMNS:
+                columns[name].append(chunk.get(name))
+            if self.include_content:
+                columns['content'].append(chunk['content'])
+            if self.embedding_dim:
+                columns['embedding'].append(None if embeddings is None else np.asarray(embeddings[index], dtype=np.float32))
+            
+            if len(columns['document']) >= self.batch_size:
+                self._flush()
+                columns = self._columns
+    
+    def _flush(self):
+        """Write the buffered rows as one record batch."""
+        n_rows = len(self._columns['document'])
+        if not n_rows:
+            return
+        
+        arrays = []
+        for field in self.schema:
+            values = self._columns[field.name]
+            if field.name == 'embedding':
+                arrays.append(self._embedding_array(values))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        
+        self.rows_written += n_rows
+        self._columns = {name: [] for name in self.schema.names}
+    
+    def _embedding_array(self, values: List[Optional[np.ndarray]]):
+        """Pack embedding rows into a list array without per-value Python objects."""
+        mask = np.array([value is None for value in values])
+        matrix = np.zeros((len(values), self.embedding_dim), dtype=np.float32)
+        for row, value in enumerate(values):
+            if value is not None:
+                matrix[row] = value
+        offsets = pa.array(np.arange(len(values) + 1, dtype=np.int32) * self.embedding_dim)
+        return pa.ListArray.from_arrays(offsets, pa.array(matrix.ravel()),
+                                        mask=pa.array(mask) if mask.any() else None)
+    
+    def close(self):
+        self._flush()
+        self._writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_chunk_writer(path: str, format: Optional[str] = None, **kwargs):
+    """Open a JSONL, Parquet or Arrow chunk writer, inferring the format from the file extension."""
+    if format is None:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in EXPORT_FORMATS:
+            raise ValueError(f"Cannot infer export format from '{path}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+        format = EXPORT_FORMATS[extension]
+    
+    if format == 'jsonl':
+        kwargs.pop('embedding_dim', None)
+        kwargs.pop('batch_size', None)
+        kwargs.pop('compression', None)
+        return JSONLChunkWriter(path, **kwargs)
+    return ArrowChunkWriter(path, format=format, **kwargs)
+
+def export_corpus(results: Iterable[Tuple[str, Sequence]], path: str, format: Optional[str] = None,
+                  **kwargs) -> int:
+    """
+    Stream (document, chunks) pairs, e.g. from chunk_corpus(), to a single file.
+    
+    Args:
+        results: Iterable of (document name, chunks) pairs
+        path: Output file (.jsonl, .parquet or .arrow)
+        format: Overrides the format inferred from the extension
+        **kwargs: Passed to the writer (include_content, batch_size, compression)
+    
+    Returns:
+        Number of chunks written
+    """
+    with open_chunk_writer(path, format, **kwargs) as writer:
+        for document, chunks in results:
+            writer.write(chunks, document=document)
+    return writer.rows_written
\ No newline at end of file
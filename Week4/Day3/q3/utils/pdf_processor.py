@@ -1,6 +1,12 @@
-import io
+import math
+import os
+import tempfile
 import streamlit as st
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+from utils.profiling import profiled
+from utils.text_cache import ExtractedTextCache
 
 try:
     import pdfplumber
@@ -14,11 +20,24 @@ try:
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
+# Page ranges handed to each worker; several per worker keeps the pool balanced
+# and lets the first pages stream back early
+TASKS_PER_WORKER = 4
+
+def _extract_page_range(backend: str, path: str, first_page: int, last_page: int) -> List[Tuple[int, str]]:
+    """Worker entry point: extract pages [first_page, last_page) of the PDF at path."""
+    processor = PDFProcessor(backend=backend)
+    with processor._open_document(path) as document:
+        return list(processor._page_texts(document, first_page, last_page))
+
 class PDFProcessor:
     """Handles PDF text extraction using multiple backends."""
     
-    def __init__(self):
-        self.preferred_backend = self._get_preferred_backend()
+    def __init__(self, backend: Optional[str] = None, workers: int = 1,
+                 text_cache: Optional[ExtractedTextCache] = None):
+        self.preferred_backend = backend or self._get_preferred_backend()
+        self.workers = workers
+        self.text_cache = text_cache
     
     def _get_preferred_backend(self) -> str:
         """Determine which PDF processing backend to use."""
@@ -29,75 +48,193 @@ class PDFProcessor:
         else:
             raise ImportError("Neither pdfplumber nor PyMuPDF is available. Please install one of them.")
     
+    @profiled('extraction')
     def extract_text(self, uploaded_file) -> str:
         """Extract text from uploaded PDF file."""
+        text, _ = self.extract_text_and_info(uploaded_file)
+        return text
+    
+    @profiled('extraction')
+    def extract_text_and_info(self, uploaded_file,
+                              progress_callback: Optional[Callable[[int, int], None]] = None,
+                              content_hash: Optional[str] = None) -> Tuple[str, dict]:
+        """
+        Extract text and metadata from a PDF, opening the document only once.
+        
+        Args:
+            uploaded_file: Uploaded file object (file-like) or path to a PDF
+            progress_callback: Optional function called with (page_no, total_pages) after each page
+            content_hash: SHA-256 of the PDF if already known (computed when a text cache is set)
+        
+        Returns:
+            Tuple of (text, info) where info holds 'pages', 'metadata' and
+            'page_offsets' (list of (page_no, char_offset) into the text)
+        """
+        if self.text_cache is not None:
+            content_hash = content_hash or self.text_cache.file_hash(uploaded_file)
+            cached = self.text_cache.get(content_hash)
+            if cached is not None:
+                return cached
+        
+        info = {}
+        page_texts = []
+        page_offsets = []
         try:
-            if self.preferred_backend == 'pdfplumber':
-                return self._extract_with_pdfplumber(uploaded_file)
-            elif self.preferred_backend == 'pymupdf':
-                return self._extract_with_pymupdf(uploaded_file)
-            else:
-                raise ValueError(f"Unsupported backend: {self.preferred_backend}")
+            for page_no, page_text, char_offset in self.iter_pages(uploaded_file, info):
+                page_texts.append(page_text)
+                page_offsets.append((page_no, char_offset))
+                if progress_callback is not None:
+                    progress_callback(page_no, info.get('pages', page_no))
         except Exception as e:
             st.error(f"Error extracting text from PDF: {str(e)}")
-            return ""
+            return "", {}
+        
+        info['page_offsets'] = page_offsets
+        text = "\n".join(page_texts).rstrip()
+        
+        if self.text_cache is not None and text:
+            self.text_cache.put(content_hash, text, info)
+        return text, info
     
-    def _extract_with_pdfplumber(self, uploaded_file) -> str:
-        """Extract text using pdfplumber."""
-        text = ""
-        try:
-            with pdfplumber.open(io.BytesIO(uploaded_file.read())) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-        except Exception as e:
-            st.error(f"Error with pdfplumber: {str(e)}")
-        return text.strip()
+    def iter_pages(self, uploaded_file, info: Optional[dict] = None) -> Iterator[Tuple[int, str, int]]:
+        """
+        Stream page text as each page is parsed.
+        
+        Yields (page_no, text, char_offset) for every page with text, where
+        char_offset is the page's position in the newline-joined document text
+        returned by extract_text. Consumers can start work on early pages while
+        later ones are still being parsed; only one page is held at a time.
+        
+        Args:
+            uploaded_file: Uploaded file object (file-like) or path to a PDF
+            info: Optional dict filled with 'pages' and 'metadata' from the same open document
+        """
+        if self.workers > 1:
+            page_texts = self._page_texts_parallel(uploaded_file, info)
+        else:
+            page_texts = self._page_texts_serial(uploaded_file, info)
+        
+        char_offset = 0
+        for page_no, page_text in page_texts:
+            if char_offset == 0:
+                page_text = page_text.lstrip()
+            if not page_text:
+                continue
+            yield page_no, page_text, char_offset
+            char_offset += len(page_text) + 1
+    
+    def _page_texts_serial(self, uploaded_file, info: Optional[dict]) -> Iterator[Tuple[int, str]]:
+        """Extract all pages in this process from a single open document."""
+        with self._open_document(uploaded_file) as document:
+            if info is not None:
+                info.update(self._document_info(document))
+            yield from self._page_texts(document)
     
-    def _extract_with_pymupdf(self, uploaded_file) -> str:
-        """Extract text using PyMuPDF."""
-        text = ""
+    def _page_texts_parallel(self, uploaded_file, info: Optional[dict]) -> Iterator[Tuple[int, str]]:
+        """
+        Extract pages on a process pool, yielding them in page order.
+        
+        The page range is split into contiguous blocks that workers extract
+        independently; results are yielded as soon as every earlier block is done.
+        """
+        with self._shared_path(uploaded_file) as path:
+            with self._open_document(path) as document:
+                document_info = self._document_info(document)
+            if info is not None:
+                info.update(document_info)
+            
+            n_pages = document_info['pages']
+            if n_pages == 0:
+                return
+            
+            pages_per_task = max(1, math.ceil(n_pages / (self.workers * TASKS_PER_WORKER)))
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(_extract_page_range, self.preferred_backend, path,
+                                    first_page, min(first_page + pages_per_task, n_pages))
+                    for first_page in range(0, n_pages, pages_per_task)
+                ]
+                for future in futures:
+                    yield from future.result()
+    
+    @contextmanager
+    def _shared_path(self, uploaded_file):
+        """Yield a filesystem path workers can open, spilling uploads to a temporary file."""
+        if isinstance(uploaded_file, (str, os.PathLike)):
+            yield os.fspath(uploaded_file)
+            return
+        
+        source = self._as_source(uploaded_file)
+        data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
+            tmp_file.write(data)
         try:
-            pdf_document = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                text += page.get_text() + "\n"
-            pdf_document.close()
-        except Exception as e:
-            st.error(f"Error with PyMuPDF: {str(e)}")
-        return text.strip()
+            yield tmp_file.name
+        finally:
+            os.remove(tmp_file.name)
+    
+    @contextmanager
+    def _open_document(self, uploaded_file):
+        """Open a PDF with the preferred backend without copying the upload into a new buffer."""
+        if self.preferred_backend == 'pdfplumber':
+            with pdfplumber.open(self._as_source(uploaded_file)) as pdf:
+                yield pdf
+        elif self.preferred_backend == 'pymupdf':
+            source = self._as_source(uploaded_file)
+            if isinstance(source, str):
+                pdf_document = fitz.open(source)
+            else:
+                data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+                pdf_document = fitz.open(stream=data, filetype="pdf")
+            try:
+                yield pdf_document
+            finally:
+                pdf_document.close()
+        else:
+            raise ValueError(f"Unsupported backend: {self.preferred_backend}")
+    
+    @staticmethod
+    def _as_source(uploaded_file):
+        """Return a path or a rewound file object for the backend to read from."""
+        if isinstance(uploaded_file, (str, os.PathLike)):
+            return os.fspath(uploaded_file)
+        if hasattr(uploaded_file, 'seek'):
+            uploaded_file.seek(0)
+        return uploaded_file
+    
+    def _page_texts(self, document, first_page: int = 0, last_page: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (page_no, text) for pages [first_page, last_page) of an open document."""
+        if self.preferred_backend == 'pdfplumber':
+            yield from self._page_texts_pdfplumber(document, first_page, last_page)
+        else:
+            yield from self._page_texts_pymupdf(document, first_page, last_page)
+    
+    def _page_texts_pdfplumber(self, pdf, first_page: int, last_page: Optional[int]) -> Iterator[Tuple[int, str]]:
+        """Extract page text using pdfplumber."""
+        for page_no, page in enumerate(pdf.pages[first_page:last_page], start=first_page + 1):
+            try:
+                yield page_no, page.extract_text() or ""
+            finally:
+                # Drop the parsed page objects so memory stays flat on long documents
+                page.close()
+    
+    def _page_texts_pymupdf(self, pdf_document, first_page: int, last_page: Optional[int]) -> Iterator[Tuple[int, str]]:
+        """Extract page text using PyMuPDF."""
+        last_page = pdf_document.page_count if last_page is None else last_page
+        for page_num in range(first_page, last_page):
+            yield page_num + 1, pdf_document[page_num].get_text()
+    
+    def _document_info(self, document) -> dict:
+        """Page count and metadata of an open document."""
+        if self.preferred_backend == 'pdfplumber':
+            return {'pages': len(document.pages), 'metadata': document.metadata or {}}
+        return {'pages': document.page_count, 'metadata': document.metadata}
     
     def get_pdf_info(self, uploaded_file) -> dict:
         """Get metadata information about the PDF."""
         try:
-            if self.preferred_backend == 'pdfplumber':
-                return self._get_info_pdfplumber(uploaded_file)
-            elif self.preferred_backend == 'pymupdf':
-                return self._get_info_pymupdf(uploaded_file)
+            with self._open_document(uploaded_file) as document:
+                return self._document_info(document)
         except Exception as e:
             st.error(f"Error getting PDF info: {str(e)}")
-            return {}
-    
-    def _get_info_pdfplumber(self, uploaded_file) -> dict:
-        """Get PDF info using pdfplumber."""
-        info = {}
-        try:
-            with pdfplumber.open(io.BytesIO(uploaded_file.read())) as pdf:
-                info['pages'] = len(pdf.pages)
-                info['metadata'] = pdf.metadata or {}
-        except Exception as e:
-            st.error(f"Error getting PDF info with pdfplumber: {str(e)}")
-        return info
-    
-    def _get_info_pymupdf(self, uploaded_file) -> dict:
-        """Get PDF info using PyMuPDF."""
-        info = {}
-        try:
-            pdf_document = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-            info['pages'] = pdf_document.page_count
-            info['metadata'] = pdf_document.metadata
-            pdf_document.close()
-        except Exception as e:
-            st.error(f"Error getting PDF info with PyMuPDF: {str(e)}")
-        return info 
\ No newline at end of file
+            return {}
\ No newline at end of file
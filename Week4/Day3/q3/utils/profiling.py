@@ -0,0 +1,204 @@
+import contextvars
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+# Pipeline phases, in the order they run
+PHASES = ('extraction', 'tokenization', 'segmentation', 'embedding', 'clustering', 'chunking', 'storage')
+PROFILER_BACKENDS = ('cprofile', 'pyinstrument')
+
+# The profiler collecting phase timings in this context (None when profiling is off)
+_ACTIVE_PROFILER: contextvars.ContextVar = contextvars.ContextVar('active_profiler', default=None)
+
+class PipelineProfiler:
+    """
+    Accumulates wall time, CPU time, call counts and allocations per pipeline phase.
+    
+    Phases nest (chunking includes tokenization and embedding): wall_seconds
+    is inclusive and self_seconds excludes time spent in nested phases. A
+    phase re-entered while already running (e.g. count_tokens calling
+    tokenize_document) is only timed at its outermost call.
+    """
+    
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.total_seconds = 0.0
+        self.backend: Optional[str] = None
+        self.backend_text: Optional[str] = None  # Call tree / hottest functions from cProfile or pyinstrument
+        self.backend_html: Optional[str] = None  # Interactive pyinstrument report
+        self._backend_profiler = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed code as one call of a phase."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        if any(entry['name'] == name for entry in stack):
+            yield
+            return
+        
+        entry = {'name': name, 'child_seconds': 0.0, 'peak': 0}
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            entry['start_bytes'] = current
+        stack.append(entry)
+        
+        blocks = sys.getallocatedblocks()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            allocated_blocks = sys.getallocatedblocks() - blocks
+            stack.pop()
+            
+            peak_bytes = 0
+            if 'start_bytes' in entry:
+                peak = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - entry['start_bytes']
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            if stack:
+                stack[-1]['child_seconds'] += wall
+            
+            with self._lock:
+                stats = self.stats.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'self_seconds': 0.0,
+                                                     'cpu_seconds': 0.0, 'allocated_blocks': 0, 'peak_bytes': 0})
+                stats['calls'] += 1
+                stats['wall_seconds'] += wall
+                stats['self_seconds'] += wall - entry['child_seconds']
+                stats['cpu_seconds'] += cpu
+                stats['allocated_blocks'] += allocated_blocks
+                stats['peak_bytes'] = max(stats['peak_bytes'], peak_bytes)
+    
+    def phase_seconds(self, name: str) -> float:
+        """Inclusive wall time of a phase (0.0 if it never ran)."""
+        return self.stats.get(name, {}).get('wall_seconds', 0.0)
+    
+    def report(self) -> List[Dict[str, Any]]:
+        """One row per phase that ran, in pipeline order."""
+        order = {name: index for index, name in enumerate(PHASES)}
+        rows = []
+        for name in sorted(self.stats, key=lambda name: order.get(name, len(order))):
+            stats = self.stats[name]
+            row = {'phase': name, 'calls': stats['calls'], 'wall_seconds': stats['wall_seconds'],
+                   'self_seconds': stats['self_seconds'], 'cpu_seconds': stats['cpu_seconds'],
+                   'allocated_blocks': stats['allocated_blocks']}
+            if self.track_memory:
+                row['peak_mb'] = stats['peak_bytes'] / 2 ** 20
+            rows.append(row)
+        return rows
+    
+    def format_report(self) -> str:
+        """The report as a plain-text table."""
+        lines = [f"{'phase':<14}{'calls':>8}{'wall s':>10}{'self s':>10}{'cpu s':>10}{'alloc blocks':>14}"
+                 + (f"{'peak MB':>10}" if self.track_memory else "")]
+        for row in self.report():
+            line = (f"{row['phase']:<14}{row['calls']:>8}{row['wall_seconds']:>10.3f}{row['self_seconds']:>10.3f}"
+                    f"{row['cpu_seconds']:>10.3f}{row['allocated_blocks']:>14,}")
+            if self.track_memory:
+                line += f"{row['peak_mb']:>10.1f}"
+            lines.append(line)
+        lines.append(f"{'total':<14}{'':>8}{self.total_seconds:>10.3f}")
+        return '\n'.join(lines)
+    
+    def _start_backend(self, backend: Optional[str]):
+        if backend is None:
+            return
+        if backend not in PROFILER_BACKENDS:
+            raise ValueError(f"Unknown profiler backend: {backend}. Available: {', '.join(PROFILER_BACKENDS)}")
+        if backend == 'pyinstrument' and not PYINSTRUMENT_AVAILABLE:
+            raise ImportError("pyinstrument is required for this profiler backend: pip install pyinstrument")
+        
+        self.backend = backend
+        self._backend_profiler = cProfile.Profile() if backend == 'cprofile' else PyinstrumentProfiler()
+        if backend == 'cprofile':
+            self._backend_profiler.enable()
+        else:
+            self._backend_profiler.start()
+    
+    def _stop_backend(self, top_functions: int = 40):
+        if self._backend_profiler is None:
+            return
+        if self.backend == 'cprofile':
+            self._backend_profiler.disable()
+            output = io.StringIO()
+            stats = pstats.Stats(self._backend_profiler, stream=output)
+            stats.sort_stats('cumulative').print_stats(top_functions)
+            self.backend_text = output.getvalue()
+        else:
+            self._backend_profiler.stop()
+            self.backend_text = self._backend_profiler.output_text(unicode=True)
+            self.backend_html = self._backend_profiler.output_html()
+    
+    def dump_stats(self, path: str):
+        """Write raw cProfile statistics (for pstats, snakeviz, ...) to path."""
+        if self.backend != 'cprofile' or self._backend_profiler is None:
+            raise ValueError("dump_stats needs a profile run with the 'cprofile' backend")
+        self._backend_profiler.dump_stats(path)
+
+@contextmanager
+def profile_pipeline(track_memory: bool = False, backend: Optional[str] = None) -> Iterator[PipelineProfiler]:
+    """
+    Collect per-phase timings for everything run inside the block.
+    
+    Args:
+        track_memory: Also record each phase's peak traced memory (tracemalloc; slows Python code down)
+        backend: Additionally run 'cprofile' or 'pyinstrument' over the block
+    
+    Yields:
+        The PipelineProfiler; its report is complete once the block exits
+    """
+    profiler = PipelineProfiler(track_memory)
+    token = _ACTIVE_PROFILER.set(profiler)
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    
+    start = time.perf_counter()
+    profiler._start_backend(backend)
+    try:
+        yield profiler
+    finally:
+        profiler._stop_backend()
+        profiler.total_seconds = time.perf_counter() - start
+        if started_tracing:
+            tracemalloc.stop()
+        _ACTIVE_PROFILER.reset(token)
+
+def profiled(phase: str) -> Callable[[Callable], Callable]:
+    """Decorator timing calls as a pipeline phase while profile_pipeline() is active (otherwise a no-op)."""
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE_PROFILER.get()
+            if profiler is None:
+                return function(*args, **kwargs)
+            with profiler.phase(phase):
+                return function(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorate
\ No newline at end of file
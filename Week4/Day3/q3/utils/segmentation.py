@@ -0,0 +1,155 @@
+import re
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+from utils.cache import LRUCache
+from utils.profiling import profiled
+from utils.tokenizer import PARAGRAPH_BREAK_PATTERN, paragraph_spans_by_separator, regex_sentence_spans, strip_span
+
+try:
+    import nltk
+    from nltk.tokenize.punkt import PunktTokenizer
+    NLTK_AVAILABLE = True
+    
+    # Download required NLTK data
+    try:
+        nltk.data.find('tokenizers/punkt_tab')
+    except LookupError:
+        nltk.download('punkt_tab', quiet=True)
+
+except ImportError:
+    NLTK_AVAILABLE = False
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+SENTENCE_SPLITTERS = ('auto', 'nltk', 'spacy', 'regex')
+LINE_BREAK_PATTERN = re.compile(r'\n')
+# Pipeline components sentence segmentation does not need
+SPACY_DISABLED_COMPONENTS = ('tagger', 'attribute_ruler', 'lemmatizer', 'ner')
+
+# Sentence and paragraph spans shared by every chunker, keyed by splitter and text hash
+_SEGMENTATION_CACHE = LRUCache(max_items=8)
+
+@lru_cache(maxsize=1)
+def _punkt_tokenizer():
+    """Load the English Punkt model once per process."""
+    return PunktTokenizer()
+
+@lru_cache(maxsize=1)
+def load_spacy_model():
+    """Load the English spaCy pipeline once per process, with only sentence segmentation enabled."""
+    nlp = spacy.load("en_core_web_sm", disable=SPACY_DISABLED_COMPONENTS)
+    # The statistical sentence recognizer is much faster than the dependency parser
+    if 'senter' in nlp.component_names and 'parser' in nlp.pipe_names:
+        nlp.disable_pipe('parser')
+        nlp.enable_pipe('senter')
+    return nlp
+
+@lru_cache(maxsize=None)
+def resolve_sentence_splitter(splitter: str = 'auto') -> str:
+    """Return the splitter that will actually run: 'auto' prefers NLTK, then spaCy, then regex."""
+    if splitter not in SENTENCE_SPLITTERS:
+        raise ValueError(f"Unknown sentence splitter: {splitter}. Available: {', '.join(SENTENCE_SPLITTERS)}")
+    
+    if splitter in ('auto', 'nltk') and NLTK_AVAILABLE:
+        return 'nltk'
+    if splitter in ('auto', 'spacy') and SPACY_AVAILABLE:
+        try:
+            load_spacy_model()
+            return 'spacy'
+        except (OSError, IOError):
+            # Fallback to regex if no spaCy model available
+            pass
+    return 'regex'
+
+def _cached(kind: Tuple[str, ...], text: str, compute: Callable[[], List[Tuple[int, int]]]) -> List[Tuple[int, int]]:
+    """Return cached spans for text, computing them on a miss."""
+    key = kind + (len(text), hash(text))
+    entry = _SEGMENTATION_CACHE.get(key)
+    if entry is not None and entry[0] == text:
+        return entry[1]
+    
+    spans = compute()
+    _SEGMENTATION_CACHE.put(key, (text, spans))
+    return spans
+
+def _nltk_sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """Sentence spans from the NLTK Punkt tokenizer."""
+    spans = [strip_span(text, start, end) for start, end in _punkt_tokenizer().span_tokenize(text)]
+    return [(start, end) for start, end in spans if start < end]
+
+def _spacy_sentence_spans(text: str, batch_size: int = 32) -> List[Tuple[int, int]]:
+    """Sentence spans from spaCy, streaming the paragraphs through nlp.pipe."""
+    nlp = load_spacy_model()
+    blocks = paragraph_spans_by_separator(text, PARAGRAPH_BREAK_PATTERN)
+    if blocks:
+        nlp.max_length = max(nlp.max_length, max(end - start for start, end in blocks) + 1)
+    
+    spans = []
+    docs = nlp.pipe((text[start:end] for start, end in blocks), batch_size=batch_size)
+    for (offset, _), doc in zip(blocks, docs):
+        for sent in doc.sents:
+            start, end = strip_span(text, offset + sent.start_char, offset + sent.end_char)
+            if start < end:
+                spans.append((start, end))
+    return spans
+
+_SENTENCE_SPAN_FUNCTIONS = {
+    'nltk': _nltk_sentence_spans,
+    'spacy': _spacy_sentence_spans,
+    'regex': regex_sentence_spans,
+}
+
+@profiled('segmentation')
+def sentence_spans(text: str, splitter: str = 'auto') -> List[Tuple[int, int]]:
+    """
+    Sentence boundaries of text as (start, end) character spans.
+    
+    Each document is segmented once per splitter; later calls (from any
+    chunker) return the cached spans, which must not be modified.
+    
+    Args:
+        text: Document text
+        splitter: 'auto', 'nltk', 'spacy' or 'regex'
+    
+    Returns:
+        Non-empty, whitespace-stripped sentence spans in document order
+    """
+    method = resolve_sentence_splitter(splitter)
+    
+    def compute() -> List[Tuple[int, int]]:
+        try:
+            return _SENTENCE_SPAN_FUNCTIONS[method](text)
+        except Exception:
+            return regex_sentence_spans(text)
+    
+    return _cached(('sentences', method), text, compute)
+
+def _sentence_group_spans(text: str, sentences_per_group: int = 3) -> List[Tuple[int, int]]:
+    """Split text into sentence-group spans as paragraph fallback."""
+    spans = regex_sentence_spans(text)
+    return [(spans[i][0], spans[min(i + sentences_per_group, len(spans)) - 1][1])
+            for i in range(0, len(spans), sentences_per_group)]
+
+@profiled('segmentation')
+def paragraph_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Paragraph boundaries of text as (start, end) character spans, cached per document.
+    
+    Paragraphs are separated by blank lines; text without blank lines is split
+    at single newlines, and text without any line breaks into groups of three
+    sentences.
+    """
+    def compute() -> List[Tuple[int, int]]:
+        spans = paragraph_spans_by_separator(text, PARAGRAPH_BREAK_PATTERN)
+        if len(spans) <= 1:
+            spans = paragraph_spans_by_separator(text, LINE_BREAK_PATTERN)
+        if len(spans) <= 1:
+            spans = _sentence_group_spans(text)
+        return spans
+    
+    return _cached(('paragraphs',), text, compute)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Optional, Tuple
+
+from utils.cache import get_cache_dir
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+
+class ExtractedTextCache:
+    """
+    Disk cache of extracted PDF text and page metadata keyed by the SHA-256 of the PDF bytes.
+    
+    Entries are gzip-compressed JSON files. When the cache grows beyond
+    max_bytes the least recently used entries (by modification time, which is
+    refreshed on every hit) are evicted.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or get_cache_dir('extracted_text')
+        self.max_bytes = max_bytes
+    
+    @staticmethod
+    def file_hash(uploaded_file) -> str:
+        """SHA-256 of a PDF given as an uploaded file object or a path."""
+        digest = hashlib.sha256()
+        if isinstance(uploaded_file, (str, os.PathLike)):
+            with open(uploaded_file, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+            return digest.hexdigest()
+        
+        if hasattr(uploaded_file, 'getbuffer'):
+            digest.update(uploaded_file.getbuffer())
+        else:
+            uploaded_file.seek(0)
+            for block in iter(lambda: uploaded_file.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+            uploaded_file.seek(0)
+        return digest.hexdigest()
+    
+    def _path_for_hash(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, content_hash + '.json.gz')
+    
+    def get(self, content_hash: str) -> Optional[Tuple[str, dict]]:
+        """Return cached (text, info) for a PDF hash, or None on a miss."""
+        path = self._path_for_hash(content_hash)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            return None
+        
+        info = entry['info']
+        info['page_offsets'] = [tuple(page_offset) for page_offset in info.get('page_offsets', [])]
+        return entry['text'], info
+    
+    def put(self, content_hash: str, text: str, info: dict):
+        """Store extracted text and info, then evict old entries if over budget."""
+        path = self._path_for_hash(content_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                # PDF metadata values are not always JSON types; store them as strings
+                json.dump({'text': text, 'info': info}, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict()
+    
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json.gz'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total_bytes -= size
+            except OSError:
+                pass
\ No newline at end of file
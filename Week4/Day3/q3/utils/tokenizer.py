@@ -1,6 +1,10 @@
 import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
 import streamlit as st
+from utils.cache import LRUCache
+from utils.profiling import profiled
 
 try:
     import tiktoken
@@ -8,6 +12,190 @@ try:
 except ImportError:
     TIKTOKEN_AVAILABLE = False
 
+SENTENCE_PATTERN = re.compile(r'[^.!?]+(?:[.!?]+|$)')
+PARAGRAPH_BREAK_PATTERN = re.compile(r'\n\s*\n')
+# Words are maximal runs of non-whitespace, as in str.split(); no whitespace code point exceeds U+3000
+_MAX_WHITESPACE_CODE_POINT = 0x3000
+
+# Tokenized documents shared by every TokenizerUtils instance (and so by every chunker)
+_DOCUMENT_CACHE = LRUCache(max_items=4)
+
+@lru_cache(maxsize=None)
+def _load_encoding(model_name: str):
+    """Load the tiktoken encoding for a model once per process."""
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Fallback to a default encoding if model not found
+        return tiktoken.get_encoding("cl100k_base")
+
+@lru_cache(maxsize=1)
+def _whitespace_table() -> np.ndarray:
+    """Boolean lookup table of whitespace code points, with one trailing non-whitespace slot."""
+    table = np.zeros(_MAX_WHITESPACE_CODE_POINT + 2, dtype=bool)
+    table[[c for c in range(_MAX_WHITESPACE_CODE_POINT + 1) if chr(c).isspace()]] = True
+    return table
+
+def word_spans(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate every word of the text in a single vectorized pass.
+    
+    Returns:
+        (starts, ends) int64 arrays of character offsets; the words are exactly
+        those of text.split()
+    """
+    if text.isascii():
+        code_points = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    else:
+        # surrogatepass keeps lone surrogates (which PDF extraction can produce) as single code points
+        code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        code_points = np.minimum(code_points, _MAX_WHITESPACE_CODE_POINT + 1)
+    
+    is_word = np.zeros(len(text) + 2, dtype=np.int8)
+    is_word[1:-1] = ~_whitespace_table()[code_points]
+    # Word starts and ends alternate where the word/whitespace flag changes
+    edges = np.flatnonzero(np.diff(is_word))
+    return edges[0::2], edges[1::2]
+
+def strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Shrink a character span so it excludes leading and trailing whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def regex_sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """Split text into sentence spans at '.', '!' and '?' (punctuation included)."""
+    spans = []
+    for match in SENTENCE_PATTERN.finditer(text):
+        start, end = strip_span(text, match.start(), match.end())
+        if start < end:
+            spans.append((start, end))
+    return spans
+
+def paragraph_spans_by_separator(text: str, separator: re.Pattern) -> List[Tuple[int, int]]:
+    """Split text into non-empty paragraph spans at each separator match."""
+    spans = []
+    start = 0
+    for match in separator.finditer(text):
+        span = strip_span(text, start, match.start())
+        if span[0] < span[1]:
+            spans.append(span)
+        start = match.end()
+    span = strip_span(text, start, len(text))
+    if span[0] < span[1]:
+        spans.append(span)
+    return spans
+
+@lru_cache(maxsize=None)
+def _token_byte_lengths(encoding_name: str) -> np.ndarray:
+    """Byte length of every token id in a tiktoken encoding (computed once per encoding)."""
+    encoding = tiktoken.get_encoding(encoding_name)
+    lengths = np.zeros(encoding.n_vocab, dtype=np.int64)
+    for token_id in range(encoding.n_vocab):
+        try:
+            lengths[token_id] = len(encoding.decode_single_token_bytes(token_id))
+        except KeyError:
+            # Unused ids in the vocabulary range never appear in encoded text
+            pass
+    return lengths
+
+class TokenizedDocument:
+    """
+    A document encoded once and indexed for O(1) token counts over any character span.
+    
+    ``token_prefix[c]`` is the number of tokens ending at or before character ``c``,
+    so the tokens of ``text[start:end]`` are ``token_prefix[end] - token_prefix[start]``.
+    Without tiktoken, "tokens" are whitespace-separated words and counts are scaled
+    by the usual 0.75 tokens-per-word estimate.
+    """
+    
+    def __init__(self, text: str, token_ids: Optional[np.ndarray], token_starts: np.ndarray,
+                 token_ends: np.ndarray, token_scale: float = 1.0):
+        self.text = text
+        self.token_ids = token_ids
+        self.token_starts = token_starts
+        self.token_ends = token_ends
+        self.token_scale = token_scale
+        self.token_prefix = np.cumsum(
+            np.bincount(token_ends, minlength=len(text) + 1), dtype=np.int32
+        )
+        self._word_spans = None
+    
+    def __len__(self) -> int:
+        return len(self.token_starts)
+    
+    @property
+    def total_tokens(self) -> int:
+        """Token count of the whole document."""
+        return self.token_count(0, len(self.text))
+    
+    def units_for_tokens(self, tokens: int) -> int:
+        """Number of index entries (tokens, or words in fallback mode) that make up a token budget."""
+        if self.token_scale != 1.0:
+            return max(1, int(tokens / self.token_scale))
+        return max(1, tokens)
+    
+    def token_span(self, first: int, last: int) -> Tuple[int, int]:
+        """Exact character span of tokens [first, last), excluding surrounding whitespace."""
+        return strip_span(self.text, int(self.token_starts[first]), int(self.token_ends[last - 1]))
+    
+    def word_spans(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(starts, ends) of every word of the document, computed once."""
+        if self._word_spans is None:
+            self._word_spans = word_spans(self.text)
+        return self._word_spans
+    
+    def word_counts(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """len(text[start:end].split()) for many character spans at once, without slicing the text."""
+        word_starts, word_ends = self.word_spans()
+        # Words overlapping [start, end): those ending after start up to those starting before end
+        counts = np.searchsorted(word_starts, ends, side='left') - np.searchsorted(word_ends, starts, side='right')
+        return np.where(np.asarray(ends) > np.asarray(starts), counts, 0)
+    
+    def token_spans(self, firsts: np.ndarray, lasts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized token_span for many token ranges [firsts[i], lasts[i]) at once."""
+        raw_starts = self.token_starts[firsts]
+        raw_ends = self.token_ends[np.asarray(lasts) - 1]
+        word_starts, word_ends = self.word_spans()
+        if len(word_starts) == 0:
+            return raw_ends.copy(), raw_ends.copy()
+        
+        # A span edge inside a word stays put; otherwise it moves to the nearest word edge inwards
+        next_word = np.searchsorted(word_ends, raw_starts, side='right')
+        has_next = next_word < len(word_starts)
+        next_word = np.minimum(next_word, len(word_starts) - 1)
+        starts = np.where(word_starts[next_word] <= raw_starts, raw_starts, word_starts[next_word])
+        previous_word = np.searchsorted(word_starts, raw_ends, side='left') - 1
+        has_previous = previous_word >= 0
+        previous_word = np.maximum(previous_word, 0)
+        ends = np.where(word_ends[previous_word] >= raw_ends, raw_ends, word_ends[previous_word])
+        
+        # Whitespace-only spans collapse to their end, as strip_span does
+        starts = np.where(has_next & has_previous, np.minimum(starts, raw_ends), raw_ends)
+        ends = np.maximum(np.where(has_previous, ends, raw_ends), starts)
+        return starts, ends
+    
+    def token_count(self, start: int, end: int) -> int:
+        """Number of tokens in text[start:end]."""
+        count = int(self.token_prefix[end] - self.token_prefix[start])
+        if self.token_scale != 1.0:
+            return int(count * self.token_scale)
+        return count
+    
+    @property
+    def sentence_spans(self) -> List[Tuple[int, int]]:
+        """Sentence boundary offsets as (start, end) character spans, from the shared segmentation service."""
+        from utils.segmentation import sentence_spans
+        return sentence_spans(self.text)
+    
+    @property
+    def paragraph_spans(self) -> List[Tuple[int, int]]:
+        """Paragraph boundary offsets as (start, end) character spans, from the shared segmentation service."""
+        from utils.segmentation import paragraph_spans
+        return paragraph_spans(self.text)
+
 class TokenizerUtils:
     """Utilities for tokenization and token counting."""
     
@@ -19,15 +207,65 @@ class TokenizerUtils:
     def _initialize_tokenizer(self):
         """Initialize the tokenizer based on available libraries."""
         if TIKTOKEN_AVAILABLE:
-            try:
-                self.tokenizer = tiktoken.encoding_for_model(self.model_name)
-            except KeyError:
-                # Fallback to a default encoding if model not found
-                self.tokenizer = tiktoken.get_encoding("cl100k_base")
+            # Encodings are shared, so every chunker's TokenizerUtils is cheap to create
+            self.tokenizer = _load_encoding(self.model_name)
         else:
             # Fallback to simple word-based tokenization
             self.tokenizer = None
     
+    @profiled('tokenization')
+    def tokenize_document(self, text: str) -> TokenizedDocument:
+        """
+        Encode a whole document once and return its token-offset index.
+        
+        Documents are cached, so every chunker working on the same text shares
+        a single encoding pass.
+        """
+        encoding_name = self.tokenizer.name if self.tokenizer is not None else 'words'
+        key = (encoding_name, len(text), hash(text))
+        document = _DOCUMENT_CACHE.get(key)
+        if document is not None and document.text == text:
+            return document
+        
+        if self.tokenizer is not None:
+            try:
+                document = self._tokenize_document_tiktoken(text)
+            except Exception as e:
+                st.warning(f"Error with tiktoken: {str(e)}. Using word-based fallback.")
+                document = self._tokenize_document_fallback(text)
+        else:
+            document = self._tokenize_document_fallback(text)
+        
+        _DOCUMENT_CACHE.put(key, document)
+        return document
+    
+    def _tokenize_document_tiktoken(self, text: str) -> TokenizedDocument:
+        """Build a TokenizedDocument from a single tiktoken encoding pass."""
+        token_ids = np.asarray(self.tokenizer.encode_ordinary(text), dtype=np.uint32)
+        
+        # Token byte offsets follow from the per-token byte lengths
+        byte_lengths = _token_byte_lengths(self.tokenizer.name)[token_ids]
+        byte_starts = np.cumsum(byte_lengths) - byte_lengths
+        
+        if text.isascii():
+            token_starts = byte_starts
+        else:
+            # Map byte offsets to character offsets: every non-continuation byte starts a character
+            text_bytes = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+            char_index = np.cumsum((text_bytes & 0xC0) != 0x80) - 1
+            token_starts = char_index[byte_starts] if len(byte_starts) else byte_starts
+        
+        token_ends = np.empty_like(token_starts)
+        token_ends[:-1] = token_starts[1:]
+        token_ends[-1:] = len(text)
+        return TokenizedDocument(text, token_ids, token_starts, token_ends)
+    
+    def _tokenize_document_fallback(self, text: str) -> TokenizedDocument:
+        """Build a word-based TokenizedDocument when tiktoken is unavailable."""
+        starts, ends = word_spans(text)
+        return TokenizedDocument(text, None, starts, ends, token_scale=0.75)
+    
+    @profiled('tokenization')
     def count_tokens(self, text: str) -> int:
         """Count tokens in the given text."""
         if not text:
@@ -45,8 +283,8 @@ class TokenizerUtils:
     def _count_tokens_fallback(self, text: str) -> int:
         """Fallback token counting using word-based estimation."""
         # Simple estimation: ~0.75 tokens per word for English text
-        words = len(text.split())
-        return int(words * 0.75)
+        starts, _ = word_spans(text)
+        return int(len(starts) * 0.75)
     
     def tokenize(self, text: str) -> List[str]:
         """Tokenize text into tokens."""
@@ -65,7 +303,8 @@ class TokenizerUtils:
     
     def _tokenize_fallback(self, text: str) -> List[str]:
         """Fallback tokenization using simple word splitting."""
-        return text.split()
+        starts, ends = word_spans(text)
+        return [text[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
     
     def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
         """Truncate text to specified number of tokens."""
@@ -88,13 +327,13 @@ class TokenizerUtils:
     
     def _truncate_fallback(self, text: str, max_tokens: int) -> str:
         """Fallback truncation using word-based estimation."""
-        words = text.split()
+        starts, ends = word_spans(text)
         # Estimate: ~0.75 tokens per word
         max_words = int(max_tokens / 0.75)
-        if len(words) <= max_words:
+        if len(starts) <= max_words:
             return text
         
-        return ' '.join(words[:max_words])
+        return text[:ends[max_words - 1]] if max_words > 0 else ""
     
     def split_by_tokens(self, text: str, chunk_size: int) -> List[str]:
         """Split text into chunks of specified token size."""
@@ -124,16 +363,15 @@ class TokenizerUtils:
     
     def _split_by_tokens_fallback(self, text: str, chunk_size: int) -> List[str]:
         """Split text using word-based estimation."""
-        words = text.split()
+        starts, ends = word_spans(text)
         # Estimate: ~0.75 tokens per word
-        words_per_chunk = int(chunk_size / 0.75)
-        chunks = []
-        
-        for i in range(0, len(words), words_per_chunk):
-            chunk_words = words[i:i + words_per_chunk]
-            chunks.append(' '.join(chunk_words))
+        words_per_chunk = max(1, int(chunk_size / 0.75))
+        first_words = starts[::words_per_chunk].tolist()
+        last_words = ends[np.minimum(np.arange(words_per_chunk, len(ends) + words_per_chunk, words_per_chunk),
+                                     len(ends)) - 1].tolist()
         
-        return chunks
+        # Slice the original text so whitespace inside each chunk is preserved
+        return [text[start:end] for start, end in zip(first_words, last_words)]
     
     def get_token_positions(self, text: str) -> List[tuple]:
         """Get character positions for each token."""
@@ -141,14 +379,5 @@ class TokenizerUtils:
             return []
         
         # Simple word-based position tracking
-        words = text.split()
-        positions = []
-        current_pos = 0
-        
-        for word in words:
-            start_pos = text.find(word, current_pos)
-            end_pos = start_pos + len(word)
-            positions.append((start_pos, end_pos))
-            current_pos = end_pos
-        
-        return positions 
\ No newline at end of file
+        starts, ends = word_spans(text)
+        return list(zip(starts.tolist(), ends.tolist())) 
\ No newline at end of file
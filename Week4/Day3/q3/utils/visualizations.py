@@ -5,11 +5,27 @@ import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
 from typing import List, Dict, Any, Optional
 import streamlit as st
+from utils.chunks import chunk_column
+from utils.embedding_analysis import MAX_HEATMAP_BINS, kmeans_labels, pca_projection, similarity_matrix
+
+# Above this many chunks, figures drop per-chunk markers and bin per-chunk series
+MAX_DETAILED_CHUNKS = 2000
+
+def segment_arrays(starts: np.ndarray, ends: np.ndarray, rows: np.ndarray):
+    """x/y arrays drawing one horizontal segment per row as a single NaN-separated line trace."""
+    # float32 halves the serialized figure and is exact for positions below 2**24
+    x_dtype = np.float32 if len(ends) == 0 or ends.max() < 2 ** 24 else np.float64
+    x = np.full(3 * len(starts), np.nan, dtype=x_dtype)
+    y = np.full(3 * len(starts), np.nan, dtype=np.float32)
+    x[0::3], x[1::3] = starts, ends
+    y[0::3], y[1::3] = rows, rows
+    return x, y
+
+def bin_edges(n: int, max_bins: int) -> np.ndarray:
+    """Boundaries splitting n items into at most max_bins contiguous, near-equal bins."""
+    return np.unique(np.linspace(0, n, min(n, max_bins) + 1).astype(int))
 
 class VisualizationUtils:
     """Utilities for creating advanced visualizations."""
@@ -17,13 +33,31 @@ class VisualizationUtils:
     def __init__(self):
         self.color_palette = px.colors.qualitative.Set3
     
-    def create_similarity_heatmap(self, embeddings: np.ndarray, chunk_labels: List[str] = None) -> go.Figure:
-        """Create a similarity heatmap for chunk embeddings."""
+    def create_similarity_heatmap(self, embeddings: np.ndarray, chunk_labels: List[str] = None,
+                                  max_bins: int = MAX_HEATMAP_BINS) -> go.Figure:
+        """
+        Create a similarity heatmap for chunk embeddings.
+        
+        Above max_bins chunks, consecutive chunks are grouped into max_bins bins
+        and each cell shows the mean similarity between two bins, computed from
+        per-bin sums of unit vectors without forming the full n x n matrix.
+        """
         if embeddings is None or len(embeddings) == 0:
             return go.Figure()
         
-        # Calculate cosine similarity matrix
-        similarity_matrix = cosine_similarity(embeddings)
+        title = "Chunk Similarity Heatmap"
+        if len(embeddings) > max_bins:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            unit = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            edges = bin_edges(len(unit), max_bins)
+            sums = np.add.reduceat(unit, edges[:-1], axis=0)
+            counts = np.diff(edges)
+            matrix = (sums @ sums.T) / np.outer(counts, counts)
+            chunk_labels = [f"Chunks {start + 1}-{end}" for start, end in zip(edges[:-1], edges[1:])]
+            title = f"Chunk Similarity Heatmap (mean over bins of {counts.max()} chunks)"
+        else:
+            # Cosine similarity matrix, memoized per embedding matrix
+            matrix = similarity_matrix(embeddings)
         
         # Create labels if not provided
         if chunk_labels is None:
@@ -31,7 +65,7 @@ class VisualizationUtils:
         
         # Create heatmap
         fig = go.Figure(data=go.Heatmap(
-            z=similarity_matrix,
+            z=matrix,
             x=chunk_labels,
             y=chunk_labels,
             colorscale='RdYlBu_r',
@@ -40,7 +74,7 @@ class VisualizationUtils:
         ))
         
         fig.update_layout(
-            title="Chunk Similarity Heatmap",
+            title=title,
             xaxis_title="Chunks",
             yaxis_title="Chunks",
             width=800,
@@ -54,38 +88,35 @@ class VisualizationUtils:
         if embeddings is None or len(embeddings) == 0:
             return go.Figure()
         
-        # Apply PCA for dimensionality reduction
-        pca = PCA(n_components=2)
-        embeddings_2d = pca.fit_transform(embeddings)
-        
-        # Apply K-means clustering
-        kmeans = KMeans(n_clusters=min(n_clusters, len(embeddings)), random_state=42)
-        cluster_labels = kmeans.fit_predict(embeddings)
+        # Apply PCA for dimensionality reduction and K-means clustering (both memoized per embedding matrix)
+        embeddings_2d, explained_variance = pca_projection(embeddings, 2)
+        cluster_labels = kmeans_labels(embeddings, n_clusters)
         
         # Create labels if not provided
         if chunk_labels is None:
             chunk_labels = [f"Chunk {i+1}" for i in range(len(embeddings))]
         
-        # Create scatter plot
+        # Create scatter plot (WebGL, so thousands of points stay responsive)
         fig = go.Figure()
+        labels = np.asarray(chunk_labels)
         
         for cluster_id in range(n_clusters):
             mask = cluster_labels == cluster_id
             if np.any(mask):
-                fig.add_trace(go.Scatter(
+                fig.add_trace(go.Scattergl(
                     x=embeddings_2d[mask, 0],
                     y=embeddings_2d[mask, 1],
                     mode='markers',
                     name=f'Cluster {cluster_id + 1}',
-                    text=[chunk_labels[i] for i in range(len(chunk_labels)) if mask[i]],
+                    text=labels[mask],
                     hovertemplate='%{text}<br>PC1: %{x:.3f}<br>PC2: %{y:.3f}<extra></extra>',
                     marker=dict(size=10, opacity=0.7)
                 ))
         
         fig.update_layout(
             title="Chunk Clustering Visualization (PCA)",
-            xaxis_title=f"PC1 ({pca.explained_variance_ratio_[0]:.1%} variance)",
-            yaxis_title=f"PC2 ({pca.explained_variance_ratio_[1]:.1%} variance)",
+            xaxis_title=f"PC1 ({explained_variance[0]:.1%} variance)",
+            yaxis_title=f"PC2 ({explained_variance[1]:.1%} variance)",
             showlegend=True,
             width=800,
             height=600
@@ -94,66 +125,104 @@ class VisualizationUtils:
         return fig
     
     def create_chunk_timeline(self, chunks: List[Dict[str, Any]]) -> go.Figure:
-        """Create a timeline visualization of chunks."""
-        if not chunks:
+        """
+        Create a timeline visualization of chunks.
+        
+        All chunks are drawn as one NaN-separated WebGL line trace (plus one
+        trace of overlap markers), so figure size grows with the data rather than
+        with one trace object per chunk; per-chunk markers are dropped above
+        MAX_DETAILED_CHUNKS.
+        """
+        if not len(chunks):
             return go.Figure()
         
-        # Prepare data
-        chunk_data = []
-        for i, chunk in enumerate(chunks):
-            chunk_data.append({
-                'chunk_id': i,
-                'start_pos': chunk.get('start_pos', 0),
-                'end_pos': chunk.get('end_pos', 0),
-                'token_count': chunk.get('token_count', 0),
-                'overlap': chunk.get('overlap', 0)
-            })
-        
-        df = pd.DataFrame(chunk_data)
+        starts = chunk_column(chunks, 'start_pos')
+        ends = chunk_column(chunks, 'end_pos')
+        token_counts = chunk_column(chunks, 'token_count')
+        overlaps = chunk_column(chunks, 'overlap')
+        rows = np.arange(len(starts))
+        detailed = len(rows) <= MAX_DETAILED_CHUNKS
         
         # Create timeline
         fig = go.Figure()
-        
-        for i, row in df.iterrows():
-            # Main chunk bar
-            fig.add_trace(go.Scatter(
-                x=[row['start_pos'], row['end_pos']],
-                y=[i, i],
+        x, y = segment_arrays(starts, ends, rows)
+        if detailed:
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
                 mode='lines+markers',
-                name=f'Chunk {i+1}',
-                line=dict(width=8, color=self.color_palette[i % len(self.color_palette)]),
-                hovertemplate=f'Chunk {i+1}<br>Tokens: {row["token_count"]}<br>Position: {row["start_pos"]}-{row["end_pos"]}<extra></extra>',
+                line=dict(width=8, color=self.color_palette[4]),
+                marker=dict(color=np.repeat(rows % len(self.color_palette), 3), colorscale='Viridis', size=6),
+                customdata=np.repeat(np.column_stack([rows + 1, token_counts, starts, ends]), 3, axis=0),
+                hovertemplate='Chunk %{customdata[0]}<br>Tokens: %{customdata[1]}<br>'
+                              'Position: %{customdata[2]}-%{customdata[3]}<extra></extra>',
+                showlegend=False
+            ))
+        else:
+            # Per-point hover data would dominate the figure size; hover shows the axes instead
+            fig.add_trace(go.Scattergl(
+                x=x,
+                y=y,
+                mode='lines',
+                line=dict(width=2, color=self.color_palette[4]),
+                hovertemplate='Chunk index %{y}<br>Position: %{x}<extra></extra>',
+                showlegend=False
+            ))
+        
+        # Overlap indicators
+        overlapping = overlaps > 0
+        if overlapping.any():
+            fig.add_trace(go.Scattergl(
+                x=starts[overlapping],
+                y=rows[overlapping],
+                mode='markers',
+                marker=dict(symbol='diamond', size=10 if detailed else 4, color='red'),
+                name='Overlap',
+                customdata=overlaps[overlapping],
+                hovertemplate='Overlap: %{customdata} tokens<extra></extra>',
                 showlegend=False
             ))
-            
-            # Overlap indicator
-            if row['overlap'] > 0:
-                fig.add_trace(go.Scatter(
-                    x=[row['start_pos']],
-                    y=[i],
-                    mode='markers',
-                    marker=dict(symbol='diamond', size=10, color='red'),
-                    name='Overlap',
-                    hovertemplate=f'Overlap: {row["overlap"]} tokens<extra></extra>',
-                    showlegend=False
-                ))
         
         fig.update_layout(
             title="Chunk Timeline",
             xaxis_title="Character Position",
             yaxis_title="Chunk Index",
-            height=max(400, len(chunks) * 30),
+            height=max(400, min(len(rows) * 30, 1200)),
             showlegend=False
         )
         
         return fig
     
+    def create_chunk_size_heatmap(self, chunks: List[Dict[str, Any]],
+                                  max_bins: int = MAX_DETAILED_CHUNKS) -> go.Figure:
+        """Create a one-row heatmap of chunk token counts, averaged over bins of chunks above max_bins."""
+        if not len(chunks):
+            return go.Figure()
+        
+        token_counts = chunk_column(chunks, 'token_count')
+        title = "Chunk Size Heatmap"
+        x = np.arange(len(token_counts))
+        if len(token_counts) > max_bins:
+            edges = bin_edges(len(token_counts), max_bins)
+            token_counts = np.add.reduceat(token_counts, edges[:-1]) / np.diff(edges)
+            x = edges[:-1]
+            title = f"Chunk Size Heatmap (mean over bins of {np.diff(edges).max()} chunks)"
+        
+        fig = go.Figure(data=go.Heatmap(
+            z=[token_counts],
+            x=x,
+            colorscale='Viridis',
+            colorbar=dict(title="Token Count")
+        ))
+        fig.update_layout(title=title, xaxis_title="Chunk Index", yaxis_title="")
+        return fig
+    
     def create_token_distribution(self, chunks: List[Dict[str, Any]]) -> go.Figure:
         """Create token distribution visualization."""
-        if not chunks:
+        if not len(chunks):
             return go.Figure()
         
-        token_counts = [chunk.get('token_count', 0) for chunk in chunks]
+        token_counts = chunk_column(chunks, 'token_count')
         
         fig = make_subplots(
             rows=2, cols=2,
@@ -171,8 +240,9 @@ class VisualizationUtils:
         
         # Line plot
         fig.add_trace(
-            go.Scatter(x=list(range(len(token_counts))), y=token_counts, 
-                      mode='lines+markers', name='Token Count'),
+            go.Scattergl(x=np.arange(len(token_counts)), y=token_counts,
+                         mode='lines+markers' if len(token_counts) <= MAX_DETAILED_CHUNKS else 'lines',
+                         name='Token Count'),
             row=1, col=2
         )
         
@@ -186,8 +256,8 @@ class VisualizationUtils:
         sorted_tokens = np.sort(token_counts)
         y_vals = np.arange(1, len(sorted_tokens) + 1) / len(sorted_tokens)
         fig.add_trace(
-            go.Scatter(x=sorted_tokens, y=y_vals, 
-                      mode='lines', name='Cumulative'),
+            go.Scattergl(x=sorted_tokens, y=y_vals,
+                         mode='lines', name='Cumulative'),
             row=2, col=2
         )
         
@@ -201,19 +271,16 @@ class VisualizationUtils:
     
     def create_overlap_analysis(self, chunks: List[Dict[str, Any]]) -> go.Figure:
         """Create overlap analysis visualization."""
-        if not chunks:
+        if not len(chunks):
             return go.Figure()
         
         # Extract overlap data
-        overlap_data = []
-        for i, chunk in enumerate(chunks):
-            overlap_data.append({
-                'chunk_id': i,
-                'overlap': chunk.get('overlap', 0),
-                'token_count': chunk.get('token_count', 0)
-            })
-        
-        df = pd.DataFrame(overlap_data)
+        overlaps = chunk_column(chunks, 'overlap')
+        df = pd.DataFrame({
+            'chunk_id': np.arange(len(overlaps)),
+            'overlap': overlaps,
+            'token_count': chunk_column(chunks, 'token_count')
+        })
         
         # Filter chunks with overlap
         overlap_chunks = df[df['overlap'] > 0]
@@ -247,24 +314,24 @@ class VisualizationUtils:
         
         # Overlap vs token count
         fig.add_trace(
-            go.Scatter(x=overlap_chunks['token_count'], y=overlap_chunks['overlap'], 
-                      mode='markers', name='Overlap vs Tokens',
+            go.Scattergl(x=overlap_chunks['token_count'], y=overlap_chunks['overlap'],
+                         mode='markers', name='Overlap vs Tokens',
                       hovertemplate='Tokens: %{x}<br>Overlap: %{y}<extra></extra>'),
             row=1, col=2
         )
         
         # Overlap timeline
         fig.add_trace(
-            go.Scatter(x=overlap_chunks['chunk_id'], y=overlap_chunks['overlap'], 
-                      mode='lines+markers', name='Overlap Timeline'),
+            go.Scattergl(x=overlap_chunks['chunk_id'], y=overlap_chunks['overlap'],
+                         mode='lines', name='Overlap Timeline'),
             row=2, col=1
         )
         
         # Overlap efficiency (overlap ratio)
         efficiency = overlap_chunks['overlap'] / overlap_chunks['token_count']
         fig.add_trace(
-            go.Scatter(x=overlap_chunks['chunk_id'], y=efficiency, 
-                      mode='lines+markers', name='Overlap Ratio'),
+            go.Scattergl(x=overlap_chunks['chunk_id'], y=efficiency,
+                         mode='lines', name='Overlap Ratio'),
             row=2, col=2
         )
         
@@ -278,17 +345,17 @@ class VisualizationUtils:
     
     def create_performance_metrics(self, chunks: List[Dict[str, Any]], original_text: str) -> go.Figure:
         """Create performance metrics visualization."""
-        if not chunks:
+        if not len(chunks):
             return go.Figure()
         
         # Calculate metrics
-        total_tokens = sum(chunk.get('token_count', 0) for chunk in chunks)
-        total_overlap = sum(chunk.get('overlap', 0) for chunk in chunks)
+        total_tokens = int(chunk_column(chunks, 'token_count').sum())
+        total_overlap = int(chunk_column(chunks, 'overlap').sum())
         unique_tokens = total_tokens - total_overlap
         
         from utils.tokenizer import TokenizerUtils
         tokenizer = TokenizerUtils()
-        original_tokens = tokenizer.count_tokens(original_text)
+        original_tokens = tokenizer.tokenize_document(original_text).total_tokens
         
         # Coverage and efficiency metrics
         coverage = unique_tokens / original_tokens if original_tokens > 0 else 0